@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Per-user storage locations for the Shutdown Scheduler.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import os
+import sys
+
+APP_DIR_NAME = "ShutdownScheduler"
+
+
+def data_dir():
+    """
+    Get (and create) the per-user directory for persistent app state.
+
+    Uses %APPDATA% on Windows, ~/Library/Application Support on macOS and
+    $XDG_STATE_HOME (default ~/.local/state) elsewhere.
+
+    Returns:
+        str: Directory path
+    """
+    if sys.platform.startswith("win"):
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+
+    path = os.path.join(base, APP_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: deadline-to-action latency of each shutdown action backend.
+
+A TimerQueue deadline fires and the backend's prepared "shutdown" action
+runs; the latency is the time from the deadline to the action completing
+(the command's process exiting, or the dry-run backend recording it).
+
+Nothing is shut down: the command backends run their real argument lists
+with the executable replaced by the harmless `true` (resolved when the
+action is prepared, like the real one). The legacy row resolves `true`
+through PATH when the deadline fires, as the old hard-coded
+subprocess.run(["shutdown", ...]) did.
+
+Usage:
+    python benchmarks/bench_actions.py [--repeats N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shutdown_actions import CommandBackend, DryRunBackend, LinuxBackend, PosixBackend, WindowsBackend
+from timer_engine import TimerQueue
+
+REPEATS = 50
+
+# Harmless stand-in for the power-off executables
+STAND_IN = "true" if os.name != "nt" else "whoami"
+
+
+class StandInBackend(CommandBackend):
+    """Runs another backend's command lines with the executable replaced."""
+
+    def __init__(self, real):
+        self.real = real
+        self.name = real.name
+
+    def command_for(self, action, command=None):
+        return [STAND_IN] + self.real.command_for(action, command)[1:]
+
+
+def percentiles(samples):
+    """Return p50, p95 and max of samples in milliseconds."""
+    samples = sorted(samples)
+    pick = lambda fraction: samples[min(len(samples) - 1, int(len(samples) * fraction))]
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "max_ms": samples[-1]}
+
+
+def measure(perform, repeats):
+    """
+    Fire deadlines that call perform() and time deadline -> completion.
+
+    Returns:
+        dict: Latency percentiles in milliseconds
+    """
+    queue = TimerQueue()
+    queue.start()
+    samples = []
+    done = threading.Event()
+
+    def on_fire(entry):
+        perform()
+        samples.append((time.monotonic() - entry.deadline) * 1000.0)
+        done.set()
+
+    try:
+        for _ in range(repeats):
+            done.clear()
+            queue.schedule(0.005, on_fire)
+            done.wait(10)
+    finally:
+        queue.stop()
+    return percentiles(samples)
+
+
+def time_prepare(backend, repeats):
+    """Median time to prepare (resolve and validate) the shutdown action, in ms."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        backend.prepare("shutdown")
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return sorted(samples)[len(samples) // 2]
+
+
+def run(repeats=REPEATS):
+    """
+    Measure every backend.
+
+    Returns:
+        dict: backend -> {prepare_ms, p50_ms, p95_ms, max_ms}
+    """
+    backends = {
+        "windows": StandInBackend(WindowsBackend()),
+        "linux-systemctl": StandInBackend(LinuxBackend(use_systemd=True)),
+        "linux-shutdown": StandInBackend(LinuxBackend(use_systemd=False)),
+        "posix": StandInBackend(PosixBackend()),
+    }
+    results = {}
+    for name, backend in backends.items():
+        action = backend.prepare("shutdown")
+        results[name] = dict(prepare_ms=time_prepare(backend, repeats), **measure(action.run, repeats))
+
+    dry_run = DryRunBackend()
+    action = dry_run.prepare("shutdown")
+    results["dry-run"] = dict(prepare_ms=time_prepare(dry_run, repeats), **measure(action.run, repeats))
+
+    # Old behaviour: no preparation, PATH lookup and spawn at the deadline
+    legacy_argv = [STAND_IN] + PosixBackend().command_for("shutdown")[1:]
+    results["legacy"] = dict(prepare_ms=0.0, **measure(lambda: subprocess.run(legacy_argv, check=True), repeats))
+    return results
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    print(f"{'backend':<16} {'prepare ms':>11} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, result in run(args.repeats).items():
+        print(f"{name:<16} {result['prepare_ms']:>11.3f} {result['p50_ms']:>8.3f} "
+              f"{result['p95_ms']:>8.3f} {result['max_ms']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: control socket round-trip latency with many concurrent clients.
+
+Starts a ControlServer in this process with a status handler like the app's,
+then has 1, 10 and 100 client threads issue requests concurrently and reports
+the latency percentiles and total throughput.
+
+Usage:
+    python benchmarks/bench_control.py [--requests N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from control_server import ControlClient, ControlServer, UNIX_SOCKETS
+from timer_engine import DeadlineTimer
+
+CLIENT_COUNTS = [1, 10, 100]
+
+
+def percentile(samples, fraction):
+    """Return the given percentile of an already sorted list."""
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def run_clients(path, clients, requests_per_client):
+    """
+    Run concurrent clients against the server.
+
+    Returns:
+        tuple: (sorted latencies in ms, wall time in seconds)
+    """
+    latencies = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(clients + 1)
+
+    def client_body():
+        local = []
+        with ControlClient(path) as client:
+            start_barrier.wait()
+            for _ in range(requests_per_client):
+                started = time.perf_counter()
+                client.call("status")
+                local.append((time.perf_counter() - started) * 1000.0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client_body) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), time.perf_counter() - started
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000, help="total requests per round")
+    args = parser.parse_args()
+
+    deadline = DeadlineTimer(3600)
+    path = os.path.join(tempfile.mkdtemp(), "bench.sock" if UNIX_SOCKETS else "bench.port")
+    server = ControlServer({"status": lambda: {"remaining_seconds": deadline.remaining()}}, path)
+    server.start()
+    try:
+        print(f"{'clients':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>10}")
+        for clients in CLIENT_COUNTS:
+            latencies, wall = run_clients(path, clients, max(1, args.requests // clients))
+            print(f"{clients:>8} {percentile(latencies, 0.5):>8.3f} {percentile(latencies, 0.95):>8.3f} "
+                  f"{percentile(latencies, 0.99):>8.3f} {len(latencies) / wall:>10.0f}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
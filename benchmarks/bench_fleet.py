@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to dispatch a fleet schedule versus fleet size.
+
+Stand-in agents are real ControlServers (the agent side of --agent) on
+loopback ports, each answering "schedule" after a simulated network and
+handler delay. The controller sends one staggered schedule to all of them,
+sequentially (concurrency 1) and with the default bounded concurrency; a
+last row adds unreachable hosts to show that their retries do not hold up
+the rest of the fleet.
+
+Usage:
+    python benchmarks/bench_fleet.py [--sizes 10 50 200] [--latency MS]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from control_server import ControlServer
+from fleet import CONCURRENCY, FleetController, Host
+
+SIZES = (10, 50, 200, 500)
+
+# Simulated round trip plus handler time per request (ms)
+LATENCY_MS = 10.0
+
+# Share of hosts that refuse connections in the "unreachable" row
+DOWN_FRACTION = 0.05
+
+TOKEN = "benchmark"
+
+
+def start_agents(count, latency):
+    """
+    Start stand-in agents on loopback.
+
+    Returns:
+        list: (ControlServer, Host) pairs
+    """
+    async def schedule(seconds):
+        await asyncio.sleep(latency)
+        return {"running": True, "remaining_seconds": seconds}
+
+    agents = []
+    for _ in range(count):
+        server = ControlServer({"schedule": schedule}, address=("127.0.0.1", 0), token=TOKEN)
+        if not server.start():
+            raise OSError("cannot start a stand-in agent")
+        agents.append((server, Host("127.0.0.1", server.address[1])))
+    return agents
+
+
+def closed_port():
+    """Return a loopback port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_dispatch(hosts, concurrency):
+    """
+    Send one staggered schedule to every host.
+
+    Returns:
+        dict: wall time and per-host latency in ms, plus failures
+    """
+    controller = FleetController(hosts, TOKEN, concurrency=concurrency, retries=2, backoff=0.25)
+    started = time.perf_counter()
+    results = controller.schedule(3600, stagger=2)
+    wall = time.perf_counter() - started
+    latencies = sorted(result.elapsed * 1000.0 for result in results if result.ok)
+    return {
+        "hosts": len(hosts),
+        "dispatch_ms": wall * 1000.0,
+        "p95_host_ms": latencies[int(len(latencies) * 0.95)] if latencies else None,
+        "failed": sum(not result.ok for result in results),
+    }
+
+
+def run(sizes=SIZES, latency_ms=LATENCY_MS):
+    """
+    Measure dispatch time for each fleet size.
+
+    Returns:
+        dict: "SIZE/MODE" -> timings
+    """
+    agents = start_agents(max(sizes), latency_ms / 1000.0)
+    try:
+        results = {}
+        for size in sizes:
+            hosts = [host for _, host in agents[:size]]
+            results[f"{size}/sequential"] = time_dispatch(hosts, 1)
+            results[f"{size}/concurrent"] = time_dispatch(hosts, CONCURRENCY)
+
+        size = max(sizes)
+        down = [Host("127.0.0.1", closed_port()) for _ in range(max(1, int(size * DOWN_FRACTION)))]
+        results[f"{size}/unreachable"] = time_dispatch([host for _, host in agents[:size]] + down, CONCURRENCY)
+        return results
+    finally:
+        for server, _ in agents:
+            server.stop()
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--latency", type=float, default=LATENCY_MS, metavar="MS")
+    args = parser.parse_args()
+
+    print(f"{'fleet':<18} {'hosts':>6} {'dispatch ms':>12} {'p95 host ms':>12} {'failed':>7}")
+    for name, result in run(args.sizes, args.latency).items():
+        p95 = f"{result['p95_host_ms']:.1f}" if result["p95_host_ms"] is not None else "-"
+        print(f"{name:<18} {result['hosts']:>6} {result['dispatch_ms']:>12.1f} {p95:>12} {result['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: next-occurrence computation for recurring schedules.
+
+Computes the next 10,000 firings of sparse and dense cron rules with the
+bitset-based RecurrenceRule, and compares a few firings against a naive
+minute-by-minute scan.
+
+Usage:
+    python benchmarks/bench_recurrence.py
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recurrence import RecurrenceRule
+
+FIRINGS = 10000
+START = datetime(2025, 1, 1)
+
+RULES = [
+    ("weekdays 22:00", "0 22 * * 1-5"),
+    ("quarterly 03:15", "15 3 1 */3 *"),
+    ("13th or Friday", "0 0 13 * 5"),
+    ("every 15 minutes in office hours", "*/15 9-17 * * 1-5"),
+]
+
+
+def naive_next_after(rule, after):
+    """Reference implementation that steps one minute at a time."""
+    current = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    while True:
+        if rule.matches(current):
+            return current
+        current += timedelta(minutes=1)
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+    print(f"{'rule':<36} {'firings':>8} {'total ms':>10} {'us/firing':>10}")
+    for name, expression in RULES:
+        rule = RecurrenceRule(expression)
+        started = time.perf_counter()
+        firings = list(rule.iter_from(START, FIRINGS))
+        elapsed = time.perf_counter() - started
+        print(f"{name:<36} {len(firings):>8} {elapsed * 1000:>10.1f} {elapsed / len(firings) * 1e6:>10.2f}")
+
+    # Minute stepping for comparison (only a few firings: it is very slow)
+    rule = RecurrenceRule("15 3 1 */3 *")
+    started = time.perf_counter()
+    current = START
+    for _ in range(3):
+        current = naive_next_after(rule, current)
+    naive = (time.perf_counter() - started) / 3
+    print(f"{'quarterly 03:15 (minute stepping)':<36} {3:>8} {naive * 3000:>10.1f} {naive * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
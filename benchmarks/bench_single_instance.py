@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of the single-instance check as the process table grows.
+
+Compares the old approach (read a PID file, then walk every process and read
+its name and command line, as psutil.process_iter(['pid', 'name', 'cmdline'])
+does) with the advisory-lock check in single_instance.py.
+
+The process table is simulated: each entry costs one read of this process's
+/proc cmdline (or an equivalent small file elsewhere), which is what
+process_iter pays per process. If psutil is installed, a real scan of this
+host's process table is timed as well.
+
+Usage:
+    python benchmarks/bench_single_instance.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from single_instance import InstanceLock
+
+TABLE_SIZES = [100, 1000, 5000, 20000]
+REPEATS = 20
+
+# Per-process file read that stands in for psutil's name/cmdline lookup
+PROBE_FILE = "/proc/self/cmdline" if os.path.exists("/proc/self/cmdline") else __file__
+
+
+def legacy_scan(table_size, wanted_pid):
+    """Walk a simulated process table looking for one PID, reading each entry."""
+    for pid in range(table_size):
+        with open(PROBE_FILE, "rb") as f:
+            cmdline = f.read()
+        if pid == wanted_pid and b"shutdownscheduler" in cmdline.lower():
+            return True
+    return False
+
+
+def time_call(function, repeats=REPEATS):
+    """Return the median wall time of function() in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return sorted(samples)[len(samples) // 2]
+
+
+def run(table_sizes=TABLE_SIZES):
+    """
+    Measure the legacy scan and the lock check.
+
+    Returns:
+        dict: Timings in milliseconds (lock_held_ms, lock_free_ms,
+        legacy_scan_ms per table size, and real_process_iter_ms if psutil
+        is installed)
+    """
+    lock_path = os.path.join(tempfile.mkdtemp(), "bench.lock")
+
+    # Another process holds the lock, as a running instance would
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sys, time; sys.path.insert(0, sys.argv[1]);"
+         "from single_instance import InstanceLock;"
+         "InstanceLock(sys.argv[2]).acquire(); print('READY', flush=True); time.sleep(600)",
+         ROOT, lock_path],
+        stdout=subprocess.PIPE, text=True
+    )
+    holder.stdout.readline()
+    try:
+        rejected = time_call(lambda: InstanceLock(lock_path).acquire(), repeats=200)
+    finally:
+        holder.kill()
+        holder.wait()
+
+    def acquire_and_release():
+        lock = InstanceLock(lock_path)
+        lock.acquire()
+        lock.release()
+    uncontended = time_call(acquire_and_release, repeats=200)
+
+    results = {
+        "lock_held_ms": rejected,
+        "lock_free_ms": uncontended,
+        "legacy_scan_ms": {
+            str(size): time_call(lambda: legacy_scan(size, size - 1), repeats=5) for size in table_sizes
+        },
+    }
+
+    try:
+        import psutil
+    except ImportError:
+        return results
+    results["real_process_iter_ms"] = time_call(
+        lambda: list(psutil.process_iter(['pid', 'name', 'cmdline'])), repeats=5
+    )
+    results["real_process_count"] = len(psutil.pids())
+    return results
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+    results = run()
+
+    print(f"{'processes':>10} {'legacy scan ms':>15} {'lock (held) ms':>15} {'lock (free) ms':>15}")
+    for size, legacy in results["legacy_scan_ms"].items():
+        print(f"{size:>10} {legacy:>15.2f} {results['lock_held_ms']:>15.4f} {results['lock_free_ms']:>15.4f}")
+
+    if "real_process_iter_ms" not in results:
+        print("psutil not installed: skipping real process_iter scan")
+        return
+    print(f"real process_iter over {results['real_process_count']} processes: "
+          f"{results['real_process_iter_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
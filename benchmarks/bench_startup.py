@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold-start time and resident memory, headless versus GUI.
+
+"gui" is the GUI up to its first paint, with the tray deferred until after
+the window is shown; "gui-eager-tray" loads pystray and PIL and builds the
+tray icon before the first paint, as the GUI used to. Each entry point is started in a fresh interpreter. The time until it reports
+that it is ready and its resident set size at that moment are recorded,
+then the process is killed. RSS is read from /proc on Linux or with psutil
+where available.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READY_MARKER = "READY"
+
+# Entry points to compare: name -> Python code printing READY once started
+ENTRY_POINTS = {
+    "headless": (
+        "import io, headless\n"
+        "scheduler = headless.HeadlessScheduler(dry_run=True, out=io.StringIO())\n"
+        "scheduler.arm(3600); scheduler.timer_queue.start()\n"
+        "print('READY', flush=True); scheduler.fired.wait()\n"
+    ),
+    "gui": (
+        "import enhanced_shutdown_timer\n"
+        "app = enhanced_shutdown_timer.ShutdownScheduler(); app.root.update()\n"
+        "print('READY', flush=True); app.run()\n"
+    ),
+    # The GUI as it started before the tray was deferred: pystray and PIL
+    # imported up front and the tray icon built before the first paint
+    "gui-eager-tray": (
+        "import enhanced_shutdown_timer\n"
+        "enhanced_shutdown_timer.load_tray_modules()\n"
+        "app = enhanced_shutdown_timer.ShutdownScheduler(); app.setup_system_tray()\n"
+        "app.root.update()\n"
+        "print('READY', flush=True); app.run()\n"
+    ),
+}
+
+
+def resident_memory_kb(pid):
+    """
+    Get the resident set size of a process.
+
+    Returns:
+        int or None: RSS in kilobytes, or None if it cannot be measured
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss // 1024
+    except Exception:
+        return None
+
+
+def measure(code):
+    """
+    Start one entry point and measure it.
+
+    Returns:
+        dict: startup_ms and rss_kb, or error if it did not become ready
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    try:
+        line = process.stdout.readline()
+        elapsed = time.perf_counter() - started
+        if line.strip() != READY_MARKER:
+            process.kill()
+            error = process.stderr.read().strip().splitlines()
+            return {"error": error[-1] if error else "exited before becoming ready"}
+        return {"startup_ms": elapsed * 1000.0, "rss_kb": resident_memory_kb(process.pid)}
+    finally:
+        process.kill()
+        process.wait()
+
+
+def run(runs=5):
+    """
+    Measure every entry point.
+
+    Returns:
+        dict: name -> {startup_ms (median), rss_kb (max), runs} or {error}
+    """
+    results = {}
+    for name, code in ENTRY_POINTS.items():
+        samples = [measure(code) for _ in range(runs)]
+        failed = [r for r in samples if "error" in r]
+        if failed:
+            results[name] = {"error": failed[0]["error"]}
+            continue
+        results[name] = {
+            "startup_ms": sorted(r["startup_ms"] for r in samples)[len(samples) // 2],
+            "rss_kb": max(r["rss_kb"] or 0 for r in samples),
+            "runs": runs,
+        }
+    return results
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'entry point':<14} {'startup ms (median)':>20} {'RSS KB':>10}")
+    for name, result in run(args.runs).items():
+        if "error" in result:
+            print(f"{name:<14} unavailable: {result['error']}")
+            continue
+        print(f"{name:<14} {result['startup_ms']:>20.1f} {result['rss_kb']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold vs warm startup work covered by the startup cache.
+
+Cold runs detect the date format (setlocale plus a strftime probe) and render
+the tray icon and every progress ring frame; warm runs load the same values
+from a cache file written by the cold run. The icon and frame rows need
+Pillow and are skipped without it.
+
+Usage:
+    python benchmarks/bench_startup_cache.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from startup_cache import StartupCache, detect_date_format
+
+REPEATS = 20
+
+
+def time_call(function, repeats=REPEATS):
+    """Return the median wall time of function() in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+    path = os.path.join(tempfile.mkdtemp(), "startup_cache.json")
+
+    # Populate the cache as a first launch would
+    cache = StartupCache("bench", path)
+    cache.date_format()
+    try:
+        from tray_icons import TrayIconCache, decode_png, draw_clock, encode_png
+    except ImportError:
+        tray_icons = False
+    else:
+        tray_icons = True
+        cache.set_bytes("tray_icon_png", encode_png(draw_clock()))
+        frames = TrayIconCache()
+        frames.prerender()
+        cache.set_bytes_map("tray_frames", frames.export_frames())
+    cache.save()
+
+    rows = [(
+        "date format",
+        time_call(detect_date_format),
+        time_call(lambda: StartupCache("bench", path).date_format()),
+    )]
+    if tray_icons:
+        rows.append((
+            "tray icon",
+            time_call(draw_clock),
+            time_call(lambda: decode_png(StartupCache("bench", path).get_bytes("tray_icon_png"))),
+        ))
+        rows.append((
+            "progress frames",
+            time_call(lambda: TrayIconCache().prerender(), repeats=5),
+            time_call(lambda: TrayIconCache().load_frames(
+                StartupCache("bench", path).get_bytes_map("tray_frames")), repeats=5),
+        ))
+
+    print(f"{'item':>16} {'cold ms':>10} {'warm ms':>10}")
+    for name, cold, warm in rows:
+        print(f"{name:>16} {cold:>10.3f} {warm:>10.3f}")
+    if not tray_icons:
+        print("Pillow not installed: skipping tray icon rows")
+    print(f"cache file: {os.path.getsize(path)} bytes")
+
+
+if __name__ == "__main__":
+    main()
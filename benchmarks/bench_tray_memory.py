@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: resident memory of the GUI during a long countdown, shown and in the tray.
+
+Each row starts the GUI in a fresh interpreter, arms a 10-hour countdown
+(dry run, without touching the timer journal), lets it run for a while
+with its display refreshes and then reads the resident set size.
+
+"before" rows build all four settings frames up front and only withdraw
+the window when it goes to the tray, as the GUI did before the inactive
+frames were built on demand. "after" rows build only the selected frame;
+"low-memory-tray" also destroys the window's widgets as --low-memory-tray
+does. The window is withdrawn directly, so no tray host is needed, but a
+display is (run under xvfb-run on a headless machine).
+
+Usage:
+    python benchmarks/bench_tray_memory.py [--runs N] [--hold SECONDS]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_startup import measure
+
+# Seconds the countdown runs before memory is read
+HOLD_SECONDS = 10.0
+
+COUNTDOWN_SECONDS = 10 * 3600
+
+# Extra setup per row, run after the app is created
+SCENARIOS = {
+    "before/window": "build_all_frames()\n",
+    "before/tray": "build_all_frames(); app.root.withdraw()\n",
+    "after/window": "",
+    "after/tray": "app.root.withdraw()\n",
+    "after/low-memory-tray": "app.root.withdraw(); app.tear_down_window()\n",
+}
+
+CHILD_CODE = (
+    "import enhanced_shutdown_timer\n"
+    "app = enhanced_shutdown_timer.ShutdownScheduler(dry_run=True)\n"
+    "app.journal = None\n"
+    "def build_all_frames():\n"
+    "    for mode in enhanced_shutdown_timer.MODE_PROMPTS:\n"
+    "        app.get_mode_frame(mode)\n"
+    "    app.show_mode_frame(app.mode_var.get())\n"
+    "app.arm_countdown({countdown})\n"
+    "app.root.update()\n"
+    "{setup}"
+    "app.root.after({hold_ms}, lambda: print('READY', flush=True))\n"
+    "app.run()\n"
+)
+
+
+def run(runs=3, hold=HOLD_SECONDS):
+    """
+    Measure every scenario.
+
+    Returns:
+        dict: name -> {rss_kb (median), runs} or {error}
+    """
+    results = {}
+    for name, setup in SCENARIOS.items():
+        code = CHILD_CODE.format(countdown=COUNTDOWN_SECONDS, setup=setup, hold_ms=int(hold * 1000))
+        samples = [measure(code) for _ in range(runs)]
+        failed = [r for r in samples if "error" in r]
+        if failed:
+            results[name] = {"error": failed[0]["error"]}
+            continue
+        results[name] = {
+            "rss_kb": sorted(r["rss_kb"] or 0 for r in samples)[len(samples) // 2],
+            "runs": runs,
+        }
+    return results
+
+
+def main():
+    """Run the benchmark and print a table of results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--hold", type=float, default=HOLD_SECONDS, metavar="SECONDS")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<24} {'RSS KB (median)':>16}")
+    for name, result in run(args.runs, args.hold).items():
+        if "error" in result:
+            print(f"{name:<24} unavailable: {result['error']}")
+            continue
+        print(f"{name:<24} {result['rss_kb']:>16}")
+
+
+if __name__ == "__main__":
+    main()
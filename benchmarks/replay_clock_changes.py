@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Replay scheduled shutdowns through suspends and clock jumps.
+
+Each schedule is a "shut down at" deadline armed by the real
+HeadlessScheduler.arm_at() on a simulated clock, its timer queue driven by
+a SimulatedDriver and its ClockWatcher checked by hand. Before it fires,
+the simulated machine is suspended for random gaps (the wall clock moves
+on, the monotonic clock stands still) and the wall clock is stepped
+forwards and backwards (NTP or a user setting the time); after each
+disturbance the watcher is checked, as the kernel's timerfd would wake it.
+The scheduler's main loop is not run: a schedule fires when the deadline
+wakes it (HeadlessScheduler.fired).
+
+Every firing is compared with an independently computed expected time: the
+chosen time itself, or the moment of resume when the machine was asleep at
+the chosen time. The old behaviour (a fixed interval computed when the
+timer was armed) is replayed alongside to count the schedules it got wrong.
+
+Exits non-zero and prints the first mismatches if any schedule fires at the
+wrong time.
+
+Usage:
+    python benchmarks/replay_clock_changes.py [--schedules N] [--seed N]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import SimulatedClock, SimulatedDriver
+from clock_watch import ClockWatcher
+from headless import HeadlessScheduler
+from timer_engine import DeadlineTimer, TimerQueue
+
+# Tolerance when comparing firing times (seconds)
+EPSILON = 1e-6
+
+
+def random_disturbances(rng, lead):
+    """
+    Pick up to three disturbances before (and sometimes after) the deadline.
+
+    Args:
+        lead: Seconds from arming to the chosen time
+
+    Returns:
+        list: (awake seconds after arming, "suspend" or "jump", wall-clock change)
+    """
+    events = []
+    for _ in range(rng.randint(1, 3)):
+        at = rng.uniform(0, lead * 1.2)
+        if rng.random() < 0.5:
+            events.append((at, "suspend", rng.choice([rng.uniform(10, 600), rng.uniform(600, 12 * 3600)])))
+        else:
+            size = rng.choice([rng.uniform(1, 120), rng.uniform(120, 3 * 3600)])
+            events.append((at, "jump", size if rng.random() < 0.5 else -size))
+    return sorted(events)
+
+
+def expected_fire(start_wall, target, disturbances):
+    """
+    Reference wall-clock firing time.
+
+    The wall clock advances with awake time plus every disturbance; the
+    shutdown fires at the first awake moment the wall clock reads target
+    or later.
+
+    Returns:
+        float: Epoch seconds
+    """
+    awake = 0.0
+    wall = start_wall
+    for at, _, change in disturbances:
+        if wall + (at - awake) >= target:
+            break
+        wall += at - awake
+        awake = at
+        wall += change
+        if wall >= target:
+            return wall  # Passed while suspended (or skipped by a jump): fires on resume
+    return target
+
+
+def replay(now, lead, disturbances):
+    """
+    Run one schedule with the new and the old deadline.
+
+    Returns:
+        tuple: (wall time the scheduler fired, wall time the old fixed interval
+            fired, target wall time)
+    """
+    clock = SimulatedClock(now)
+    driver = SimulatedDriver(clock)
+    queue = driver.add_queue(TimerQueue(clock=clock.monotonic))
+    target = clock.time() + lead
+    fired = {}
+
+    scheduler = HeadlessScheduler(grace_seconds=0, dry_run=True, out=io.StringIO(), clock=clock)
+    driver.add_queue(scheduler.timer_queue)
+    scheduler.clock_watcher = ClockWatcher(scheduler.on_clock_jump, clock=clock)  # Checked by hand instead of started
+    scheduler.arm_at(datetime.fromtimestamp(target))
+
+    old = DeadlineTimer(lead, clock=clock.monotonic)
+    queue.schedule_at(old.deadline, lambda entry: fired.setdefault("interval", clock.time()), kind="interval")
+
+    def disturb(kind, change):
+        if kind == "suspend":
+            clock.suspend(change)
+        else:
+            clock.jump_wall(change)
+        scheduler.clock_watcher.check(force=True)
+
+    armed = clock.monotonic()
+    for at, kind, change in disturbances:
+        driver.after_queue.schedule_at(armed + at, lambda entry, k=kind, c=change: disturb(k, c), kind="event")
+    while driver.step():
+        if scheduler.fired.is_set():
+            fired.setdefault("wall", clock.time())
+    return fired["wall"], fired["interval"], target
+
+
+def main():
+    """Replay the schedules and report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--schedules", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = []
+    old_wrong = 0
+    disturbance_count = 0
+    started = time.process_time()
+    for _ in range(args.schedules):
+        now = datetime(2025, 1, 1) + timedelta(seconds=rng.randrange(5 * 365 * 86400))
+        lead = rng.randint(1, 48 * 60) * 60.0
+        disturbances = random_disturbances(rng, lead)
+        disturbance_count += len(disturbances)
+        fired, old_fired, target = replay(now, lead, disturbances)
+        expected = expected_fire(now.timestamp(), target, disturbances)
+        if abs(fired - expected) > EPSILON:
+            failures.append((now, lead, disturbances, fired - expected))
+        if abs(old_fired - expected) > 1.0:
+            old_wrong += 1
+    cpu = time.process_time() - started
+
+    print(f"schedules:       {args.schedules}")
+    print(f"disturbances:    {disturbance_count} suspends and clock jumps")
+    print(f"CPU time:        {cpu:.2f} s")
+    print(f"mismatches:      {len(failures)}")
+    print(f"fixed interval:  {old_wrong} schedules would have fired at the wrong time")
+    for now, lead, disturbances, error in failures[:10]:
+        print(f"  armed {now} for +{lead:.0f} s with {disturbances}: off by {error:+.3f} s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Replay thousands of random schedules on a simulated clock.
+
+Each schedule is armed the way the GUI arms it (countdown, one-off date and
+time, daily or weekdays) at a random moment between 2025 and the end of
+2030 (the year spinbox's upper limit), with extra weight on day, month and
+year boundaries. The shutdown deadline, the 30-second warning countdown and
+optionally the display ticks all run on the SimulatedClock, and every
+firing is checked against an independently computed expected time, to the
+microsecond.
+Repeating schedules are followed through several occurrences.
+
+Exits non-zero and prints the first mismatches if any schedule fires at the
+wrong time.
+
+This replay rebuilds the arming logic from the engine primitives to cover
+many random schedules cheaply; tests/test_simulated_schedules.py runs the
+real HeadlessScheduler (including its re-arming of repeating rules) on the
+same simulated clock.
+
+Display ticks (about 60 per simulated hour) dominate the cost of long
+schedules, so they are only simulated with --ticks.
+
+Usage:
+    python benchmarks/replay_schedules.py [--schedules N] [--seed N] [--ticks]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import SimulatedClock, SimulatedDriver
+from recurrence import first_firing
+from timer_engine import DeadlineTimer, GraceCountdown, TickPlanner, TimerQueue
+
+GRACE_SECONDS = 30
+LAST_YEAR = 2030
+REPEAT_OCCURRENCES = 3
+KINDS = ("countdown", "Once", "Daily", "Weekdays")
+
+# Moments just before boundaries that are easy to get wrong
+BOUNDARY_STARTS = [
+    (12, 31, 23),  # New year
+    (2, 28, 23),   # End of February (leap years included)
+    (6, 30, 23),   # End of a 30-day month
+    (1, 31, 23),   # End of a 31-day month
+]
+
+
+def random_start(rng):
+    """Pick the simulated "now" for one schedule (whole seconds)."""
+    year = rng.randint(2025, LAST_YEAR)
+    if rng.random() < 0.3:
+        month, day, hour = rng.choice(BOUNDARY_STARTS)
+        return datetime(year, month, day, hour, rng.randint(0, 59), rng.randint(0, 59))
+    start = datetime(year, 1, 1) + timedelta(seconds=rng.randrange(365 * 86400))
+    return start if start.year <= LAST_YEAR else datetime(LAST_YEAR, 12, 31, 12)
+
+
+def expected_occurrences(chosen, repeat, now, count):
+    """
+    Reference firing times, found by walking day by day.
+
+    Returns:
+        list: Up to count datetimes
+    """
+    if repeat == "Once":
+        return [chosen] if chosen > now else []
+
+    day = datetime.combine(chosen.date(), datetime.min.time()).replace(hour=chosen.hour, minute=chosen.minute)
+    found = []
+    while len(found) < count:
+        if day > now and (repeat == "Daily" or day.weekday() < 5):
+            found.append(day)
+        day += timedelta(days=1)
+    return found
+
+
+def random_schedule(rng, now):
+    """
+    Pick a schedule the GUI form could produce at now.
+
+    Returns:
+        tuple: (kind, countdown seconds or chosen datetime)
+    """
+    kind = rng.choice(KINDS)
+    if kind == "countdown":
+        hours, minutes = rng.randint(0, 23), rng.randint(0, 59)
+        return kind, (hours * 3600 + minutes * 60) or 60
+
+    # Spinboxes allow dates from now up to the end of LAST_YEAR
+    latest = min(now + timedelta(days=400), datetime(LAST_YEAR, 12, 31, 23, 59))
+    chosen = now + timedelta(minutes=rng.randint(1, max(1, int((latest - now).total_seconds() // 60))))
+    return kind, chosen.replace(second=0)
+
+
+def replay(kind, value, now, ticks=False):
+    """
+    Run one schedule on a simulated clock.
+
+    Returns:
+        tuple: (list of shutdown times, list of expected times, driver steps)
+    """
+    clock = SimulatedClock(now)
+    driver = SimulatedDriver(clock)
+    queue = driver.add_queue(TimerQueue(clock=clock.monotonic))
+    shutdowns = []
+    state = {}
+
+    def arm(seconds):
+        deadline = DeadlineTimer(seconds, clock=clock.monotonic)
+        planner = TickPlanner(clock=clock.monotonic)
+        state["deadline"] = deadline
+
+        def on_tick(entry):
+            planner.record_wakeup()
+            if not deadline.expired():
+                state["tick"] = queue.schedule_at(planner.next_wake(deadline), on_tick, kind="tick")
+
+        queue.schedule_at(deadline.deadline, on_deadline)
+        if ticks:
+            state["tick"] = queue.schedule_at(planner.next_wake(deadline), on_tick, kind="tick")
+
+    def on_deadline(entry):
+        queue.cancel(state.get("tick"))
+        GraceCountdown(GRACE_SECONDS, lambda seconds: None, on_shutdown,
+                       driver.after, driver.after_cancel, clock.monotonic).start()
+
+    def on_shutdown():
+        shutdowns.append(clock.now())
+        # A repeating schedule re-arms from the next occurrence
+        rule = state.get("rule")
+        if rule and len(shutdowns) < REPEAT_OCCURRENCES:
+            arm((rule.next_after(clock.now()) - clock.now()).total_seconds())
+
+    if kind == "countdown":
+        expected = [now + timedelta(seconds=value)]
+        arm(value)
+    else:
+        firing = first_firing(value, kind, now)
+        expected = expected_occurrences(value, kind, now, REPEAT_OCCURRENCES)
+        if firing is not None:
+            fire_at, state["rule"] = firing
+            arm((fire_at - now).total_seconds())
+
+    driver.run_until_idle()
+    return shutdowns, [moment + timedelta(seconds=GRACE_SECONDS) for moment in expected], driver.steps
+
+
+def main():
+    """Replay the schedules and report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--schedules", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ticks", action="store_true", help="also simulate the display ticks")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = []
+    firings = 0
+    steps = 0
+    simulated = 0.0
+    started = time.process_time()
+    for _ in range(args.schedules):
+        now = random_start(rng)
+        kind, value = random_schedule(rng, now)
+        shutdowns, expected, run_steps = replay(kind, value, now, args.ticks)
+        firings += len(shutdowns)
+        steps += run_steps
+        if shutdowns:
+            simulated += (shutdowns[-1] - now).total_seconds()
+        if shutdowns != expected:
+            failures.append((kind, value, now, shutdowns, expected))
+    cpu = time.process_time() - started
+
+    print(f"schedules:       {args.schedules}")
+    print(f"shutdowns:       {firings}")
+    print(f"timer events:    {steps}")
+    print(f"simulated time:  {simulated / 86400 / 365.25:.1f} years")
+    print(f"CPU time:        {cpu:.2f} s")
+    print(f"mismatches:      {len(failures)}")
+    for kind, value, now, shutdowns, expected in failures[:10]:
+        print(f"  {kind} {value} at {now}: fired {shutdowns}, expected {expected}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
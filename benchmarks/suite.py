@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: timer accuracy, wake-ups, control-path latency and startup.
+
+Runs every benchmark that needs no display (the GUI startup rows report
+"unavailable" without one; run under xvfb-run to include them) and writes
+one JSON document, so results from two builds can be compared:
+
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --output after.json --compare before.json
+
+Benchmarks:
+    drift_simulated   10-hour countdown on a simulated clock with random late
+                      wake-ups, versus the old sleep(1)-and-decrement loop
+    drift_real        short countdown on the real clock
+    wakeups           wake-ups per hour by display regime (simulated)
+    cancel_latency    cancel() and stop() until the waiter thread is idle,
+                      versus a loop that polls a flag once a second
+    instance_check    single-instance lock versus a process table scan
+    startup           time to ready and RSS of each entry point
+    action_latency    deadline to completed action for each action backend
+    load_monitor      --when-idle sampling cost over a simulated busy hour
+    process_watch     --after-exit idle cost and exit-to-trigger latency
+    fleet_dispatch    --fleet schedule dispatch time versus fleet size
+    tray_memory       GUI RSS during a long countdown, shown and in the tray
+
+Usage:
+    python benchmarks/suite.py [--quick] [--only NAME ...] [--output PATH] [--compare PATH]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bench_actions
+import bench_fleet
+import bench_single_instance
+import bench_startup
+import bench_tray_memory
+from clock import SimulatedClock, SimulatedDriver
+from load_monitor import LoadMonitor, system_load_reader
+from process_watch import ProcessWatcher, process_identity
+from timer_engine import DeadlineTimer, TickPlanner, TimerQueue
+
+SCHEMA_VERSION = 1
+
+# Upper bound of the random lateness added to every simulated wake-up
+SIMULATED_JITTER = 0.020
+
+
+def percentiles(samples):
+    """
+    Summarize samples.
+
+    Returns:
+        dict: count, p50, p95, p99 and max
+    """
+    samples = sorted(samples)
+    if not samples:
+        return {"count": 0}
+
+    def pick(fraction):
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+    return {"count": len(samples), "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": samples[-1]}
+
+
+def arm_countdown(queue, deadline, planner, on_fire=None):
+    """
+    Queue a countdown the way the app does: one deadline entry plus a
+    display tick at every visible change of the timer text.
+    """
+    state = {"tick": None}
+
+    def on_tick(entry):
+        if entry is not state["tick"]:
+            return
+        deadline.tick_drift.add(deadline.clock() - entry.deadline)
+        planner.record_wakeup()
+        if not deadline.expired():
+            state["tick"] = queue.schedule_at(planner.next_wake(deadline), on_tick, kind="tick")
+
+    def on_deadline(entry):
+        deadline.record_fire()
+        queue.cancel(state["tick"])
+        if on_fire:
+            on_fire()
+
+    queue.schedule_at(deadline.deadline, on_deadline)
+    state["tick"] = queue.schedule_at(planner.next_wake(deadline), on_tick, kind="tick")
+
+
+def simulate_countdown(duration, jitter, seed=1):
+    """
+    Run a countdown on a simulated clock where every wake-up is late by up to jitter.
+
+    Returns:
+        tuple: (DeadlineTimer, TickPlanner, wake-up count per display regime)
+    """
+    rng = random.Random(seed)
+    clock = SimulatedClock()
+    queue = TimerQueue(clock=clock.monotonic)
+    deadline = DeadlineTimer(duration, clock=clock.monotonic)
+    planner = TickPlanner(clock=clock.monotonic)
+    arm_countdown(queue, deadline, planner)
+
+    regimes = {"minute_display": 0, "second_display": 0}
+    while True:
+        entry = queue.next_entry()
+        if entry is None:
+            break
+        # The thread wakes a little after the requested time
+        clock.advance_to(entry.deadline + rng.uniform(0.0, jitter))
+        regime = "minute_display" if deadline.remaining() > 3600 else "second_display"
+        regimes[regime] += queue.run_due()
+    return deadline, planner, regimes
+
+
+def legacy_countdown_error(duration, jitter, seed=1):
+    """
+    Final lateness of the old loop: remaining -= 1 after each sleep(1).
+
+    Every late wake-up adds to the total, so the error grows with duration.
+
+    Returns:
+        float: Seconds the shutdown would start late
+    """
+    rng = random.Random(seed)
+    return sum(rng.uniform(0.0, jitter) for _ in range(int(duration)))
+
+
+def bench_drift_simulated(quick):
+    """Firing drift of a long countdown with late wake-ups (simulated)."""
+    duration = 10 * 3600
+    started = time.process_time()
+    deadline, planner, _ = simulate_countdown(duration, SIMULATED_JITTER)
+    cpu = time.process_time() - started
+    report = deadline.drift_report()
+    return {
+        "duration_s": duration,
+        "jitter_ms": SIMULATED_JITTER * 1000.0,
+        "fire_error_ms": report["fire_ms"],
+        "tick_drift_mean_ms": report["ticks"]["mean_ms"],
+        "tick_drift_max_ms": report["ticks"]["max_ms"],
+        "legacy_fire_error_ms": legacy_countdown_error(duration, SIMULATED_JITTER) * 1000.0,
+        "simulation_cpu_ms": cpu * 1000.0,
+    }
+
+
+def bench_drift_real(quick):
+    """Firing drift of a short countdown on the real clock."""
+    duration = 3.0 if quick else 10.0
+    queue = TimerQueue()
+    deadline = DeadlineTimer(duration)
+    planner = TickPlanner()
+    fired = threading.Event()
+    arm_countdown(queue, deadline, planner, fired.set)
+    queue.start()
+    fired.wait(duration + 5.0)
+    queue.stop()
+
+    report = deadline.drift_report()
+    return {
+        "duration_s": duration,
+        "fire_error_ms": report["fire_ms"],
+        "tick_drift_mean_ms": report["ticks"]["mean_ms"],
+        "tick_drift_max_ms": report["ticks"]["max_ms"],
+        "wakeups": planner.wakeups,
+        "queue_drift_max_ms": queue.drift.max * 1000.0,
+    }
+
+
+def bench_wakeups(quick):
+    """Wake-ups per hour of countdown, by display regime (simulated)."""
+    duration = 10 * 3600
+    _, planner, regimes = simulate_countdown(duration, 0.0)
+    return {
+        "duration_s": duration,
+        "wakeups_total": planner.wakeups + 1,  # Display ticks plus the deadline itself
+        "wakeups_per_hour": (planner.wakeups + 1) * 3600.0 / duration,
+        "minute_display_per_hour": regimes["minute_display"] * 3600.0 / (duration - 3600),
+        "second_display_per_hour": float(regimes["second_display"]),
+        "legacy_wakeups_per_hour": 3600.0,
+    }
+
+
+def bench_cancel_latency(quick):
+    """Time from cancelling until the worker is guaranteed idle."""
+    repeats = 50 if quick else 500
+    cancel_us = []
+    stop_ms = []
+    for _ in range(repeats):
+        queue = TimerQueue()
+        entry = queue.schedule(3600, lambda entry: None)
+        queue.start()
+        time.sleep(0.001)  # Let the waiter thread go to sleep on the deadline
+
+        started = time.perf_counter()
+        queue.cancel(entry)
+        cancel_us.append((time.perf_counter() - started) * 1e6)
+
+        started = time.perf_counter()
+        queue.stop()
+        queue._thread.join()
+        stop_ms.append((time.perf_counter() - started) * 1000.0)
+
+    # The old worker checked a flag between one-second sleeps
+    legacy_ms = []
+    for _ in range(1 if quick else 3):
+        running = [True]
+
+        def legacy_loop():
+            while running[0]:
+                time.sleep(1)
+        thread = threading.Thread(target=legacy_loop)
+        thread.start()
+        time.sleep(random.uniform(0.1, 0.9))
+        started = time.perf_counter()
+        running[0] = False
+        thread.join()
+        legacy_ms.append((time.perf_counter() - started) * 1000.0)
+
+    return {
+        "cancel_us": percentiles(cancel_us),
+        "stop_to_exit_ms": percentiles(stop_ms),
+        "legacy_stop_to_exit_ms": percentiles(legacy_ms),
+    }
+
+
+def bench_instance_check(quick):
+    """Single-instance check cost as the process table grows."""
+    sizes = [100, 1000, 5000] if quick else bench_single_instance.TABLE_SIZES
+    return bench_single_instance.run(sizes)
+
+
+def bench_startup_time(quick):
+    """Time to ready and RSS of the headless and GUI entry points."""
+    return bench_startup.run(runs=2 if quick else 5)
+
+
+def bench_action_latency(quick):
+    """Deadline-to-action latency of each shutdown action backend."""
+    return bench_actions.run(repeats=10 if quick else bench_actions.REPEATS)
+
+
+def bench_load_monitor(quick):
+    """Sampling rate and CPU cost of the --when-idle load monitor."""
+    read = system_load_reader()
+    if read is None:
+        return {"error": "load cannot be measured here"}
+    repeats = 1000 if quick else 10000
+    started = time.perf_counter()
+    for _ in range(repeats):
+        read()
+    read_us = (time.perf_counter() - started) / repeats * 1e6
+
+    # A busy hour followed by idle, on a simulated clock: counts samples
+    clock = SimulatedClock()
+    driver = SimulatedDriver(clock)
+    queue = driver.add_queue(TimerQueue(clock=clock.monotonic))
+    rng = random.Random(1)
+    busy_until = clock.monotonic() + 3600
+
+    def simulated_reader():
+        busy = clock.monotonic() < busy_until
+        return (90.0 if busy else 5.0) + rng.uniform(-5.0, 5.0), 80.0 if busy else 2.0
+    monitor = LoadMonitor(reader=simulated_reader, clock=clock.monotonic)
+    outcome = {}
+    monitor.start(queue, lambda waited, reason: outcome.update(waited=waited, reason=reason))
+    driver.run_until_idle()
+
+    samples_per_hour = monitor.samples * 3600.0 / outcome["waited"]
+    return {
+        "read_us": read_us,
+        "samples_busy_hour": monitor.samples,
+        "idle_detected_after_s": outcome["waited"] - 3600,
+        "cpu_overhead_percent": read_us * 1e-6 * samples_per_hour / 3600.0 * 100.0,
+        "fixed_rate_samples_per_hour": 3600,
+    }
+
+
+def bench_process_watch(quick):
+    """CPU used while watching idle processes, and latency from the last exit to the trigger."""
+    count = 50 if quick else 200
+    idle_seconds = 1.0 if quick else 3.0
+    children = [subprocess.Popen(["sleep", "60"]) for _ in range(count)] if os.name != "nt" else []
+    if not children:
+        return {"error": "needs a POSIX sleep command"}
+    fired = threading.Event()
+    watcher = ProcessWatcher([child.pid for child in children], fired.set)
+    try:
+        watcher.start()
+        cpu_started = time.process_time()
+        time.sleep(idle_seconds)
+        idle_cpu = time.process_time() - cpu_started
+
+        # Cost of one polling pass, as the fallback pays every POLL_INTERVAL
+        started = time.perf_counter()
+        for child in children:
+            process_identity(child.pid)
+        poll_pass_ms = (time.perf_counter() - started) * 1000.0
+
+        for child in children:
+            child.kill()
+        killed = time.perf_counter()
+        fired.wait(10)
+        latency_ms = (time.perf_counter() - killed) * 1000.0
+    finally:
+        watcher.stop()
+        for child in children:
+            child.kill()
+            child.wait()
+    return {
+        "processes": count,
+        "method": watcher.method,
+        "idle_cpu_ms_per_s": idle_cpu * 1000.0 / idle_seconds,
+        "kill_all_to_trigger_ms": latency_ms,
+        "polling_pass_ms": poll_pass_ms,
+    }
+
+
+def bench_fleet_dispatch(quick):
+    """Time to send a staggered schedule to loopback stand-in agents, by fleet size."""
+    return bench_fleet.run((10, 50) if quick else (10, 50, 200))
+
+
+def bench_tray_memory_use(quick):
+    """RSS of the GUI during a countdown, with eager or lazy frames and each tray mode."""
+    return bench_tray_memory.run(runs=1 if quick else 3, hold=3.0 if quick else bench_tray_memory.HOLD_SECONDS)
+
+
+BENCHMARKS = {
+    "drift_simulated": bench_drift_simulated,
+    "drift_real": bench_drift_real,
+    "wakeups": bench_wakeups,
+    "cancel_latency": bench_cancel_latency,
+    "instance_check": bench_instance_check,
+    "startup": bench_startup_time,
+    "action_latency": bench_action_latency,
+    "load_monitor": bench_load_monitor,
+    "process_watch": bench_process_watch,
+    "fleet_dispatch": bench_fleet_dispatch,
+    "tray_memory": bench_tray_memory_use,
+}
+
+
+def git_revision():
+    """Return the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def flatten(results, prefix=""):
+    """Flatten nested results into {"bench.metric.sub": number}."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline, current):
+    """Print every metric present in both runs with its relative change."""
+    old = flatten(baseline.get("results", {}))
+    new = flatten(current["results"])
+    print(f"\n{'metric':<56} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name in sorted(set(old) & set(new)):
+        change = f"{(new[name] - old[name]) / old[name] * 100:+.1f}%" if old[name] else "n/a"
+        print(f"{name:<56} {old[name]:>12.4g} {new[name]:>12.4g} {change:>9}")
+
+
+def main():
+    """Run the selected benchmarks and write the JSON report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="fewer repeats and shorter real-time runs")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON report to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "results": {},
+    }
+    for name in args.only or BENCHMARKS:
+        print(f"running {name}...", file=sys.stderr)
+        report["results"][name] = BENCHMARKS[name](args.quick)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
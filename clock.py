@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Clock abstraction for the Shutdown Scheduler.
+
+Everything that reads the time (the timer engine, the shutdown warning
+countdown and the scheduling code in the GUI and headless front ends) takes a
+clock object instead of calling time.monotonic(), time.time() or
+datetime.now() directly. SYSTEM_CLOCK is the real one. SimulatedClock only
+moves when told to, and SimulatedDriver jumps it straight to the next due
+timer, so multi-hour schedules replay in microseconds with exact,
+reproducible fire times.
+
+Example:
+    clock = SimulatedClock(datetime(2029, 12, 31, 23, 0))
+    driver = SimulatedDriver(clock)
+    queue = driver.add_queue(TimerQueue(clock=clock.monotonic))
+    queue.schedule(7200, on_fire)
+    driver.run_until_idle()  # clock.now() is 2030-01-01 01:00 afterwards
+
+Author: AI Assistant
+License: MIT
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from timer_engine import TimerQueue
+
+
+class SystemClock:
+    """The real clock."""
+
+    def monotonic(self):
+        """Monotonic seconds for measuring intervals (time.monotonic)."""
+        return time.monotonic()
+
+    def time(self):
+        """Wall-clock seconds since the epoch (time.time)."""
+        return time.time()
+
+    def now(self):
+        """Local wall-clock date and time (datetime.now)."""
+        return datetime.now()
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class SimulatedClock:
+    """
+    Clock that stands still until advanced.
+
+    The wall clock runs in lockstep with the monotonic clock and can also be
+    moved on its own, like a user changing the system time (jump_wall) or
+    the machine sleeping (suspend). The simulated wall clock has no daylight
+    saving transitions.
+    """
+
+    def __init__(self, start=datetime(2025, 1, 1), monotonic_start=1000.0):
+        """
+        Initialize the clock.
+
+        Args:
+            start: Wall-clock date and time at monotonic_start
+            monotonic_start: Initial monotonic reading
+        """
+        self.start = start
+        self.monotonic_start = monotonic_start
+        self._monotonic = monotonic_start
+        self._wall_offset = 0.0
+
+    def monotonic(self):
+        """Current simulated monotonic time."""
+        return self._monotonic
+
+    def time(self):
+        """Current simulated wall-clock time in epoch seconds."""
+        return self.start.timestamp() + self._elapsed_wall()
+
+    def now(self):
+        """Current simulated local date and time."""
+        return self.start + timedelta(seconds=self._elapsed_wall())
+
+    def _elapsed_wall(self):
+        """Wall-clock seconds since start."""
+        return self._monotonic - self.monotonic_start + self._wall_offset
+
+    def advance(self, seconds):
+        """Move both clocks forward."""
+        if seconds < 0:
+            raise ValueError("The monotonic clock cannot go backwards")
+        self._monotonic += seconds
+
+    def advance_to(self, monotonic):
+        """Move both clocks forward to a monotonic time (no-op if it has passed)."""
+        self._monotonic = max(self._monotonic, monotonic)
+
+    def jump_wall(self, seconds):
+        """Move only the wall clock (forwards or backwards)."""
+        self._wall_offset += seconds
+
+    def suspend(self, seconds):
+        """
+        Sleep the simulated machine: the wall clock moves on, the monotonic
+        clock stands still (as CLOCK_MONOTONIC does on Linux).
+        """
+        if seconds < 0:
+            raise ValueError("Cannot suspend for a negative time")
+        self._wall_offset += seconds
+
+
+class SimulatedDriver:
+    """
+    Runs timer queues and Tk-style after() callbacks on a SimulatedClock.
+
+    Each step advances the clock to the earliest pending deadline across all
+    queues and fires what is due, so the cost of a run depends on the number
+    of timer events, not on the simulated duration.
+    """
+
+    def __init__(self, clock):
+        """
+        Initialize the driver.
+
+        Args:
+            clock: SimulatedClock to advance
+        """
+        self.clock = clock
+        self.after_queue = TimerQueue(clock=clock.monotonic)  # Stands in for the Tk event loop
+        self.queues = [self.after_queue]
+        self.steps = 0
+
+    def add_queue(self, queue):
+        """
+        Drive a TimerQueue (created with clock=clock.monotonic).
+
+        Returns:
+            TimerQueue: The queue, for chaining
+        """
+        self.queues.append(queue)
+        return queue
+
+    def after(self, delay_ms, callback, *args):
+        """Tk's widget.after(): run callback(*args) delay_ms from now."""
+        return self.after_queue.schedule(delay_ms / 1000.0, lambda entry: callback(*args), kind="after")
+
+    def after_cancel(self, handle):
+        """Tk's widget.after_cancel()."""
+        self.after_queue.cancel(handle)
+
+    def next_deadline(self):
+        """
+        Get the earliest pending deadline over all queues.
+
+        Returns:
+            float or None: Monotonic time, or None if nothing is pending
+        """
+        deadlines = [entry.deadline for entry in map(TimerQueue.next_entry, self.queues) if entry]
+        return min(deadlines) if deadlines else None
+
+    def step(self, limit=None):
+        """
+        Advance to the next deadline (not past limit) and fire what is due.
+
+        Args:
+            limit: Monotonic time not to advance beyond
+
+        Returns:
+            bool: False if nothing was due before limit
+        """
+        deadline = self.next_deadline()
+        if deadline is None or (limit is not None and deadline > limit):
+            return False
+        self.clock.advance_to(deadline)
+        for queue in self.queues:
+            queue.run_due()
+        self.steps += 1
+        return True
+
+    def run_until(self, monotonic):
+        """Fire everything due up to a monotonic time, then move the clock there."""
+        while self.step(limit=monotonic):
+            pass
+        self.clock.advance_to(monotonic)
+
+    def run_for(self, seconds):
+        """Fire everything due in the next seconds of simulated time."""
+        self.run_until(self.clock.monotonic() + seconds)
+
+    def run_until_idle(self, max_steps=10000000):
+        """
+        Fire timers until nothing is pending.
+
+        Raises:
+            RuntimeError: If the queues are still busy after max_steps steps
+                (e.g. a timer that keeps re-arming itself)
+        """
+        for _ in range(max_steps):
+            if not self.step():
+                return
+        raise RuntimeError(f"Still busy after {max_steps} steps")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Wall-clock change detection for the Shutdown Scheduler.
+
+Deadlines live on the monotonic clock, which is right for "in 2 hours" but
+not for "at 22:00": the monotonic clock does not follow NTP steps or a user
+setting the time, and on Linux it stands still while the machine is
+suspended. Scheduled deadlines therefore keep their wall-clock target
+(timer_engine.WallDeadlineTimer) and are re-derived whenever the offset
+between the wall clock and the monotonic clock changes.
+
+On Linux a timerfd on CLOCK_REALTIME armed with TFD_TIMER_CANCEL_ON_SET is
+cancelled by the kernel whenever the clock is set or the machine resumes
+from suspend, so one thread blocks in poll() and wakes only on a real
+change. Elsewhere, or if the timerfd fails, the offset is compared every
+CHECK_INTERVAL seconds.
+Time zone and daylight saving changes do not move the wall clock (it counts
+UTC seconds); they are handled by converting the chosen local time to a
+timestamp when the deadline is armed.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import ctypes
+import errno
+import os
+import select
+import sys
+import threading
+import time
+
+from clock import SYSTEM_CLOCK
+
+# Seconds between offset checks without timerfd
+CHECK_INTERVAL = 30.0
+
+# Offset changes below this are ignored in polling mode (NTP slews the clock slowly)
+JUMP_TOLERANCE = 1.0
+
+CLOCK_REALTIME = 0
+TFD_CLOEXEC = 0o2000000
+TFD_TIMER_ABSTIME = 1
+TFD_TIMER_CANCEL_ON_SET = 2
+
+
+class _TimeSpec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class _ITimerSpec(ctypes.Structure):
+    _fields_ = [("it_interval", _TimeSpec), ("it_value", _TimeSpec)]
+
+
+def _arm_timerfd(fd, libc):
+    """Arm fd far in the future so that only clock changes wake it."""
+    far = int(time.time()) + 10 * 365 * 86400
+    if libc is None:
+        os.timerfd_settime(fd, flags=os.TFD_TIMER_ABSTIME | os.TFD_TIMER_CANCEL_ON_SET, initial=far)
+        return
+    spec = _ITimerSpec()
+    spec.it_value.tv_sec = far
+    if libc.timerfd_settime(fd, TFD_TIMER_ABSTIME | TFD_TIMER_CANCEL_ON_SET, ctypes.byref(spec), None) != 0:
+        raise OSError(ctypes.get_errno(), "timerfd_settime failed")
+
+
+def open_clock_change_fd():
+    """
+    Open a timerfd that becomes readable when the wall clock is set.
+
+    Returns:
+        tuple or None: (fd, libc or None for the os module's timerfd
+            functions), or None where timerfd is not available
+    """
+    if hasattr(os, "timerfd_create"):  # Python 3.13+
+        libc = None
+        fd = os.timerfd_create(time.CLOCK_REALTIME, flags=os.TFD_CLOEXEC)
+    elif sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.timerfd_create(CLOCK_REALTIME, TFD_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+    else:
+        return None
+    try:
+        _arm_timerfd(fd, libc)
+    except OSError:
+        os.close(fd)  # Kernel without TFD_TIMER_CANCEL_ON_SET (before 3.0)
+        return None
+    return fd, libc
+
+
+class ClockWatcher:
+    """
+    Reports jumps of the wall clock relative to the monotonic clock.
+
+    on_jump runs on the watcher thread with the size of the jump in seconds
+    (positive when the wall clock moved forward, e.g. after a suspend).
+    """
+
+    def __init__(self, on_jump, clock=SYSTEM_CLOCK, check_interval=CHECK_INTERVAL):
+        """
+        Initialize the watcher (does not start it).
+
+        Args:
+            on_jump: Called with the jump in seconds
+            clock: Clock with time() and monotonic()
+            check_interval: Seconds between checks in polling mode
+        """
+        self.on_jump = on_jump
+        self.clock = clock
+        self.check_interval = check_interval
+        self.offset = clock.time() - clock.monotonic()
+        self.jumps = 0
+        self.method = None
+        self._stop = threading.Event()
+        self._wake_read, self._wake_write = (None, None)
+        self._wake_lock = threading.Lock()  # The thread closes the wake pipe when it ends
+        self._thread = None
+
+    def start(self):
+        """Start watching on a background thread."""
+        self.offset = self.clock.time() - self.clock.monotonic()
+        timerfd = open_clock_change_fd()
+        if timerfd:
+            self.method = "timerfd"
+            self._wake_read, self._wake_write = os.pipe()
+            target = lambda: self._run_timerfd(*timerfd)
+        else:
+            self.method = "polling"
+            target = self._run_polling
+        self._thread = threading.Thread(target=target, name="clock-watch", daemon=True)
+        self._thread.start()
+
+    def check(self, force=False):
+        """
+        Compare the wall/monotonic offset with the last one and report a jump.
+
+        Args:
+            force: Report even a change below JUMP_TOLERANCE (the kernel said
+                the clock was set)
+
+        Returns:
+            float: The jump in seconds (0.0 if none was reported)
+        """
+        offset = self.clock.time() - self.clock.monotonic()
+        jump = offset - self.offset
+        if abs(jump) < JUMP_TOLERANCE and not (force and jump):
+            return 0.0
+        self.offset = offset
+        self.jumps += 1
+        self.on_jump(jump)
+        return jump
+
+    def _run_timerfd(self, fd, libc):
+        """Thread body: wait on the timerfd, falling back to polling if it fails."""
+        try:
+            self._poll_timerfd(fd, libc)
+        except Exception:
+            # Keep following clock changes, only less promptly
+            self.method = "polling"
+        finally:
+            os.close(fd)
+            self._close_wake_pipe()
+        if self.method == "polling":
+            self._run_polling()
+
+    def _poll_timerfd(self, fd, libc):
+        """Sleep in poll() until the kernel cancels the timerfd or stop() is called."""
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        poller.register(self._wake_read, select.POLLIN)
+        while not self._stop.is_set():
+            events = dict(poller.poll())
+            if fd not in events or self._stop.is_set():
+                continue
+            try:
+                os.read(fd, 8)
+            except OSError as e:
+                if e.errno != errno.ECANCELED:
+                    raise
+            # Re-arm so the next change is reported too
+            _arm_timerfd(fd, libc)
+            self.check(force=True)
+
+    def _close_wake_pipe(self):
+        """Close the pipe stop() writes to, so it is never written after closing."""
+        with self._wake_lock:
+            if self._wake_write is not None:
+                os.close(self._wake_read)
+                os.close(self._wake_write)
+                self._wake_read, self._wake_write = (None, None)
+
+    def _run_polling(self):
+        """Thread body: compare the offset every check_interval."""
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+    def stop(self):
+        """Stop watching; on_jump will not be called again."""
+        self._stop.set()
+        with self._wake_lock:
+            # None once the thread has ended: its descriptor numbers may belong to other files by now
+            if self._wake_write is not None:
+                os.write(self._wake_write, b"x")
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Local control socket for the Shutdown Scheduler.
+
+The running instance serves a small JSON-RPC 2.0 protocol on a Unix-domain
+socket in a directory only the current user can enter. On systems without
+AF_UNIX support it serves a loopback TCP port instead; the port and a random
+token are recorded in a user-only file, and every request must carry the
+token in an "auth" member, since any local process can reach the port.
+Requests and responses are single JSON objects, one per line; a line that
+is not JSON closes the connection, so an HTTP request (e.g. a web page
+posting to the port) cannot smuggle a command in its body. The server runs
+an asyncio loop on its own thread, so any number of clients can be
+connected without blocking the Tk main loop.
+
+A fleet agent (headless.py --agent) serves the same protocol on a TCP
+address. Requests to it must carry the shared token in an "auth" member
+next to "method"; the token is sent in the clear, so agents belong on a
+trusted network.
+
+Example:
+    $ echo '{"jsonrpc": "2.0", "id": 1, "method": "status"}' | nc -U "$XDG_RUNTIME_DIR/shutdown_scheduler.sock"
+
+Author: AI Assistant
+License: MIT
+"""
+
+import asyncio
+import concurrent.futures
+import hmac
+import inspect
+import json
+import os
+import secrets
+import socket
+import threading
+
+import app_paths
+
+SOCKET_NAME = "shutdown_scheduler.sock"
+PORT_FILE_NAME = "shutdown_scheduler.port"
+
+# Standard JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+UNAUTHORIZED = -32001
+
+# Largest accepted request line
+MAX_REQUEST_BYTES = 64 * 1024
+
+UNIX_SOCKETS = hasattr(socket, "AF_UNIX") and hasattr(asyncio, "start_unix_server")
+
+
+def default_socket_path():
+    """
+    Get the control socket path (or the port file path without AF_UNIX).
+
+    The file lives in a per-user directory: $XDG_RUNTIME_DIR when it is set,
+    otherwise the app's data directory, which is made private (0700). Other
+    users can then neither connect to the socket nor put their own in its
+    place, and separate users' instances do not collide.
+
+    Returns:
+        str: File path
+    """
+    if not UNIX_SOCKETS:
+        return os.path.join(app_paths.data_dir(), PORT_FILE_NAME)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    directory = app_paths.data_dir()
+    try:
+        os.chmod(directory, 0o700)
+    except OSError:
+        pass
+    return os.path.join(directory, SOCKET_NAME)
+
+
+def write_private_file(path, text):
+    """Write text to a file only the current user can read (replacing it)."""
+    try:
+        os.remove(path)  # A file left over by a crashed instance may be less private
+    except OSError:
+        pass
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+
+
+class RpcError(Exception):
+    """An error reported to the client as a JSON-RPC error object."""
+
+    def __init__(self, code, message):
+        """
+        Initialize the error.
+
+        Args:
+            code: JSON-RPC error code
+            message: Human-readable description
+        """
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def run_on_thread(post, function, *args):
+    """
+    Run function on another thread's event loop and await its result.
+
+    Used by handlers to reach the Tk thread, e.g.
+    run_on_thread(lambda callback: root.after(0, callback), app.cancel_timer).
+
+    Args:
+        post: Callable that schedules a zero-argument callback on the target thread
+        function: Function to run there
+        *args: Arguments for function
+
+    Returns:
+        asyncio.Future: Resolves to the function's return value
+    """
+    future = concurrent.futures.Future()
+
+    def run():
+        try:
+            future.set_result(function(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+    post(run)
+    return asyncio.wrap_future(future)
+
+
+class ControlServer:
+    """
+    JSON-RPC server on a local socket, driven by an asyncio loop on a thread.
+
+    Handlers are plain callables or coroutine functions taking the request's
+    params as keyword arguments. Plain callables run on the loop thread and
+    must be quick; anything that touches Tk should be marshalled to the Tk
+    thread (see ShutdownScheduler.call_in_tk) and awaited.
+    """
+
+    def __init__(self, handlers, path=None, address=None, token=None):
+        """
+        Initialize the server (does not start it).
+
+        Args:
+            handlers: Mapping of method name to handler
+            path: Socket path, or port file path without AF_UNIX support
+            address: (host, port) to serve on TCP instead of the local socket
+            token: Shared secret every request must carry as "auth" (optional;
+                generated when the local channel falls back to TCP)
+        """
+        self.handlers = dict(handlers)
+        self.path = path or default_socket_path()
+        self.address = address
+        self.token = token
+        self.requests_served = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """
+        Start serving on a background thread.
+
+        Returns:
+            bool: True if the server is listening
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self._server is not None
+
+    def stop(self):
+        """Stop the server and remove its socket (or port) file."""
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(2)
+        if self.address:
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _run(self):
+        """Thread body: create the loop, bind the socket and serve forever."""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(self._listen())
+        except OSError:
+            self._server = None
+        self._ready.set()
+        if self._server is None:
+            self._loop.close()
+            return
+
+        try:
+            self._loop.run_forever()
+        finally:
+            # Stop accepting, then let open connections finish closing
+            self._server.close()
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    async def _listen(self):
+        """Bind the socket and return the asyncio server."""
+        if self.address:
+            host, port = self.address
+            server = await asyncio.start_server(
+                self._handle_client, host=host, port=port, limit=MAX_REQUEST_BYTES
+            )
+            self.address = (host, server.sockets[0].getsockname()[1])  # Resolve port 0
+            return server
+
+        if UNIX_SOCKETS:
+            # The caller holds the single-instance lock, so any existing
+            # socket file is left over from a crashed instance
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            server = await asyncio.start_unix_server(
+                self._handle_client, path=self.path, limit=MAX_REQUEST_BYTES
+            )
+            os.chmod(self.path, 0o600)  # Only the owning user may connect
+            return server
+
+        # Any local process can connect to a loopback port: require a token
+        # that only readers of the port file know
+        if self.token is None:
+            self.token = secrets.token_hex(16)
+        server = await asyncio.start_server(
+            self._handle_client, host="127.0.0.1", port=0, limit=MAX_REQUEST_BYTES
+        )
+        port = server.sockets[0].getsockname()[1]
+        try:
+            write_private_file(self.path, f"{port}\n{self.token}\n")
+        except OSError:
+            server.close()
+            raise
+        return server
+
+    async def _handle_client(self, reader, writer):
+        """Serve one connection: one response line per request line."""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    response = self._error(None, INVALID_REQUEST, "Request too large")
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                response = await self.dispatch(line)
+                if response is not None:
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+                    if "error" in response and response["error"]["code"] == PARSE_ERROR:
+                        break  # Not a JSON-RPC client (e.g. an HTTP request): drop it
+        except (ConnectionError, OSError):
+            pass
+        except asyncio.CancelledError:
+            pass  # Server shutting down: end the task quietly
+        finally:
+            writer.close()
+
+    async def dispatch(self, line):
+        """
+        Handle one JSON-RPC request.
+
+        Args:
+            line: Raw request bytes
+
+        Returns:
+            dict or None: Response object, or None for notifications
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self._error(None, PARSE_ERROR, "Parse error")
+
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self._error(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        if self.token is not None and not hmac.compare_digest(
+                str(request.get("auth", "")).encode(), self.token.encode()):
+            self.requests_served += 1
+            return self._error(request_id, UNAUTHORIZED, "Unauthorized")
+        params = request.get("params") or {}
+        handler = self.handlers.get(request["method"])
+        try:
+            if handler is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "Params must be an object")
+            try:
+                result = handler(**params)
+            except TypeError as e:
+                raise RpcError(INVALID_PARAMS, str(e))
+            if inspect.isawaitable(result):
+                result = await result
+        except RpcError as e:
+            return self._error(request_id, e.code, e.message)
+        except Exception as e:
+            return self._error(request_id, SERVER_ERROR, str(e))
+        finally:
+            self.requests_served += 1
+
+        if "id" not in request:
+            return None  # Notification: no response
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    @staticmethod
+    def _error(request_id, code, message):
+        """Build a JSON-RPC error response."""
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class ControlClient:
+    """Blocking JSON-RPC client for the control socket."""
+
+    def __init__(self, path=None, timeout=5.0):
+        """
+        Connect to a running instance.
+
+        Args:
+            path: Socket path, or port file path without AF_UNIX support
+            timeout: Socket timeout in seconds
+
+        Raises:
+            OSError: If no instance is listening
+            ValueError: If the port file is malformed
+        """
+        path = path or default_socket_path()
+        self.token = None
+        if UNIX_SOCKETS:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(path)
+        else:
+            with open(path) as f:
+                port, self.token = f.read().split()
+            self.sock = socket.create_connection(("127.0.0.1", int(port)), timeout)
+        self.reader = self.sock.makefile("rb")
+        self.next_id = 1
+
+    def call(self, method, **params):
+        """
+        Call a method on the running instance.
+
+        Returns:
+            The method's result
+
+        Raises:
+            RpcError: If the server reports an error
+            OSError: If the connection fails
+        """
+        request = {"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params}
+        if self.token is not None:
+            request["auth"] = self.token
+        self.next_id += 1
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by the server")
+
+        response = json.loads(line)
+        if "error" in response:
+            raise RpcError(response["error"]["code"], response["error"]["message"])
+        return response["result"]
+
+    def close(self):
+        """Close the connection."""
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        """Support use as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the connection on leaving the context."""
+        self.close()
@@ -14,46 +14,148 @@ Author: AI Assistant
 License: MIT
 """
 
+import sys
+
+from startup_profile import DEFAULT_REPORT_PATH, DEFERRED_MODULES, EAGER_MODULES, StartupProfiler
+
+# Startup profiler, enabled by --profile-startup (a no-op otherwise). It is
+# created first so the heavy imports below can be timed individually.
+PROFILER = StartupProfiler.from_argv(sys.argv)
+PROFILER.time_imports(EAGER_MODULES)
+
 import tkinter as tk
 from tkinter import ttk, messagebox
+import argparse
 import subprocess
 import threading
 import time
 from datetime import datetime, timedelta
-import pystray
-from PIL import Image, ImageDraw
 import signal
-import sys
 import os
-import tempfile
 
-# Try to import psutil for single instance detection
-try:
-    import psutil
-    PSUTIL_AVAILABLE = True
-except ImportError:
-    PSUTIL_AVAILABLE = False
+from clock import SYSTEM_CLOCK
+from clock_watch import ClockWatcher
+from control_server import ControlClient, ControlServer, RpcError, INVALID_PARAMS, run_on_thread
+from load_monitor import DEFAULT_MAX_WAIT, DEFAULT_THRESHOLD, LoadMonitor, load_monitoring_available
+from metrics import MetricsFileWriter, MetricsHTTPServer, SchedulerMetrics
+from process_watch import ProcessWatcher, find_processes, parse_targets
+from recurrence import RecurrenceRule, first_firing
+from shutdown_actions import ACTIONS, ACTION_VERBS, DryRunBackend, default_backend
+from shutdown_hooks import HookRunner, hooks_from_commands, load_hooks
+from single_instance import InstanceLock
+from startup_cache import StartupCache
+from throughput_monitor import ThroughputMonitor, format_rate, throughput_monitoring_available
+from timer_engine import DeadlineTimer, GraceCountdown, TickPlanner, TimerQueue, WallDeadlineTimer
+from timer_journal import TimerJournal
+from ui_trace import LagProbe, Tracer
+
+APP_VERSION = "1.0"
+
+# Warning period between the deadline and the shutdown
+SHUTDOWN_GRACE_SECONDS = 30
+
+# Timer label text while no timer is running, per mode
+MODE_PROMPTS = {
+    "countdown": "Set countdown duration",
+    "scheduled": "Set scheduled time",
+    "process": "Choose processes to wait for",
+    "transfer": "Set when transfers count as finished",
+}
+
+# Delay after startup before the tray modules are warmed up in the background
+TRAY_WARMUP_DELAY_MS = 500
+
+# Delay after a timer is armed before the (hidden) warning popup is built
+POPUP_PREBUILD_DELAY_MS = 1000
+
+# pystray and tray_icons (which pulls in PIL) are only needed once the window
+# is minimized to the tray, so they are imported on first use
+pystray = None
+tray_icons = None
+
+
+def load_tray_modules():
+    """
+    Import pystray and tray_icons if they are not loaded yet.
+    
+    Safe to call from any thread; the import lock serializes the first load.
+    
+    Raises:
+        ImportError: If pystray or Pillow is not installed
+    """
+    global pystray, tray_icons
+    if tray_icons is None:
+        import pystray as pystray_module
+        import tray_icons as tray_icons_module
+        pystray = pystray_module
+        tray_icons = tray_icons_module
 
 class ShutdownScheduler:
     """
     Main application class for the Shutdown Scheduler.
     
-    Provides a GUI for scheduling computer shutdowns with two modes:
+    Provides a GUI for scheduling computer shutdowns with four modes:
     1. Countdown Timer: Set hours and minutes for immediate countdown
     2. Scheduled Timer: Set a specific date and time for future shutdown
+    3. After Processes Exit: Shut down once the chosen processes have exited
+    4. After Transfers Finish: Shut down once disk and network traffic stays quiet
     """
     
-    def __init__(self):
-        """Initialize the application window and variables."""
+    def __init__(self, clock=SYSTEM_CLOCK, trace_path=None, action="shutdown", command=None, dry_run=False,
+                 hooks=None, load_monitor=None, low_memory_tray=False):
+        """
+        Initialize the application window and variables.
+        
+        Args:
+            clock: Time source for every timer and date calculation
+                (SimulatedClock to replay schedules without waiting)
+            trace_path: Write a UI trace here on exit (None disables tracing)
+            action: What happens at the deadline (one of shutdown_actions.ACTIONS)
+            command: Command line for the "custom" action
+            dry_run: Record the action instead of performing it
+            hooks: shutdown_hooks.Hook list run during the warning period
+            load_monitor: LoadMonitor that defers the shutdown until the
+                machine is idle (None shuts down at the deadline)
+            low_memory_tray: Destroy the main window's widgets while minimized
+                to the tray and rebuild them when it is shown again
+        """
+        self.clock = clock
+        
+        # The action's command is resolved when a timer is armed (see arm_timer)
+        self.power_action = action
+        self.custom_command = command
+        self.action_backend = DryRunBackend() if dry_run else default_backend()
+        self.prepared_action = None
+        self.hooks = list(hooks or [])
+        self.hook_runner = None
+        self.countdown_popup = None  # Warning popup, built hidden while a timer runs
+        self.grace_countdown = None
+        self.warning_started = None  # Monotonic time the shutdown sequence began
+        self.load_monitor = load_monitor
+        
+        # Handler spans and main-loop lag, recorded only with --trace
+        self.trace_path = trace_path
+        self.tracer = Tracer(enabled=trace_path is not None)
+        self.lag_probe = None
+        
+        # Always-on counters and histograms (exported on request, see setup_metrics_export)
+        self.metrics = SchedulerMetrics()
+        self.metrics_exporters = []
+        self.ui_lock = threading.Lock()
+        self.ui_pending = 0  # Callbacks posted with post_to_ui that have not run yet
+        
         # Check for existing instance before creating the app
-        if not self.check_single_instance():
+        with PROFILER.phase("check_single_instance"):
+            instance_ok = self.check_single_instance()
+        if not instance_ok:
             # Exit the application if another instance is running
             sys.exit(0)
         
         # Create main window
-        self.root = tk.Tk()
+        with PROFILER.phase("create_tk_root"):
+            self.root = tk.Tk()
         self.root.title("Shutdown Scheduler")
-        self.root.geometry("450x400")
+        self.root.geometry("450x430")
         self.root.resizable(True, True)
         
         # Set window icon (if icon file exists)
@@ -65,12 +167,16 @@ class ShutdownScheduler:
         # Apply default theme
         self.root.configure(bg='#f0f0f0')
         
+        # Cached date format, icons and last-used inputs from the previous run
+        with PROFILER.phase("load_startup_cache"):
+            self.startup_cache = StartupCache(APP_VERSION)
+        
         # Set window size constraints
         self.root.minsize(400, 350)
         self.root.maxsize(800, 600)
         
         # Bind window events
-        self.root.bind('<Configure>', self.enforce_size_limits)
+        self.root.bind('<Configure>', self.tracer.wrap(self.enforce_size_limits))
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
         # Center the window on screen
@@ -78,93 +184,99 @@ class ShutdownScheduler:
         
         # Initialize timer state variables
         self.timer_running = False
-        self.timer_thread = None
+        self.deadline = None  # DeadlineTimer for the running countdown
+        self.tick_planner = None  # TickPlanner with wake-up counters
+        
+        # All scheduled actions live in one queue served by a single thread
+        self.timer_queue = TimerQueue(clock=clock.monotonic)
+        self.timer_queue.start()
+        self.timer_entry = None  # Queue entry for the pending shutdown
+        self.recurrence_rule = None  # RecurrenceRule for repeating schedules
+        
+        # Persist scheduled timers so they survive crashes and restarts
+        with PROFILER.phase("open_journal"):
+            try:
+                self.journal = TimerJournal()
+            except OSError:
+                self.journal = None  # Run without persistence if the data dir is unusable
+        self.journal_id = None  # Journal entry for the pending shutdown
+        self.tick_entry = None  # Queue entry for the next display refresh
         self.remaining_seconds = 0
-        self.mode = "countdown"  # "countdown" or "scheduled"
+        self.mode = "countdown"  # "countdown", "scheduled", "process" or "transfer"
+        self.process_watcher = None  # ProcessWatcher in "process" mode
+        self.throughput_monitor = None  # ThroughputMonitor in "transfer" mode
+        self.clock_watcher = None  # Follows clock changes while a scheduled deadline is armed
         
-        # Initialize system tray
+        # Initialize system tray (built on first minimize, see setup_system_tray)
         self.tray_icon = None
+        self.tray_updater = None  # Pushes progress/tooltip changes to the tray
+        self.tray_image = None  # Plain clock icon
+        self.tray_frames = None  # TrayIconCache of progress ring frames
+        self.tray_lock = threading.Lock()
         self.is_minimized_to_tray = False
+        self.low_memory_tray = low_memory_tray
+        
+        # Widgets that setup_ui rebuilds; None while torn down in the tray
+        self.main_frame = None
+        self.mode_frames = {}  # Settings frames built so far, by mode
+        self.timer_text = MODE_PROMPTS["countdown"]
+        self.controls_armed = False
         
         # Setup the user interface
-        self.setup_ui()
+        with PROFILER.phase("setup_ui"):
+            self.create_input_vars()
+            self.setup_ui()
         
-        # Setup system tray
-        self.setup_system_tray()
+        # Re-arm a timer left pending by a previous run
+        with PROFILER.phase("restore_timers"):
+            self.restore_timers()
+        
+        # Load the tray modules and icons in the background once the window is up
+        self.root.after(TRAY_WARMUP_DELAY_MS, self.tracer.wrap(self.start_tray_warmup))
         
         # Setup signal handlers for proper cleanup
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
         
-        # Create lock file for single instance
-        self.create_lock_file()
+        # Serve the local control socket for scripts and later instances
+        with PROFILER.phase("setup_control_server"):
+            self.setup_control_server()
+        
+        self.bind_metrics()
+        
+        # Measure how late the main loop runs its callbacks
+        if self.tracer.enabled:
+            self.lag_probe = LagProbe(self.root.after, self.root.after_cancel, tracer=self.tracer,
+                                      on_sample=self.metrics.ui_loop_lag.observe)
+            self.lag_probe.start()
     
     def check_single_instance(self):
         """
         Check if another instance of the app is already running.
         
+        Takes an advisory lock on the shared lock file, which is a single
+        non-blocking system call no matter how many processes are running.
+        The kernel releases the lock if the process dies, so stale lock files
+        cannot block a new instance.
+        
         Returns:
             bool: True if this is the only instance, False if another instance exists
         """
-        # If psutil is not available, use simple file-based check
-        if not PSUTIL_AVAILABLE:
-            lock_file_name = "shutdown_scheduler.lock"
-            lock_file_path = os.path.join(tempfile.gettempdir(), lock_file_name)
-            self.lock_file_path = lock_file_path
+        self.instance_lock = InstanceLock()
+        try:
+            acquired = self.instance_lock.acquire()
+        except OSError:
+            # If the lock file cannot be used at all, don't block startup
             return True
         
-        # Create a unique lock file name
-        lock_file_name = "shutdown_scheduler.lock"
-        lock_file_path = os.path.join(tempfile.gettempdir(), lock_file_name)
-        
-        # Check if lock file exists
-        if os.path.exists(lock_file_path):
+        if not acquired:
+            # Another instance is running: bring it to the front, or warn if it can't be reached
             try:
-                # Read the PID from the lock file
-                with open(lock_file_path, 'r') as f:
-                    pid_str = f.read().strip()
-                    if pid_str.isdigit():
-                        pid = int(pid_str)
-                        
-                        # Check if the process is still running
-                        if psutil.pid_exists(pid):
-                            # Check if it's actually our app by checking all processes
-                            try:
-                                # Get all processes and check for our app
-                                for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                                    try:
-                                        if proc.info['pid'] == pid:
-                                            # This is the process from our lock file
-                                            # Check if it's our app by name or command line
-                                            proc_name = proc.info['name'].lower()
-                                            cmdline = proc.info['cmdline']
-                                            
-                                            # Check for our executable or Python script
-                                            if (any('shutdownscheduler' in name.lower() for name in [proc_name] + cmdline) or
-                                                any('enhanced_shutdown_timer.py' in arg for arg in cmdline)):
-                                                # Another instance is running
-                                                self.show_instance_warning()
-                                                return False
-                                            break
-                                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                                        continue
-                            except Exception as e:
-                                pass
-                        
-                        # Process doesn't exist, remove stale lock file
-                        try:
-                            os.remove(lock_file_path)
-                        except:
-                            pass
-            except Exception as e:
-                # If we can't read the lock file, try to remove it
-                try:
-                    os.remove(lock_file_path)
-                except:
-                    pass
-        
-        # Store lock file path for cleanup
-        self.lock_file_path = lock_file_path
+                with ControlClient(timeout=2.0) as client:
+                    client.call("show")
+            except Exception:
+                self.show_instance_warning()
+            return False
         return True
     
     def show_instance_warning(self):
@@ -187,26 +299,81 @@ class ShutdownScheduler:
         # Exit the application after showing the warning
         sys.exit(0)
     
-    def create_lock_file(self):
-        """Create a lock file with the current process ID."""
+    def stop_control_server(self):
+        """Stop the control socket before releasing the instance lock."""
+        try:
+            if hasattr(self, 'control_server'):
+                self.control_server.stop()
+        except Exception as e:
+            pass
+    
+    def close_journal(self):
+        """Flush and close the timer journal."""
+        try:
+            if getattr(self, 'journal', None):
+                self.journal.close()
+        except Exception as e:
+            pass
+    
+    def save_startup_cache(self):
+        """Write any changed startup cache values to disk."""
         try:
-            with open(self.lock_file_path, 'w') as f:
-                f.write(str(os.getpid()))
+            if getattr(self, 'startup_cache', None):
+                self.startup_cache.save()
         except Exception as e:
             pass
     
     def cleanup_lock_file(self):
-        """Remove the lock file when the application exits."""
+        """Release the single-instance lock when the application exits."""
         try:
-            if hasattr(self, 'lock_file_path') and os.path.exists(self.lock_file_path):
-                os.remove(self.lock_file_path)
+            if hasattr(self, 'instance_lock'):
+                self.instance_lock.release()
         except Exception as e:
             pass
     
+    def create_input_vars(self):
+        """
+        Create the variables behind the timer inputs.
+        
+        They outlive the widgets, so the inputs survive a frame that has not
+        been built yet and a window torn down while in the tray.
+        """
+        # Last-used inputs (falling back to the built-in defaults)
+        inputs = self.startup_cache.get("inputs", {})
+        
+        self.mode_var = tk.StringVar(value="countdown")
+        
+        # Countdown inputs
+        self.hours_var = tk.StringVar(value=inputs.get("hours", "0"))
+        self.minutes_var = tk.StringVar(value=inputs.get("minutes", "30"))
+        
+        # Scheduled inputs, defaulting to tomorrow
+        tomorrow = self.clock.now() + timedelta(days=1)
+        self.day_var = tk.StringVar(value=str(tomorrow.day))
+        self.month_var = tk.StringVar(value=str(tomorrow.month))
+        self.year_var = tk.StringVar(value=str(tomorrow.year))
+        self.hour_var = tk.StringVar(value=inputs.get("hour", "22"))
+        self.minute_var = tk.StringVar(value=inputs.get("minute", "00"))
+        self.repeat_var = tk.StringVar(value=inputs.get("repeat", "Once"))
+        
+        # Process and transfer trigger inputs
+        self.processes_var = tk.StringVar(value=inputs.get("processes", ""))
+        self.quiet_rate_var = tk.StringVar(value=inputs.get("quiet_rate", "100"))
+        self.quiet_minutes_var = tk.StringVar(value=inputs.get("quiet_minutes", "2"))
+    
     def setup_ui(self):
-        """Create and configure the user interface layout."""
+        """
+        Create the main window's widgets.
+        
+        Only the selected mode's settings frame is built; the others are
+        built on the first switch to them (see get_mode_frame). Also called
+        by show_window to rebuild a window torn down in the tray, so the
+        widgets are set up from the scheduler's current state.
+        """
         # Main container frame
         main_frame = ttk.Frame(self.root, padding="20")
+        self.main_frame = main_frame
+        self.mode_frames = {}
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Configure root window to expand main frame
@@ -241,8 +408,6 @@ class ShutdownScheduler:
         mode_frame.columnconfigure(1, weight=1)
         
         # Mode selection radio buttons
-        self.mode_var = tk.StringVar(value="countdown")
-        
         countdown_radio = ttk.Radiobutton(
             mode_frame, 
             text="Countdown Timer", 
@@ -261,26 +426,78 @@ class ShutdownScheduler:
         )
         scheduled_radio.grid(row=0, column=1, sticky=tk.EW)
         
+        process_radio = ttk.Radiobutton(
+            mode_frame, 
+            text="After Processes Exit", 
+            variable=self.mode_var, 
+            value="process", 
+            command=self.on_mode_change
+        )
+        process_radio.grid(row=1, column=0, sticky=tk.EW, padx=(0, 20), pady=(5, 0))
+        
+        transfer_radio = ttk.Radiobutton(
+            mode_frame, 
+            text="After Transfers Finish", 
+            variable=self.mode_var, 
+            value="transfer", 
+            command=self.on_mode_change
+        )
+        transfer_radio.grid(row=1, column=1, sticky=tk.EW, pady=(5, 0))
+        
         # Timer display label
-        self.timer_label = ttk.Label(main_frame, text="Set timer duration", font=("Arial", 14))
+        self.timer_label = ttk.Label(main_frame, text=self.timer_text, font=("Arial", 14))
         self.timer_label.grid(row=3, column=1, pady=(0, 20))
         self.timer_label.configure(anchor="center")
         
-        # Countdown settings frame
-        self.countdown_frame = ttk.LabelFrame(main_frame, text="Countdown Settings", padding="10")
-        self.countdown_frame.grid(row=4, column=1, sticky=(tk.W, tk.E), pady=(0, 10))
+        # Control buttons frame
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=5, column=1, pady=20)
+        
+        # Configure button frame for equal button distribution
+        button_frame.columnconfigure(0, weight=1)
+        button_frame.columnconfigure(1, weight=1)
+        
+        # Start timer button
+        self.start_button = ttk.Button(
+            button_frame, 
+            text="Start Timer", 
+            command=self.start_timer,
+            state="disabled" if self.controls_armed else "normal"
+        )
+        self.start_button.grid(row=0, column=0, padx=5)
+        
+        # Cancel timer button
+        self.cancel_button = ttk.Button(
+            button_frame, 
+            text="Cancel Timer", 
+            command=self.cancel_timer, 
+            state="normal" if self.controls_armed else "disabled"
+        )
+        self.cancel_button.grid(row=0, column=1, padx=5)
+        
+        # Show the selected mode's settings
+        self.show_mode_frame(self.mode_var.get())
+    
+    def build_countdown_frame(self, parent):
+        """
+        Create the countdown settings frame.
         
-        # Configure countdown frame layout
-        self.countdown_frame.columnconfigure(0, weight=1)  # Labels
-        self.countdown_frame.columnconfigure(1, weight=2)  # Input fields
+        Args:
+            parent: Container the frame is gridded into
+        
+        Returns:
+            ttk.LabelFrame: The frame (not yet gridded)
+        """
+        frame = ttk.LabelFrame(parent, text="Countdown Settings", padding="10")
+        frame.columnconfigure(0, weight=1)  # Labels
+        frame.columnconfigure(1, weight=2)  # Input fields
         
         # Hours input
-        hours_label = ttk.Label(self.countdown_frame, text="Hours:")
+        hours_label = ttk.Label(frame, text="Hours:")
         hours_label.grid(row=0, column=0, sticky=tk.E, pady=5, padx=(0, 10))
         
-        self.hours_var = tk.StringVar(value="0")
         hours_spinbox = ttk.Spinbox(
-            self.countdown_frame, 
+            frame, 
             from_=0, to=23, 
             width=10, 
             textvariable=self.hours_var
@@ -288,41 +505,45 @@ class ShutdownScheduler:
         hours_spinbox.grid(row=0, column=1, sticky=tk.EW, pady=5)
         
         # Minutes input
-        minutes_label = ttk.Label(self.countdown_frame, text="Minutes:")
+        minutes_label = ttk.Label(frame, text="Minutes:")
         minutes_label.grid(row=1, column=0, sticky=tk.E, pady=5, padx=(0, 10))
         
-        self.minutes_var = tk.StringVar(value="30")
         minutes_spinbox = ttk.Spinbox(
-            self.countdown_frame, 
+            frame, 
             from_=0, to=59, 
             width=10, 
             textvariable=self.minutes_var
         )
         minutes_spinbox.grid(row=1, column=1, sticky=tk.EW, pady=5)
         
-        # Scheduled settings frame
-        self.scheduled_frame = ttk.LabelFrame(main_frame, text="Scheduled Settings", padding="10")
-        self.scheduled_frame.grid(row=4, column=1, sticky=(tk.W, tk.E), pady=(0, 10))
+        return frame
+    
+    def build_scheduled_frame(self, parent):
+        """
+        Create the scheduled time settings frame.
         
-        # Configure scheduled frame layout
-        self.scheduled_frame.columnconfigure(0, weight=1)  # Labels
-        self.scheduled_frame.columnconfigure(1, weight=2)  # Input fields
-        self.scheduled_frame.columnconfigure(2, weight=1)  # Format labels
+        Args:
+            parent: Container the frame is gridded into
+        
+        Returns:
+            ttk.LabelFrame: The frame (not yet gridded)
+        """
+        frame = ttk.LabelFrame(parent, text="Scheduled Settings", padding="10")
+        frame.columnconfigure(0, weight=1)  # Labels
+        frame.columnconfigure(1, weight=2)  # Input fields
+        frame.columnconfigure(2, weight=1)  # Format labels
         
         # Date input section
-        date_label = ttk.Label(self.scheduled_frame, text="Date:")
+        date_label = ttk.Label(frame, text="Date:")
         date_label.grid(row=0, column=0, sticky=tk.E, pady=5, padx=(0, 10))
         
         # Date input frame for spinboxes
-        date_frame = ttk.Frame(self.scheduled_frame)
+        date_frame = ttk.Frame(frame)
         date_frame.grid(row=0, column=1, sticky=tk.EW, pady=5)
         
-        # Get tomorrow's date for default values
-        tomorrow = datetime.now() + timedelta(days=1)
-        current_date = datetime.now()
+        current_date = self.clock.now()  # First year offered
         
         # Day spinbox
-        self.day_var = tk.StringVar(value=str(tomorrow.day))
         day_spinbox = ttk.Spinbox(
             date_frame, 
             from_=1, to=31, 
@@ -332,7 +553,6 @@ class ShutdownScheduler:
         day_spinbox.grid(row=0, column=0, padx=(0, 2))
         
         # Month spinbox
-        self.month_var = tk.StringVar(value=str(tomorrow.month))
         month_spinbox = ttk.Spinbox(
             date_frame, 
             from_=1, to=12, 
@@ -342,7 +562,6 @@ class ShutdownScheduler:
         month_spinbox.grid(row=0, column=1, padx=(2, 2))
         
         # Year spinbox
-        self.year_var = tk.StringVar(value=str(tomorrow.year))
         year_spinbox = ttk.Spinbox(
             date_frame, 
             from_=current_date.year, to=2030, 
@@ -353,19 +572,18 @@ class ShutdownScheduler:
         
         # Date format label
         system_format = self.get_system_date_format()
-        format_label = ttk.Label(self.scheduled_frame, text=f"({system_format})")
+        format_label = ttk.Label(frame, text=f"({system_format})")
         format_label.grid(row=0, column=2, sticky=tk.W, pady=5, padx=(5, 0))
         
         # Time input section
-        time_label = ttk.Label(self.scheduled_frame, text="Time:")
+        time_label = ttk.Label(frame, text="Time:")
         time_label.grid(row=1, column=0, sticky=tk.E, pady=5, padx=(0, 10))
         
         # Time input frame for spinboxes
-        time_frame = ttk.Frame(self.scheduled_frame)
+        time_frame = ttk.Frame(frame)
         time_frame.grid(row=1, column=1, sticky=tk.EW, pady=5)
         
         # Hour spinbox
-        self.hour_var = tk.StringVar(value="22")
         hour_spinbox = ttk.Spinbox(
             time_frame, 
             from_=0, to=23, 
@@ -375,7 +593,6 @@ class ShutdownScheduler:
         hour_spinbox.grid(row=0, column=0, padx=(0, 2))
         
         # Minute spinbox
-        self.minute_var = tk.StringVar(value="00")
         minute_spinbox = ttk.Spinbox(
             time_frame, 
             from_=0, to=59, 
@@ -385,36 +602,125 @@ class ShutdownScheduler:
         minute_spinbox.grid(row=0, column=1, padx=(2, 0))
         
         # Time format label
-        time_format_label = ttk.Label(self.scheduled_frame, text="(HH:MM)")
+        time_format_label = ttk.Label(frame, text="(HH:MM)")
         time_format_label.grid(row=1, column=2, sticky=tk.W, pady=5, padx=(5, 0))
         
-        # Control buttons frame
-        button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=5, column=1, pady=20)
+        # Repeat selection
+        repeat_label = ttk.Label(frame, text="Repeat:")
+        repeat_label.grid(row=2, column=0, sticky=tk.E, pady=5, padx=(0, 10))
         
-        # Configure button frame for equal button distribution
-        button_frame.columnconfigure(0, weight=1)
-        button_frame.columnconfigure(1, weight=1)
+        repeat_combobox = ttk.Combobox(
+            frame, 
+            values=["Once", "Daily", "Weekdays"], 
+            width=10, 
+            state="readonly", 
+            textvariable=self.repeat_var
+        )
+        repeat_combobox.grid(row=2, column=1, sticky=tk.W, pady=5)
         
-        # Start timer button
-        self.start_button = ttk.Button(
-            button_frame, 
-            text="Start Timer", 
-            command=self.start_timer
+        return frame
+    
+    def build_process_frame(self, parent):
+        """
+        Create the process exit settings frame.
+        
+        Args:
+            parent: Container the frame is gridded into
+        
+        Returns:
+            ttk.LabelFrame: The frame (not yet gridded)
+        """
+        frame = ttk.LabelFrame(parent, text="Process Settings", padding="10")
+        frame.columnconfigure(0, weight=1)  # Labels
+        frame.columnconfigure(1, weight=2)  # Input field
+        
+        processes_label = ttk.Label(frame, text="Processes:")
+        processes_label.grid(row=0, column=0, sticky=tk.E, pady=5, padx=(0, 10))
+        
+        processes_entry = ttk.Entry(frame, width=24, textvariable=self.processes_var)
+        processes_entry.grid(row=0, column=1, sticky=tk.EW, pady=5)
+        
+        processes_hint = ttk.Label(
+            frame, 
+            text="PIDs or names, e.g. 4242, ffmpeg, make*", 
+            font=("Arial", 8)
         )
-        self.start_button.grid(row=0, column=0, padx=5)
+        processes_hint.grid(row=1, column=1, sticky=tk.W)
         
-        # Cancel timer button
-        self.cancel_button = ttk.Button(
-            button_frame, 
-            text="Cancel Timer", 
-            command=self.cancel_timer, 
-            state="disabled"
+        return frame
+    
+    def build_transfer_frame(self, parent):
+        """
+        Create the transfer (disk and network throughput) settings frame.
+        
+        Args:
+            parent: Container the frame is gridded into
+        
+        Returns:
+            ttk.LabelFrame: The frame (not yet gridded)
+        """
+        frame = ttk.LabelFrame(parent, text="Transfer Settings", padding="10")
+        frame.columnconfigure(0, weight=1)  # Labels
+        frame.columnconfigure(1, weight=2)  # Input fields
+        
+        quiet_rate_label = ttk.Label(frame, text="Quiet below (KB/s):")
+        quiet_rate_label.grid(row=0, column=0, sticky=tk.E, pady=5, padx=(0, 10))
+        
+        quiet_rate_spinbox = ttk.Spinbox(
+            frame, 
+            from_=1, to=100000, 
+            width=10, 
+            textvariable=self.quiet_rate_var
         )
-        self.cancel_button.grid(row=0, column=1, padx=5)
+        quiet_rate_spinbox.grid(row=0, column=1, sticky=tk.EW, pady=5)
         
-        # Initialize UI to show countdown mode by default
-        self.on_mode_change()
+        quiet_minutes_label = ttk.Label(frame, text="For (minutes):")
+        quiet_minutes_label.grid(row=1, column=0, sticky=tk.E, pady=5, padx=(0, 10))
+        
+        quiet_minutes_spinbox = ttk.Spinbox(
+            frame, 
+            from_=1, to=120, 
+            width=10, 
+            textvariable=self.quiet_minutes_var
+        )
+        quiet_minutes_spinbox.grid(row=1, column=1, sticky=tk.EW, pady=5)
+        
+        return frame
+    
+    def get_mode_frame(self, mode):
+        """
+        Get a mode's settings frame, building it on first use.
+        
+        Args:
+            mode: "countdown", "scheduled", "process" or "transfer"
+        
+        Returns:
+            ttk.LabelFrame: The frame, gridded in the settings row
+        """
+        frame = self.mode_frames.get(mode)
+        if frame is None:
+            builders = {
+                "countdown": self.build_countdown_frame,
+                "scheduled": self.build_scheduled_frame,
+                "process": self.build_process_frame,
+                "transfer": self.build_transfer_frame,
+            }
+            frame = builders[mode](self.main_frame)
+            frame.grid(row=4, column=1, sticky=(tk.W, tk.E), pady=(0, 10))
+            self.mode_frames[mode] = frame
+        return frame
+    
+    def show_mode_frame(self, mode):
+        """
+        Show a mode's settings frame and hide the others.
+        
+        Args:
+            mode: The selected mode
+        """
+        for frame_mode, frame in self.mode_frames.items():
+            if frame_mode != mode:
+                frame.grid_remove()
+        self.get_mode_frame(mode).grid()
     
     def enforce_size_limits(self, event):
         """
@@ -459,59 +765,59 @@ class ShutdownScheduler:
         """
         Detect the system's date format for display purposes.
         
+        The result is kept in the startup cache, so the locale is only
+        probed again when the locale or app version changes.
+        
         Returns:
             str: The detected date format (MM/DD/YYYY, DD/MM/YYYY, or YYYY-MM-DD)
         """
-        import locale
-        try:
-            # Get system locale
-            system_locale = locale.getlocale()
-            if system_locale[0]:
-                locale.setlocale(locale.LC_TIME, system_locale[0])
-            
-            # Test with a known date to determine the format
-            test_date = datetime(2024, 12, 25)  # December 25, 2024
-            formatted = test_date.strftime("%x")
-            
-            # Parse the formatted date to determine the actual format
-            parts = formatted.replace("-", "/").split("/")
-            if len(parts) == 3:
-                # Check if December (12) is in the first position (MM/DD/YYYY)
-                if "12" in parts[0]:
-                    return "MM/DD/YYYY"  # US format
-                # Check if December (12) is in the second position (DD/MM/YYYY)
-                elif "12" in parts[1]:
-                    return "DD/MM/YYYY"  # European format
-                # Check if year (2024) is in the first position (YYYY-MM-DD)
-                elif "2024" in parts[0]:
-                    return "YYYY-MM-DD"  # ISO format
-                else:
-                    # Fallback: check the length of first part
-                    if len(parts[0]) == 4:  # Year is first
-                        return "YYYY-MM-DD"
-                    elif len(parts[0]) == 2:  # Could be either MM or DD
-                        # If second part is also 2 digits, assume MM/DD/YYYY
-                        return "MM/DD/YYYY"
-                    else:
-                        return "DD/MM/YYYY"  # Default to European
-            else:
-                return "DD/MM/YYYY"  # Default to European format
-        except:
-            return "DD/MM/YYYY"  # Default to European format
+        return self.startup_cache.date_format()
+    
+    def remember_inputs(self):
+        """Store the current timer inputs as the defaults for the next launch."""
+        self.startup_cache.set("inputs", {
+            "hours": self.hours_var.get(),
+            "minutes": self.minutes_var.get(),
+            "hour": self.hour_var.get(),
+            "minute": self.minute_var.get(),
+            "repeat": self.repeat_var.get(),
+            "processes": self.processes_var.get(),
+            "quiet_rate": self.quiet_rate_var.get(),
+            "quiet_minutes": self.quiet_minutes_var.get(),
+        })
+        self.startup_cache.save()
     
     def on_mode_change(self):
         """Handle mode change between countdown and scheduled timer modes."""
         mode = self.mode_var.get()
-        if mode == "countdown":
-            # Show countdown settings, hide scheduled settings
-            self.countdown_frame.grid()
-            self.scheduled_frame.grid_remove()
-            self.timer_label.config(text="Set countdown duration")
-        else:
-            # Show scheduled settings, hide countdown settings
-            self.countdown_frame.grid_remove()
-            self.scheduled_frame.grid()
-            self.timer_label.config(text="Set scheduled time")
+        if self.main_frame is not None:
+            self.show_mode_frame(mode)
+        self.show_timer_text(MODE_PROMPTS[mode])
+    
+    def show_timer_text(self, text):
+        """
+        Show text in the timer display.
+        
+        The text is kept while the window is torn down, for the rebuilt label.
+        
+        Args:
+            text: Status line to show
+        """
+        self.timer_text = text
+        if self.main_frame is not None:
+            self.timer_label.config(text=text)
+    
+    def set_controls(self, armed):
+        """
+        Enable Cancel while a timer is armed, and Start otherwise.
+        
+        Args:
+            armed: True once a timer or trigger is armed
+        """
+        self.controls_armed = armed
+        if self.main_frame is not None:
+            self.start_button.config(state="disabled" if armed else "normal")
+            self.cancel_button.config(state="normal" if armed else "disabled")
     
     def start_timer(self):
         """Start the timer based on the selected mode."""
@@ -519,6 +825,10 @@ class ShutdownScheduler:
         
         if mode == "countdown":
             self.start_countdown_timer()
+        elif mode == "process":
+            self.start_process_trigger()
+        elif mode == "transfer":
+            self.start_transfer_trigger()
         else:
             self.start_scheduled_timer()
     
@@ -535,16 +845,27 @@ class ShutdownScheduler:
                 
             # Calculate total seconds
             total_seconds = hours * 3600 + minutes * 60
-            self.remaining_seconds = total_seconds
-            self.mode = "countdown"
-            
-            # Update display and start timer
-            self.update_timer_display()
-            self.start_timer_thread()
+            self.arm_countdown(total_seconds)
+            self.remember_inputs()
             
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter valid numbers for hours and minutes.")
     
+    def arm_countdown(self, total_seconds):
+        """
+        Start a countdown timer for a number of seconds.
+        
+        Args:
+            total_seconds: Seconds until shutdown
+        """
+        self.deadline = DeadlineTimer(total_seconds, clock=self.clock.monotonic)
+        self.remaining_seconds = self.deadline.remaining_seconds()
+        self.mode = "countdown"
+        
+        # Update display and start timer
+        self.update_timer_display()
+        self.arm_timer()
+    
     def start_scheduled_timer(self):
         """Start a scheduled timer for the specified date and time."""
         try:
@@ -562,68 +883,450 @@ class ShutdownScheduler:
                 messagebox.showerror("Invalid Date", "Please enter a valid date.")
                 return
             
-            current_datetime = datetime.now()
-            
-            # Smart validation for today's date
-            if scheduled_datetime.date() == current_datetime.date():
-                # If it's today, check if time is in the future
-                if scheduled_datetime.time() <= current_datetime.time():
-                    messagebox.showwarning("Invalid Time", "Scheduled time must be in the future.")
-                    return
-            elif scheduled_datetime <= current_datetime:
+            # Repeating schedules fire at the next matching time on or after the chosen date
+            firing = first_firing(scheduled_datetime, self.repeat_var.get(), self.clock.now())
+            if firing is None or firing[0] is None:
                 messagebox.showwarning("Invalid Time", "Scheduled time must be in the future.")
                 return
             
-            # Calculate seconds until scheduled time
-            time_diff = scheduled_datetime - current_datetime
-            self.remaining_seconds = int(time_diff.total_seconds())
-            self.mode = "scheduled"
-            
-            # Update display and start timer
-            self.update_timer_display()
-            self.start_timer_thread()
+            self.arm_scheduled_datetime(*firing)
+            self.remember_inputs()
             
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter valid numbers for date and time.")
     
-    def start_timer_thread(self):
-        """Start the timer thread and update UI state."""
-        # Start timer thread
+    def start_process_trigger(self):
+        """Shut down once the processes named in the process settings have exited."""
+        try:
+            targets = parse_targets(self.processes_var.get())
+            found = find_processes(targets)
+        except ValueError as e:
+            messagebox.showerror("Invalid Input", str(e))
+            return
+        except OSError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        if not found:
+            messagebox.showwarning("No Processes", "None of these processes are running.")
+            return
+        
+        self.arm_process_trigger(found)
+        self.remember_inputs()
+    
+    def arm_process_trigger(self, processes):
+        """
+        Watch processes and start the shutdown sequence when all have exited.
+        
+        Args:
+            processes: dict of pid -> description (see process_watch.find_processes)
+        """
+        try:
+            self.prepared_action = self.action_backend.prepare(self.power_action, self.custom_command)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", f"Cannot schedule the {self.power_action}: {e}")
+            return
+        
+        self.mode = "process"
+        self.deadline = None
+        self.remaining_seconds = 0
+        self.timer_running = True
+        self.schedule_popup_prebuild()
+        self.metrics.timers_armed.inc(label_value=self.mode)
+        self.process_watcher = ProcessWatcher(
+            processes,
+            on_all_exited=self.on_processes_exited,
+            on_exit=lambda pid, left: self.post_to_ui(self.show_processes_left, left)
+        )
+        self.process_watcher.start()
+        self.show_processes_left(len(processes))
+        
+        self.set_controls(armed=True)
+    
+    def show_processes_left(self, count):
+        """
+        Show how many watched processes are still running.
+        
+        Args:
+            count: Processes not yet exited
+        """
+        if self.timer_running and self.mode == "process" and count:
+            noun = "process" if count == 1 else "processes"
+            self.show_timer_text(f"Waiting for {count} {noun} to exit")
+    
+    def on_processes_exited(self):
+        """Start the shutdown sequence (runs on the process watcher thread)."""
+        if not self.timer_running or self.mode != "process":
+            return
+        self.process_watcher = None
+        self.metrics.wakeups.inc(label_value="process_exit")
+        self.begin_shutdown_sequence()
+    
+    def start_transfer_trigger(self):
+        """Shut down once disk and network traffic stays below the quiet rate."""
+        try:
+            quiet_rate = float(self.quiet_rate_var.get())
+            quiet_minutes = float(self.quiet_minutes_var.get())
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Please enter valid numbers for the transfer settings.")
+            return
+        if quiet_rate <= 0 or quiet_minutes <= 0:
+            messagebox.showwarning("Invalid Input", "The quiet rate and period must be greater than 0.")
+            return
+        if not throughput_monitoring_available():
+            messagebox.showerror("Error", "Measuring disk and network traffic needs psutil.")
+            return
+        
+        self.arm_transfer_trigger(quiet_rate * 1024, quiet_minutes * 60)
+        self.remember_inputs()
+    
+    def arm_transfer_trigger(self, threshold, quiet_period):
+        """
+        Sample disk and network traffic and start the shutdown sequence once it is quiet.
+        
+        Args:
+            threshold: Quiet rate in bytes/s
+            quiet_period: Seconds the rate must stay below threshold
+        """
+        try:
+            self.prepared_action = self.action_backend.prepare(self.power_action, self.custom_command)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", f"Cannot schedule the {self.power_action}: {e}")
+            return
+        
+        monitor = ThroughputMonitor(threshold, quiet_period, clock=self.clock.monotonic)
+        try:
+            monitor.start(
+                self.timer_queue,
+                on_quiet=self.on_transfers_finished,
+                on_sample=lambda rate, quiet_for: self.post_to_ui(self.show_transfer_rate, rate, quiet_for)
+            )
+        except OSError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
+        self.mode = "transfer"
+        self.deadline = None
+        self.remaining_seconds = 0
+        self.throughput_monitor = monitor
         self.timer_running = True
-        self.timer_thread = threading.Thread(target=self.timer_loop, daemon=True)
-        self.timer_thread.start()
+        self.schedule_popup_prebuild()
+        self.metrics.timers_armed.inc(label_value=self.mode)
+        self.show_timer_text(f"Waiting for traffic below {format_rate(threshold)}")
+        
+        self.set_controls(armed=True)
+    
+    def show_transfer_rate(self, rate, quiet_for):
+        """
+        Show the smoothed transfer rate while waiting for transfers to finish.
+        
+        Args:
+            rate: Disk and network bytes/s (moving average)
+            quiet_for: Seconds the rate has been below the threshold
+        """
+        if self.timer_running and self.mode == "transfer":
+            text = f"Transfer rate {format_rate(rate)}"
+            if quiet_for > 0:
+                text += f", quiet for {int(quiet_for)} s"
+            self.show_timer_text(text)
+    
+    def on_transfers_finished(self):
+        """Start the shutdown sequence (runs on the queue's waiter thread)."""
+        if not self.timer_running or self.mode != "transfer":
+            return
+        self.throughput_monitor = None
+        self.metrics.wakeups.inc(label_value="transfer_quiet")
+        self.begin_shutdown_sequence()
+    
+    def arm_scheduled_datetime(self, scheduled_datetime, rule=None):
+        """
+        Start a scheduled timer for a specific date and time.
+        
+        Args:
+            scheduled_datetime: The datetime to shut down at
+            rule: RecurrenceRule to re-arm from after a cancelled shutdown (optional)
+        """
+        # Anchored to the wall clock: follows clock changes and suspend (see resync_deadline)
+        self.deadline = WallDeadlineTimer(
+            scheduled_datetime.timestamp(), clock=self.clock.monotonic, wall_clock=self.clock.time
+        )
+        self.remaining_seconds = self.deadline.remaining_seconds()
+        self.mode = "scheduled"
+        self.recurrence_rule = rule
+        
+        # Update display and start timer
+        self.update_timer_display()
+        self.arm_timer()
+    
+    def restore_timers(self):
+        """
+        Re-arm the shutdown left pending by a previous run.
+        
+        Only the earliest timer that is still in the future is restored; a
+        repeating schedule whose time passed while the app was not running
+        moves on to its next occurrence, and missed one-off timers are dropped
+        rather than shutting down right after startup.
+        """
+        if not self.journal:
+            return
+        
+        now = self.clock.time()
+        restored = None
+        for entry in self.journal.active():
+            # Every old entry is replaced by the one arm_timer records
+            self.journal.record_cancel(entry["id"])
+            if restored or entry.get("kind") != "shutdown":
+                continue
+            
+            rule = None
+            fire_at = entry["fire_at"]
+            if entry.get("rule"):
+                try:
+                    rule = RecurrenceRule(entry["rule"])
+                except ValueError:
+                    continue
+                if fire_at <= now:
+                    next_datetime = rule.next_after(self.clock.now())
+                    if next_datetime is None:
+                        continue
+                    fire_at = next_datetime.timestamp()
+            if fire_at > now:
+                restored = (entry.get("label"), fire_at, rule)
+        
+        if restored:
+            label, fire_at, rule = restored
+            if label == "countdown" and not rule:
+                self.arm_countdown(fire_at - now)
+            else:
+                self.mode_var.set("scheduled")
+                self.on_mode_change()
+                self.arm_scheduled_datetime(datetime.fromtimestamp(fire_at), rule)
+    
+    def arm_timer(self):
+        """Queue the shutdown and the first display refresh, and update UI state."""
+        # Resolve the command now so a missing executable is reported before the deadline
+        try:
+            self.prepared_action = self.action_backend.prepare(self.power_action, self.custom_command)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", f"Cannot schedule the {self.power_action}: {e}")
+            self.deadline = None
+            self.on_mode_change()
+            return
+        
+        self.timer_running = True
+        self.tick_planner = TickPlanner(clock=self.clock.monotonic)
+        self.timer_entry = self.timer_queue.schedule_at(
+            self.deadline.deadline,
+            self.on_deadline_reached,
+            kind="shutdown",
+            label=self.mode
+        )
+        self.schedule_display_tick()
+        self.schedule_popup_prebuild()
+        self.metrics.timers_armed.inc(label_value=self.mode)
+        if isinstance(self.deadline, WallDeadlineTimer):
+            self.start_clock_watcher()
+        else:
+            self.stop_clock_watcher()
+        
+        # Record the timer so it can be restored after a crash or restart
+        if self.journal:
+            rule = self.recurrence_rule
+            if isinstance(self.deadline, WallDeadlineTimer):
+                fire_at = self.deadline.target_time  # Exactly the time the user picked
+            else:
+                fire_at = self.clock.time() + self.deadline.remaining()
+            self.journal_id = self.journal.record_schedule(
+                fire_at,
+                kind="shutdown",
+                label=self.mode,
+                rule=rule.expression if rule else None
+            )
         
         # Update UI
-        self.start_button.config(state="disabled")
-        self.cancel_button.config(state="normal")
+        self.set_controls(armed=True)
     
     def cancel_timer(self):
         """Cancel the running timer and reset UI state."""
+        self.recurrence_rule = None
         if self.timer_running:
             self.timer_running = False
+            self.metrics.timers_cancelled.inc()
             self.remaining_seconds = 0
+            # Remove the pending shutdown and display refresh from the queue
+            self.timer_queue.cancel(self.timer_entry)
+            self.timer_queue.cancel(self.tick_entry)
+            if self.load_monitor:
+                self.load_monitor.cancel()
+            if self.process_watcher:
+                self.process_watcher.stop()
+                self.process_watcher = None
+            if self.throughput_monitor:
+                self.throughput_monitor.cancel()
+                self.throughput_monitor = None
+        self.stop_clock_watcher()
+        if self.journal:
+            self.journal.record_cancel(self.journal_id)
+            self.journal_id = None
+        self.reset_tray_icon()
         
         # Reset UI state
-        self.start_button.config(state="normal")
-        self.cancel_button.config(state="disabled")
+        self.set_controls(armed=False)
         # Reset mode display
         self.on_mode_change()
     
-    def timer_loop(self):
-        """Main timer loop that runs in a separate thread."""
-        while self.timer_running and self.remaining_seconds > 0:
-            time.sleep(1)
-            self.remaining_seconds -= 1
-            
-            # Update display in main thread
-            self.root.after(0, self.update_timer_display)
-            
-            # Check if timer has finished
-            if self.remaining_seconds <= 0 and self.timer_running:
-                # Stop the timer thread before showing popup
-                self.timer_running = False
-                self.root.after(0, self.shutdown_computer)
-                break
+    def start_clock_watcher(self):
+        """Watch for wall-clock changes while a scheduled deadline is armed."""
+        if self.clock_watcher is None:
+            self.clock_watcher = ClockWatcher(
+                lambda jump: self.post_to_ui(self.resync_deadline, jump), clock=self.clock
+            )
+            self.clock_watcher.start()
+    
+    def stop_clock_watcher(self):
+        """Stop watching for wall-clock changes."""
+        if self.clock_watcher:
+            self.clock_watcher.stop()
+            self.clock_watcher = None
+    
+    def resync_deadline(self, jump):
+        """
+        Move a scheduled deadline after the system clock changed or the machine resumed.
+        
+        A deadline that passed meanwhile (e.g. while suspended) fires right
+        away, with the usual warning.
+        
+        Args:
+            jump: Seconds the wall clock moved relative to the monotonic clock
+        """
+        deadline = self.deadline
+        if not self.timer_running or not isinstance(deadline, WallDeadlineTimer):
+            return
+        # Leave a deadline that already fired alone
+        if not self.timer_queue.cancel(self.timer_entry):
+            return
+        deadline.resync()
+        self.metrics.wakeups.inc(label_value="clock_change")
+        self.timer_queue.cancel(self.tick_entry)
+        self.timer_entry = self.timer_queue.schedule_at(
+            deadline.deadline,
+            self.on_deadline_reached,
+            kind="shutdown",
+            label=self.mode
+        )
+        self.schedule_display_tick()
+        self.remaining_seconds = deadline.remaining_seconds()
+        self.update_timer_display()
+    
+    def schedule_display_tick(self):
+        """Queue the next display refresh at the next visible change of the timer text."""
+        self.tick_entry = self.timer_queue.schedule_at(
+            self.tick_planner.next_wake(self.deadline),
+            self.on_display_tick,
+            kind="tick"
+        )
+    
+    def on_display_tick(self, entry):
+        """
+        Refresh the timer display (runs on the queue's waiter thread).
+        
+        Remaining time is always derived from the monotonic deadline, so a
+        late refresh never pushes the shutdown back.
+        
+        Args:
+            entry: The fired TimerEntry
+        """
+        if not self.timer_running or entry is not self.tick_entry:
+            return
+        
+        lateness = self.deadline.clock() - entry.deadline
+        self.deadline.tick_drift.add(lateness)
+        self.tick_planner.record_wakeup()
+        self.metrics.tick_drift.observe(lateness)
+        self.metrics.wakeups.inc(label_value="tick")
+        self.remaining_seconds = self.deadline.remaining_seconds()
+        
+        # Update display in main thread
+        self.post_to_ui(self.update_timer_display)
+        
+        if not self.deadline.expired():
+            self.schedule_display_tick()
+    
+    def on_deadline_reached(self, entry):
+        """
+        Start the shutdown sequence (runs on the queue's waiter thread).
+        
+        Args:
+            entry: The fired TimerEntry
+        """
+        if not self.timer_running or entry is not self.timer_entry:
+            return
+        
+        self.deadline.record_fire()
+        self.metrics.fire_drift.observe(self.deadline.fire_drift)
+        self.metrics.wakeups.inc(label_value="shutdown")
+        self.remaining_seconds = 0
+        self.timer_queue.cancel(self.tick_entry)
+        self.stop_clock_watcher()
+        if self.journal:
+            self.journal.record_fired(self.journal_id)
+            self.journal_id = None
+            # Keep a repeating schedule on disk across the coming shutdown
+            rule = self.recurrence_rule
+            next_datetime = rule.next_after(self.clock.now()) if rule else None
+            if next_datetime:
+                self.journal_id = self.journal.record_schedule(
+                    next_datetime.timestamp(),
+                    kind="shutdown",
+                    label="scheduled",
+                    rule=rule.expression
+                )
+            self.journal.flush()
+        
+        self.begin_shutdown_sequence()
+    
+    def begin_shutdown_sequence(self):
+        """
+        Show the shutdown warning, after waiting for an idle machine if enabled.
+        
+        Called from the timer or process watcher thread once the trigger fired.
+        """
+        # Optionally wait (on the timer queue) for running jobs to finish first
+        if self.load_monitor:
+            try:
+                self.load_monitor.start(self.timer_queue, self.on_idle_reached)
+                self.post_to_ui(self.show_waiting_for_idle)
+                return
+            except OSError:
+                pass  # Load cannot be measured: shut down as usual
+        
+        # Stop the timer before showing popup
+        self.timer_running = False
+        self.warning_started = self.clock.monotonic()
+        self.post_to_ui(self.update_timer_display)
+        self.post_to_ui(self.shutdown_computer)
+    
+    def on_idle_reached(self, waited, reason):
+        """
+        Continue the deferred shutdown (runs on the queue's waiter thread).
+        
+        Args:
+            waited: Seconds spent waiting for the machine to become idle
+            reason: "idle", or "max_wait" if it never did
+        """
+        if not self.timer_running:
+            return
+        self.metrics.load_deferrals.inc(label_value=reason)
+        self.timer_running = False
+        self.warning_started = self.clock.monotonic()
+        self.post_to_ui(self.update_timer_display)
+        self.post_to_ui(self.shutdown_computer)
+    
+    def show_waiting_for_idle(self):
+        """Show that the deadline has passed and the shutdown waits for an idle machine."""
+        if self.timer_running:
+            self.show_timer_text(
+                f"Waiting for the computer to be idle (below {self.load_monitor.threshold:g}% load)"
+            )
     
     def update_timer_display(self):
         """Update the timer display label with current countdown."""
@@ -639,46 +1342,52 @@ class ShutdownScheduler:
             else:
                 display_text = f"Close the computer in {minutes} minutes {seconds} seconds"
             
-            self.timer_label.config(text=display_text)
+            self.show_timer_text(display_text)
             
             # Update tray tooltip if minimized
             if self.is_minimized_to_tray:
                 self.update_tray_tooltip()
         else:
             # Reset display when timer is not running
-            mode_text = "countdown duration" if self.mode == "countdown" else "scheduled time"
-            self.timer_label.config(text=f"Set {mode_text}")
+            self.show_timer_text(MODE_PROMPTS[self.mode])
     
     def shutdown_computer(self):
         """Show shutdown countdown popup and execute shutdown after 30 seconds."""
         # Create shutdown countdown popup
         self.show_shutdown_countdown()
     
-    def show_shutdown_countdown(self):
-        """Display a countdown popup with 30 seconds to cancel shutdown."""
-        # Create popup window
-        self.countdown_popup = tk.Toplevel(self.root)
-        self.countdown_popup.title("Shutdown Countdown")
-        self.countdown_popup.geometry("400x200")
-        self.countdown_popup.resizable(False, False)
-        self.countdown_popup.configure(bg='#f0f0f0')
-        
-        # Make popup modal (user must interact with it)
-        self.countdown_popup.transient(self.root)
-        self.countdown_popup.grab_set()
+    def schedule_popup_prebuild(self):
+        """Build the warning popup soon after a timer is armed, unless it already exists."""
+        if self.countdown_popup is None:
+            self.root.after(POPUP_PREBUILD_DELAY_MS, self.tracer.wrap(self.prepare_countdown_popup))
+    
+    def prepare_countdown_popup(self):
+        """
+        Build the shutdown warning popup, hidden, if it does not exist yet.
         
-        # Center the popup
-        self.center_popup()
+        The popup is built once while a timer runs and then only shown and
+        hidden, so the deadline does not wait for widget construction.
+        """
+        if self.countdown_popup is not None:
+            return
+        popup = tk.Toplevel(self.root)
+        popup.withdraw()
+        popup.title("Shutdown Countdown")
+        popup.resizable(False, False)
+        popup.configure(bg='#f0f0f0')
+        popup.transient(self.root)
+        # Closing the popup cancels, like the button (it is reused, never destroyed)
+        popup.protocol("WM_DELETE_WINDOW", self.cancel_shutdown_countdown)
         
         # Configure popup grid
-        self.countdown_popup.grid_rowconfigure(0, weight=1)
-        self.countdown_popup.grid_rowconfigure(1, weight=1)
-        self.countdown_popup.grid_rowconfigure(2, weight=1)
-        self.countdown_popup.grid_columnconfigure(0, weight=1)
+        popup.grid_rowconfigure(0, weight=1)
+        popup.grid_rowconfigure(1, weight=1)
+        popup.grid_rowconfigure(2, weight=1)
+        popup.grid_columnconfigure(0, weight=1)
         
         # Warning message
         warning_label = ttk.Label(
-            self.countdown_popup, 
+            popup, 
             text="⚠️ WARNING: Computer will shutdown!", 
             font=("Arial", 14, "bold"),
             foreground="red"
@@ -686,103 +1395,226 @@ class ShutdownScheduler:
         warning_label.grid(row=0, column=0, pady=(20, 10))
         
         # Countdown label
-        self.countdown_label = ttk.Label(
-            self.countdown_popup, 
-            text="Computer will shutdown in 30 seconds", 
-            font=("Arial", 12)
-        )
+        self.countdown_label = ttk.Label(popup, font=("Arial", 12))
         self.countdown_label.grid(row=1, column=0, pady=10)
         
+        # Pre-shutdown hooks run while the countdown is shown
+        height = 200
+        if self.hooks:
+            height = 220 + 18 * len(self.hooks)
+            popup.grid_rowconfigure(3, weight=1)
+            self.hook_label = ttk.Label(popup, font=("Arial", 9), justify="left")
+            self.hook_label.grid(row=2, column=0, padx=20, sticky="w")
+        
         # Cancel button
         cancel_button = ttk.Button(
-            self.countdown_popup, 
+            popup, 
             text="Cancel Shutdown", 
             command=self.cancel_shutdown_countdown,
             style="Accent.TButton"
         )
-        cancel_button.grid(row=2, column=0, pady=(10, 20))
+        cancel_button.grid(row=3 if self.hooks else 2, column=0, pady=(10, 20))
         
-        # Start countdown
-        self.countdown_seconds = 30
-        self.countdown_popup_running = True
-        self.update_shutdown_countdown()
+        popup.bind("<Map>", self.on_countdown_popup_mapped)
+        self.countdown_popup = popup
+        self.center_popup(400, height)
     
-    def update_shutdown_countdown(self):
-        """Update the countdown display and handle shutdown."""
-        if self.countdown_popup_running and self.countdown_seconds > 0:
-            # Update countdown label
-            self.countdown_label.config(text=f"Computer will shutdown in {self.countdown_seconds} seconds")
-            
-            # Decrease countdown
-            self.countdown_seconds -= 1
-            
-            # Schedule next update in 1 second
-            self.countdown_popup.after(1000, self.update_shutdown_countdown)
-        elif self.countdown_popup_running and self.countdown_seconds <= 0:
-            # Time's up - execute shutdown
-            self.execute_shutdown()
+    def show_shutdown_countdown(self):
+        """Display the countdown popup with 30 seconds to cancel shutdown."""
+        # Normally built in advance; built now if the deadline came first
+        self.prepare_countdown_popup()
+        self.countdown_label.config(
+            text=f"Computer will {ACTION_VERBS[self.power_action]} in {SHUTDOWN_GRACE_SECONDS} seconds"
+        )
+        if self.hooks:
+            self.hook_label.config(text=f"Running {len(self.hooks)} pre-shutdown hooks...")
+        self.countdown_popup.deiconify()
+        self.countdown_popup.lift()
+        
+        # Counted from when the deadline fired, so a slow UI cannot stretch the warning;
+        # a warning that comes very late still gets MIN_GRACE_SECONDS
+        self.grace_countdown = GraceCountdown(
+            SHUTDOWN_GRACE_SECONDS,
+            on_tick=self.tracer.wrap(self.update_shutdown_countdown),
+            on_expire=self.tracer.wrap(self.execute_shutdown),
+            call_later=self.countdown_popup.after,
+            cancel_call=self.countdown_popup.after_cancel,
+            clock=self.clock.monotonic
+        )
+        self.grace_countdown.start(started_at=self.warning_started)
+        
+        if self.hooks:
+            self.hook_runner = HookRunner(
+                self.hooks, on_result=lambda result: self.post_to_ui(self.show_hook_result, result)
+            )
+            self.hook_runner.start(time_limit=self.grace_countdown.deadline.remaining())
+    
+    def on_countdown_popup_mapped(self, event):
+        """
+        Record how long the warning took to appear, then make it modal.
+        
+        If it appeared so late that little of the grace period is left, the
+        countdown is extended to MIN_GRACE_SECONDS from now.
+        
+        Args:
+            event: Tk <Map> event (also delivered for the popup's children)
+        """
+        if event.widget is not self.countdown_popup:
+            return
+        if self.warning_started is not None:
+            latency = self.clock.monotonic() - self.warning_started
+            self.warning_started = None
+            self.metrics.popup_latency.observe(latency)
+            now = time.perf_counter()
+            self.tracer.record("deadline to warning popup", now - latency, now)
+            if self.grace_countdown:
+                self.grace_countdown.extend_to_minimum()
+        try:
+            # Grabbing only works once the window is viewable
+            self.countdown_popup.grab_set()
+        except tk.TclError:
+            pass
+    
+    def hide_countdown_popup(self):
+        """Hide the warning popup for reuse."""
+        if self.countdown_popup is not None:
+            self.countdown_popup.grab_release()
+            self.countdown_popup.withdraw()
+    
+    def show_hook_result(self, result):
+        """
+        Show a finished pre-shutdown hook in the countdown popup.
+        
+        Args:
+            result: shutdown_hooks.HookResult
+        """
+        self.metrics.hook_runs.inc(label_value=result.status)
+        runner = self.hook_runner
+        if not runner or self.countdown_popup is None or not self.countdown_popup.winfo_viewable():
+            return
+        lines = [runner.summary()] + [item.describe() for item in runner.results]
+        self.hook_label.config(text="\n".join(lines))
+    
+    def stop_hooks(self):
+        """Kill pre-shutdown hooks that are still running (never waits for them)."""
+        if self.hook_runner:
+            self.hook_runner.cancel()
+    
+    def update_shutdown_countdown(self, seconds_left):
+        """
+        Update the countdown display.
+        
+        Args:
+            seconds_left: Whole seconds until the shutdown
+        """
+        self.countdown_label.config(text=f"Computer will {ACTION_VERBS[self.power_action]} in {seconds_left} seconds")
     
     def cancel_shutdown_countdown(self):
         """Cancel the shutdown countdown and close popup."""
-        self.countdown_popup_running = False
+        if self.grace_countdown:
+            self.grace_countdown.cancel()
+        self.stop_hooks()
+        self.warning_started = None
         
-        # Close popup
-        if hasattr(self, 'countdown_popup'):
-            self.countdown_popup.destroy()
+        # Hide the popup until the next deadline
+        self.hide_countdown_popup()
         
-        # Reset timer state
+        # Reset timer state, keeping a repeating schedule alive for its next occurrence
+        rule = self.recurrence_rule
         self.cancel_timer()
+        if rule:
+            next_datetime = rule.next_after(self.clock.now())
+            if next_datetime:
+                self.arm_scheduled_datetime(next_datetime, rule)
     
-    def center_popup(self):
-        """Center the popup window on screen."""
-        self.countdown_popup.update_idletasks()
-        width = self.countdown_popup.winfo_width()
-        height = self.countdown_popup.winfo_height()
+    def center_popup(self, width, height):
+        """
+        Size and center the popup window on screen.
+        
+        Args:
+            width: Popup width in pixels
+            height: Popup height in pixels
+        """
         x = (self.countdown_popup.winfo_screenwidth() // 2) - (width // 2)
         y = (self.countdown_popup.winfo_screenheight() // 2) - (height // 2)
         self.countdown_popup.geometry(f"{width}x{height}+{x}+{y}")
     
     def execute_shutdown(self):
-        """Execute the actual shutdown command."""
+        """Execute the action prepared when the timer was armed."""
         try:
-            # Close popup first
-            if hasattr(self, 'countdown_popup'):
-                self.countdown_popup.destroy()
+            # Hide popup first
+            self.hide_countdown_popup()
             
-            # Windows shutdown command
-            subprocess.run(["shutdown", "/s", "/t", "0"], check=True)
-        except subprocess.CalledProcessError:
+            # The shutdown does not wait for hooks that are still running
+            self.stop_hooks()
+            with self.metrics.execute_shutdown.time():
+                self.prepared_action.run()
+        except (subprocess.CalledProcessError, OSError):
+            self.metrics.shutdown_failures.inc()
             messagebox.showerror("Error", "Failed to shutdown computer. Please shutdown manually.")
             self.cancel_timer()
+            return
+        
+        if isinstance(self.action_backend, DryRunBackend):
+            messagebox.showinfo("Dry Run", f"Would run: {self.prepared_action.describe()}")
+            self.cancel_timer()
     
     def create_tray_icon(self):
         """Create a simple icon for the system tray."""
-        # Create a 64x64 icon with a simple design
-        width = 64
-        height = 64
-        
-        # Create image with dark background
-        image = Image.new('RGBA', (width, height), (43, 43, 43, 255))
-        draw = ImageDraw.Draw(image)
+        # Reuse the icon rendered by a previous run if it is cached
+        cached = self.startup_cache.get_bytes("tray_icon_png")
+        if cached:
+            try:
+                return tray_icons.decode_png(cached)
+            except Exception:
+                pass
         
-        # Draw a simple clock/timer icon
-        # Outer circle
-        draw.ellipse([8, 8, width-8, height-8], outline=(255, 255, 255, 255), width=3)
+        # 64x64 clock on a dark background
+        image = tray_icons.draw_clock()
+        self.startup_cache.set_bytes("tray_icon_png", tray_icons.encode_png(image))
+        return image
+    
+    def prepare_tray_assets(self):
+        """
+        Import the tray modules and prepare the icon and progress frames.
         
-        # Clock hands
-        center_x, center_y = width // 2, height // 2
-        # Hour hand
-        draw.line([center_x, center_y, center_x, 12], fill=(255, 255, 255, 255), width=3)
-        # Minute hand
-        draw.line([center_x, center_y, center_x + 8, center_y], fill=(255, 255, 255, 255), width=2)
+        Runs on the warm-up thread, or on the Tk thread if the user
+        minimizes before the warm-up has finished; the lock makes the
+        second caller wait for the first.
+        """
+        with self.tray_lock:
+            if self.tray_frames is not None:
+                return
+            load_tray_modules()
+            self.tray_image = self.create_tray_icon()
+            
+            # Load the progress ring frames from the startup cache, or render and cache them
+            frames = tray_icons.TrayIconCache()
+            cached = self.startup_cache.get_bytes_map("tray_frames")
+            if not (cached and frames.load_frames(cached)):
+                frames.prerender()
+                self.startup_cache.set_bytes_map("tray_frames", frames.export_frames())
+                self.startup_cache.save()
+            self.tray_frames = frames
+    
+    def start_tray_warmup(self):
+        """Prepare the tray assets on a background thread."""
+        def warm_up():
+            try:
+                self.prepare_tray_assets()
+            except Exception as e:
+                pass  # setup_system_tray will retry and fall back to no tray
         
-        return image
+        threading.Thread(target=warm_up, daemon=True).start()
     
     def setup_system_tray(self):
-        """Setup the system tray icon and menu."""
+        """Setup the system tray icon and menu (once, on first use)."""
+        if self.tray_icon:
+            return
         try:
             # Create tray icon
-            icon_image = self.create_tray_icon()
+            self.prepare_tray_assets()
+            icon_image = self.tray_image
             
             # Create tray menu with proper callbacks
             menu = pystray.Menu(
@@ -800,6 +1632,7 @@ class ShutdownScheduler:
                 "Shutdown Scheduler",
                 menu
             )
+            self.tray_updater = tray_icons.TrayUpdater(self.tray_icon, self.tray_frames)
             
         except Exception as e:
             self.tray_icon = None
@@ -809,6 +1642,12 @@ class ShutdownScheduler:
     def minimize_to_tray(self):
         """Minimize the window to system tray."""
         try:
+            self.setup_system_tray()
+            if not self.tray_icon:
+                # No tray available (e.g. pystray missing): keep a taskbar entry
+                self.root.iconify()
+                return
+            
             self.root.withdraw()  # Hide the window
             self.is_minimized_to_tray = True
             
@@ -819,12 +1658,30 @@ class ShutdownScheduler:
                     import threading
                     tray_thread = threading.Thread(target=self.tray_icon.run_detached, daemon=True)
                     tray_thread.start()
-                else:
-                    # If already visible, update the tooltip
-                    self.update_tray_tooltip()
+                # Show the current progress right away
+                self.update_tray_tooltip(force=True)
+            
+            if self.low_memory_tray:
+                self.tear_down_window()
         except Exception as e:
             pass
     
+    def tear_down_window(self):
+        """
+        Destroy the hidden main window's widgets (--low-memory-tray).
+        
+        The Tk root, the input variables and the warning popup stay, so
+        timers keep running and show_window can rebuild the window.
+        """
+        if self.main_frame is None:
+            return
+        self.main_frame.destroy()
+        self.main_frame = None
+        self.mode_frames = {}
+        self.timer_label = None
+        self.start_button = None
+        self.cancel_button = None
+    
     def cleanup_tray_icon(self):
         """Clean up the tray icon properly."""
         try:
@@ -846,7 +1703,17 @@ class ShutdownScheduler:
     
     def show_window(self, icon=None, item=None):
         """Show the main window from system tray."""
+        if threading.current_thread() is not threading.main_thread():
+            # Called from the tray thread: widgets may only be built on the Tk thread
+            self.post_to_ui(self.show_window)
+            return
         try:
+            if self.main_frame is None:
+                # Torn down in the tray: rebuild from the scheduler state
+                self.setup_ui()
+                if self.timer_running and self.deadline and not self.deadline.expired():
+                    self.remaining_seconds = self.deadline.remaining_seconds()
+                    self.update_timer_display()
             self.root.deiconify()  # Show the window
             self.root.lift()  # Bring to front
             self.root.focus_force()  # Focus the window
@@ -859,9 +1726,11 @@ class ShutdownScheduler:
             pass
     
     def cancel_timer_from_tray(self, icon=None, item=None):
-        """Cancel timer from system tray menu."""
-        self.cancel_timer()
+        """Cancel timer from system tray menu (runs on the tray thread)."""
+        # cancel_timer updates widgets, so it has to run on the Tk thread
+        self.post_to_ui(self.cancel_timer)
         if self.is_minimized_to_tray:
+            # Posts itself as well, so the window is shown after the cancel
             self.show_window()
     
     def on_closing(self):
@@ -889,7 +1758,12 @@ class ShutdownScheduler:
                 finally:
                     self.tray_icon = None
             
-            # Clean up lock file
+            # Stop the control socket, flush the journal and clean up lock file
+            self.stop_control_server()
+            self.stop_metrics_export()
+            self.write_trace()
+            self.close_journal()
+            self.save_startup_cache()
             self.cleanup_lock_file()
             
             # Use sys.exit for proper cleanup
@@ -917,8 +1791,14 @@ class ShutdownScheduler:
             # Cancel any running timer
             if self.timer_running:
                 self.cancel_timer()
+            self.timer_queue.stop()
             
-            # Clean up lock file
+            # Stop the control socket, flush the journal and clean up lock file
+            self.stop_control_server()
+            self.stop_metrics_export()
+            self.write_trace()
+            self.close_journal()
+            self.save_startup_cache()
             self.cleanup_lock_file()
             
             # Destroy the main window
@@ -937,26 +1817,294 @@ class ShutdownScheduler:
             import os
             os._exit(0)
     
-    def update_tray_tooltip(self):
-        """Update the tray icon tooltip with remaining time."""
-        if self.tray_icon and self.timer_running and self.remaining_seconds > 0:
+    def update_tray_tooltip(self, force=False):
+        """
+        Update the tray icon progress ring and tooltip with remaining time.
+        
+        The icon is only swapped when the progress ring changes and tooltip
+        writes are deduplicated and rate-limited by the TrayUpdater.
+        
+        Args:
+            force: Write the tooltip even inside the rate limit
+        """
+        if self.tray_updater and self.timer_running and self.remaining_seconds > 0:
             # Calculate remaining time
             hours = self.remaining_seconds // 3600
             minutes = (self.remaining_seconds % 3600) // 60
             seconds = self.remaining_seconds % 60
             
-            # Create tooltip text
+            # Create tooltip text (same granularity as the timer display)
             if hours > 0:
-                tooltip_text = f"Shutdown in {hours}h {minutes}m {seconds}s"
+                tooltip_text = f"Shutdown in {hours}h {minutes}m"
             else:
                 tooltip_text = f"Shutdown in {minutes}m {seconds}s"
             
-            # Update tray icon tooltip
+            # Update tray icon progress and tooltip
+            fraction = self.deadline.remaining() / self.deadline.duration if self.deadline.duration else 0.0
             try:
-                self.tray_icon.title = tooltip_text
+                self.tray_updater.update(fraction, tooltip_text, force=force)
             except:
                 pass  # Ignore errors if tray icon is not available
     
+    def reset_tray_icon(self):
+        """Show the plain clock icon and default tooltip again."""
+        if self.tray_updater:
+            try:
+                self.tray_icon.icon = self.tray_image
+                self.tray_icon.title = "Shutdown Scheduler"
+            except:
+                pass  # Ignore errors if tray icon is not available
+            self.tray_updater.reset()
+    
+    def setup_control_server(self):
+        """Start the JSON-RPC control socket used by scripts and later instances."""
+        self.control_server = ControlServer({
+            "status": self.rpc_status,
+            "schedule": self.rpc_schedule,
+            "cancel": self.rpc_cancel,
+            "pending": self.rpc_pending,
+            "show": self.rpc_show,
+            "metrics": self.rpc_metrics,
+            "trace": self.rpc_trace,
+        })
+        try:
+            self.control_server.start()
+        except Exception as e:
+            pass  # The app works without remote control
+    
+    def call_in_tk(self, function, *args):
+        """
+        Run function on the Tk thread from the control server's loop.
+        
+        Returns:
+            asyncio.Future: Resolves to the function's return value
+        """
+        return run_on_thread(self.post_to_ui, function, *args)
+    
+    def post_to_ui(self, callback, *args):
+        """
+        Run callback on the Tk thread as soon as possible (callable from any thread).
+        
+        The number of posted callbacks still waiting and the delay before
+        each one runs are recorded in the metrics, and the callback is
+        traced when tracing is on.
+        
+        Args:
+            callback: Function to run on the Tk thread
+            *args: Arguments for callback
+        """
+        posted = time.perf_counter()
+        with self.ui_lock:
+            self.ui_pending += 1
+        
+        def run():
+            with self.ui_lock:
+                self.ui_pending -= 1
+            started = time.perf_counter()
+            self.metrics.ui_lag.observe(started - posted)
+            if not self.tracer.enabled:
+                callback(*args)
+                return
+            try:
+                callback(*args)
+            finally:
+                self.tracer.record(getattr(callback, "__name__", "callback"), started, time.perf_counter(),
+                                   queued_ms=round((started - posted) * 1000.0, 3))
+        
+        self.root.after(0, run)
+    
+    def rpc_status(self):
+        """
+        Report the timer state (control socket method "status").
+        
+        Only reads state, so it answers without a round-trip through Tk.
+        
+        Returns:
+            dict: running, mode, remaining_seconds, shutdown_at and repeat
+        """
+        deadline = self.deadline
+        watcher = self.process_watcher
+        triggered = watcher is not None or self.throughput_monitor is not None
+        running = self.timer_running and (deadline is not None or triggered)
+        timed = running and deadline is not None
+        remaining = deadline.remaining() if timed else 0
+        rule = self.recurrence_rule
+        return {
+            "running": running,
+            "mode": self.mode,
+            "remaining_seconds": remaining,
+            "shutdown_at": (self.clock.now() + timedelta(seconds=remaining)).isoformat(timespec="seconds") if timed else None,
+            "repeat": rule.expression if rule else None,
+            "waiting_for_pids": sorted(watcher.remaining) if running and watcher else None,
+        }
+    
+    def rpc_schedule(self, seconds=None, at=None):
+        """
+        Start (or replace) the timer (control socket method "schedule").
+        
+        Args:
+            seconds: Countdown length in seconds
+            at: ISO date and time to shut down at, e.g. "2025-01-31T22:00"
+        
+        Returns:
+            asyncio.Future: Resolves to the new status
+        """
+        if (seconds is None) == (at is None):
+            raise RpcError(INVALID_PARAMS, "Pass exactly one of 'seconds' or 'at'")
+        
+        if seconds is not None:
+            if not isinstance(seconds, (int, float)) or seconds <= 0:
+                raise RpcError(INVALID_PARAMS, "'seconds' must be a positive number")
+            arm = lambda: self.arm_countdown(seconds)
+        else:
+            try:
+                scheduled_datetime = datetime.fromisoformat(at)
+            except (TypeError, ValueError):
+                raise RpcError(INVALID_PARAMS, "'at' must be an ISO date and time")
+            if scheduled_datetime.tzinfo is not None:
+                # "...+02:00": the same moment in local time
+                scheduled_datetime = scheduled_datetime.astimezone().replace(tzinfo=None)
+            if scheduled_datetime.timestamp() <= self.clock.time():
+                raise RpcError(INVALID_PARAMS, "Scheduled time must be in the future.")
+            arm = lambda: self.arm_scheduled_datetime(scheduled_datetime)
+        
+        def replace_timer():
+            if self.timer_running:
+                self.cancel_timer()
+            arm()
+            return self.rpc_status()
+        return self.call_in_tk(replace_timer)
+    
+    def rpc_cancel(self):
+        """
+        Cancel the running timer (control socket method "cancel").
+        
+        Returns:
+            asyncio.Future: Resolves to {"cancelled": bool}
+        """
+        def cancel():
+            was_running = self.timer_running
+            self.cancel_timer()
+            return {"cancelled": was_running}
+        return self.call_in_tk(cancel)
+    
+    def rpc_pending(self):
+        """
+        List scheduled actions in the timer queue (control socket method "pending").
+        
+        Returns:
+            list: One dict per entry with id, kind, label and remaining_seconds
+        """
+        now = self.timer_queue.clock()
+        return [
+            {
+                "id": entry.entry_id,
+                "kind": entry.kind,
+                "label": entry.label,
+                "remaining_seconds": max(0.0, entry.deadline - now),
+            }
+            for entry in self.timer_queue.pending()
+            if entry.kind != "tick"
+        ]
+    
+    def rpc_show(self):
+        """
+        Bring the window to the front (control socket method "show").
+        
+        Returns:
+            asyncio.Future: Resolves to True
+        """
+        def show():
+            self.show_window()
+            return True
+        return self.call_in_tk(show)
+    
+    def rpc_metrics(self):
+        """
+        Render the metrics (control socket method "metrics").
+        
+        Returns:
+            str: Prometheus text exposition format
+        """
+        return self.metrics.render()
+    
+    def rpc_trace(self, path=None):
+        """
+        Report UI responsiveness (control socket method "trace").
+        
+        Args:
+            path: Also write the Chrome trace to this file (optional)
+        
+        Returns:
+            dict: enabled, main-loop lag, slowest handlers and spans written
+        
+        Raises:
+            RpcError: If tracing is off or the trace cannot be written
+        """
+        if not self.tracer.enabled:
+            raise RpcError(INVALID_PARAMS, "Tracing is off; start the app with --trace PATH")
+        result = {
+            "enabled": True,
+            "lag": self.lag_probe.report() if self.lag_probe else None,
+            "slowest": self.tracer.summary(),
+        }
+        if path is not None:
+            try:
+                result["spans_written"] = self.tracer.write(str(path))
+            except OSError as e:
+                raise RpcError(INVALID_PARAMS, f"Cannot write the trace: {e}")
+        return result
+    
+    def write_trace(self):
+        """Write the --trace file (called on exit)."""
+        try:
+            if self.tracer.enabled and self.trace_path:
+                if self.lag_probe:
+                    self.lag_probe.stop()
+                self.tracer.write(self.trace_path)
+        except Exception as e:
+            pass
+    
+    def bind_metrics(self):
+        """Point the metrics gauges at the live timer, tray and control objects."""
+        bind = self.metrics.bind
+        bind("timer_running", lambda: int(self.timer_running))
+        bind("pending_deadlines", lambda: len(self.timer_queue))
+        bind("ui_callbacks_pending", lambda: self.ui_pending)
+        bind("tray_icon_swaps", lambda: self.tray_updater.icon_swaps if self.tray_updater else 0)
+        bind("tray_title_writes", lambda: self.tray_updater.title_writes if self.tray_updater else 0)
+        bind("tray_updates_skipped", lambda: self.tray_updater.skipped if self.tray_updater else 0)
+        bind("control_requests", lambda: self.control_server.requests_served)
+    
+    def setup_metrics_export(self, metrics_file=None, metrics_port=None):
+        """
+        Export the metrics to a file and/or a localhost HTTP endpoint.
+        
+        Args:
+            metrics_file: Path rewritten every few seconds (optional)
+            metrics_port: Port for http://127.0.0.1:PORT/metrics (optional)
+        """
+        try:
+            if metrics_file:
+                writer = MetricsFileWriter(self.metrics, metrics_file)
+                writer.start()
+                self.metrics_exporters.append(writer)
+            if metrics_port is not None:
+                server = MetricsHTTPServer(self.metrics, metrics_port)
+                server.start()
+                self.metrics_exporters.append(server)
+        except OSError as e:
+            messagebox.showwarning("Metrics", f"Could not export metrics: {e}")
+    
+    def stop_metrics_export(self):
+        """Stop the metrics file writer and HTTP endpoint."""
+        for exporter in self.metrics_exporters:
+            try:
+                exporter.stop()
+            except Exception as e:
+                pass
+        self.metrics_exporters = []
+    
     def signal_handler(self, signum, frame):
         """Handle system signals for proper cleanup."""
         self.force_quit()
@@ -964,11 +2112,93 @@ class ShutdownScheduler:
     def run(self):
         """Start the application main loop."""
         self.root.mainloop()
+    
+    def finish_startup_profile(self):
+        """
+        Write the --profile-startup report and exit.
+        
+        Unlike quit_app, a pending timer is left in the journal so that
+        profiling never cancels a real schedule.
+        """
+        for path in PROFILER.write():
+            print(f"Startup profile written to {path}")
+        
+        if self.tray_icon:
+            try:
+                self.tray_icon.stop()
+            except Exception as e:
+                pass
+        self.timer_queue.stop()
+        self.stop_control_server()
+        self.stop_metrics_export()
+        self.write_trace()
+        self.close_journal()
+        self.save_startup_cache()
+        self.cleanup_lock_file()
+        self.root.destroy()
+
+
+def build_parser():
+    """Create the command-line parser."""
+    parser = argparse.ArgumentParser(description="Schedule a computer shutdown.")
+    parser.add_argument("--profile-startup", nargs="?", const=DEFAULT_REPORT_PATH, metavar="PATH",
+                        help="time the startup phases, write PATH.json and PATH.folded, and exit")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="keep Prometheus metrics in this file (rewritten every 15 seconds)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--action", choices=ACTIONS, default="shutdown",
+                        help="what to do at the deadline (default: shutdown)")
+    parser.add_argument("--command", metavar="CMD",
+                        help="command line for --action custom")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="show the command instead of running it")
+    parser.add_argument("--hook", action="append", metavar="CMD",
+                        help="command to run during the warning period (repeatable; see also hooks.json)")
+    parser.add_argument("--when-idle", nargs="?", type=float, const=DEFAULT_THRESHOLD, metavar="PERCENT",
+                        help=f"after the deadline, wait until CPU use and load drop below PERCENT "
+                             f"(default: {DEFAULT_THRESHOLD:g})")
+    parser.add_argument("--max-defer", type=float, default=DEFAULT_MAX_WAIT / 60, metavar="MINUTES",
+                        help="longest wait for --when-idle (default: %(default)g)")
+    parser.add_argument("--low-memory-tray", action="store_true",
+                        help="free the main window while minimized to the tray and rebuild it when shown")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="trace UI handlers and main-loop lag, write a Chrome trace to PATH on exit")
+    return parser
 
 
-def main():
+def main(argv=None):
     """Main entry point for the application."""
-    app = ShutdownScheduler()
+    # --profile-startup is acted on by PROFILER at import time
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.action == "custom" and not args.command:
+        parser.error("--action custom needs --command")
+    try:
+        hooks = load_hooks() + hooks_from_commands(args.hook)
+    except ValueError as e:
+        parser.error(str(e))
+    load_monitor = None
+    if args.when_idle is not None:
+        if not load_monitoring_available():
+            parser.error("--when-idle needs psutil on this system")
+        load_monitor = LoadMonitor(args.when_idle, max_wait=args.max_defer * 60)
+    
+    with PROFILER.phase("__init__"):
+        app = ShutdownScheduler(trace_path=args.trace, action=args.action, command=args.command,
+                                dry_run=args.dry_run, hooks=hooks, load_monitor=load_monitor,
+                                low_memory_tray=args.low_memory_tray)
+    app.setup_metrics_export(args.metrics_file, args.metrics_port)
+    
+    if PROFILER.enabled:
+        # Draw the first window, then report instead of entering the main loop
+        with PROFILER.phase("first_window"):
+            app.root.update()
+        PROFILER.mark("first_window")
+        PROFILER.time_imports(DEFERRED_MODULES, phase="deferred_imports")
+        app.finish_startup_profile()
+        return
+    
     app.run()
 
 
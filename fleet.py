@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Fleet control for the Shutdown Scheduler.
+
+One controller arms or cancels shutdowns on many machines at once. Each
+machine runs the headless scheduler as an agent (headless.py --agent),
+which serves the usual control protocol on a TCP port; the controller
+(headless.py --fleet INVENTORY) sends every agent the same JSON-RPC
+request concurrently from one asyncio loop.
+
+- Concurrency is bounded (CONCURRENCY connections at a time), so a lab of
+  hundreds of hosts neither exhausts file descriptors nor floods the network.
+- Connection failures and timeouts are retried with exponential backoff;
+  an error answered by the agent is final.
+- Staggered schedules give host i a deadline STAGGER * i seconds after the
+  first, so the lab does not power-cycle in the same second. Deadlines are
+  sent as seconds from now, recomputed on every attempt, so clock skew
+  between the machines and time spent retrying do not move them.
+
+The inventory is a text file with one host[:port] per line; blank lines and
+"#" comments are ignored.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import asyncio
+import json
+import time
+
+from control_server import RpcError
+
+# Port agents listen on unless the inventory says otherwise
+DEFAULT_PORT = 47470
+
+# Requests in flight at once
+CONCURRENCY = 64
+
+# Attempts after the first one fails to connect or times out
+RETRIES = 2
+
+# Seconds before the first retry (doubled for each further retry)
+BACKOFF = 0.5
+
+# Seconds allowed for connecting and answering
+TIMEOUT = 5.0
+
+
+class Host:
+    """An agent address from the inventory."""
+
+    def __init__(self, name, port=DEFAULT_PORT):
+        """
+        Initialize the address.
+
+        Args:
+            name: Host name or IP address
+            port: Agent TCP port
+        """
+        self.name = name
+        self.port = port
+
+    def __str__(self):
+        """Return host:port."""
+        return f"{self.name}:{self.port}"
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """
+    Split "host", "host:port" or "[v6addr]:port".
+
+    Returns:
+        tuple: (host, port)
+
+    Raises:
+        ValueError: If the port is not a number
+    """
+    text = text.strip()
+    if text.startswith("["):
+        host, _, rest = text[1:].partition("]")
+        port = rest[1:] if rest.startswith(":") else ""
+    elif text.count(":") == 1:
+        host, port = text.split(":")
+    else:
+        host, port = text, ""  # Bare name or unbracketed IPv6 address
+    if port and not port.isdigit():
+        raise ValueError(f"Invalid port in {text!r}")
+    return host, int(port) if port else default_port
+
+
+def load_inventory(path):
+    """
+    Read a host inventory.
+
+    Args:
+        path: Text file with one host[:port] per line
+
+    Returns:
+        list: Host objects in file order
+
+    Raises:
+        ValueError: If the file cannot be read, lists no hosts or has a bad line
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError as e:
+        raise ValueError(f"Cannot read {path}: {e}")
+
+    hosts = []
+    for number, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            hosts.append(Host(*parse_address(line)))
+        except ValueError as e:
+            raise ValueError(f"{path} line {number}: {e}")
+    if not hosts:
+        raise ValueError(f"{path} lists no hosts")
+    return hosts
+
+
+def read_token(path):
+    """
+    Read the shared secret from a file.
+
+    Raises:
+        ValueError: If the file cannot be read or is empty
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            token = f.read().strip()
+    except OSError as e:
+        raise ValueError(f"Cannot read {path}: {e}")
+    if not token:
+        raise ValueError(f"{path} is empty")
+    return token
+
+
+class HostResult:
+    """Outcome of one request to one agent."""
+
+    def __init__(self, host, ok, attempts, elapsed, result=None, error=None):
+        """
+        Initialize the result.
+
+        Args:
+            host: Host
+            ok: True if the agent answered with a result
+            attempts: Connections tried
+            elapsed: Seconds from the first attempt to the outcome
+            result: The agent's answer (if ok)
+            error: Explanation (if not ok)
+        """
+        self.host = host
+        self.ok = ok
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.result = result
+        self.error = error
+
+    def describe(self):
+        """One-line summary for the console."""
+        retries = f", {self.attempts} attempts" if self.attempts > 1 else ""
+        outcome = "ok" if self.ok else f"FAILED - {self.error}"
+        return f"{self.host}: {outcome} ({self.elapsed * 1000:.0f} ms{retries})"
+
+
+async def call_agent(host, method, params=None, token=None, timeout=TIMEOUT):
+    """
+    Send one JSON-RPC request to an agent.
+
+    Returns:
+        The method's result
+
+    Raises:
+        RpcError: If the agent answers with an error
+        OSError: If the connection fails or is closed early
+        asyncio.TimeoutError: If connecting or answering takes too long
+    """
+    request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}
+    if token is not None:
+        request["auth"] = token
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(host.name, host.port)
+        try:
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            return await reader.readline()
+        finally:
+            writer.close()
+
+    line = await asyncio.wait_for(exchange(), timeout)
+    if not line:
+        raise ConnectionError("Connection closed by the agent")
+    try:
+        response = json.loads(line)
+    except ValueError:
+        raise ConnectionError("Invalid response from the agent")
+    if "error" in response:
+        raise RpcError(response["error"]["code"], response["error"]["message"])
+    return response["result"]
+
+
+class FleetController:
+    """Sends control requests to many agents concurrently."""
+
+    def __init__(self, hosts, token=None, concurrency=CONCURRENCY, retries=RETRIES, backoff=BACKOFF,
+                 timeout=TIMEOUT, clock=time.monotonic):
+        """
+        Initialize the controller.
+
+        Args:
+            hosts: List of Host
+            token: Shared secret the agents require (optional)
+            concurrency: Requests in flight at once
+            retries: Extra attempts after a connection failure or timeout
+            backoff: Seconds before the first retry, doubled after each
+            timeout: Seconds per attempt
+            clock: Monotonic time source
+        """
+        self.hosts = list(hosts)
+        self.token = token
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.clock = clock
+
+    def dispatch(self, method, params_for=None):
+        """
+        Call a method on every agent and wait for all of them.
+
+        Args:
+            method: Control method, e.g. "schedule"
+            params_for: Function of (index, host) returning that host's params,
+                called again for every attempt (optional)
+
+        Returns:
+            list: HostResult per host, in inventory order
+        """
+        return asyncio.run(self.dispatch_async(method, params_for))
+
+    async def dispatch_async(self, method, params_for=None):
+        """Coroutine behind dispatch(), for callers that already run a loop."""
+        slots = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(
+            self._call_with_retries(slots, index, host, method, params_for)
+            for index, host in enumerate(self.hosts)
+        ))
+
+    async def _call_with_retries(self, slots, index, host, method, params_for):
+        """Call one agent, retrying connection failures and timeouts."""
+        started = self.clock()
+        attempts = 0
+        delay = self.backoff
+        while True:
+            attempts += 1
+            async with slots:
+                try:
+                    params = params_for(index, host) if params_for else {}
+                    result = await call_agent(host, method, params, self.token, self.timeout)
+                    return HostResult(host, True, attempts, self.clock() - started, result)
+                except RpcError as e:
+                    return HostResult(host, False, attempts, self.clock() - started, error=e.message)
+                except ValueError as e:
+                    return HostResult(host, False, attempts, self.clock() - started, error=str(e))
+                except (OSError, asyncio.TimeoutError) as e:
+                    error = str(e) or "timed out"
+            if attempts > self.retries:
+                return HostResult(host, False, attempts, self.clock() - started, error=error)
+            # Sleep outside the semaphore so other hosts proceed meanwhile
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    def schedule(self, seconds, stagger=0.0):
+        """
+        Arm a shutdown on every agent.
+
+        Args:
+            seconds: Seconds from now until the first host's deadline
+            stagger: Seconds between consecutive hosts' deadlines
+
+        Returns:
+            list: HostResult per host
+        """
+        start = self.clock()
+
+        def params_for(index, host):
+            remaining = start + seconds + index * stagger - self.clock()
+            if remaining <= 0:
+                raise ValueError("Deadline passed while retrying")
+            return {"seconds": remaining}
+        return self.dispatch("schedule", params_for)
+
+    def cancel(self):
+        """Cancel the pending shutdown on every agent."""
+        return self.dispatch("cancel")
+
+    def status(self):
+        """Ask every agent for its timer state."""
+        return self.dispatch("status")
@@ -0,0 +1,869 @@
+#!/usr/bin/env python3
+"""
+Headless Shutdown Scheduler - schedule a shutdown without a GUI.
+
+Shares the timer engine and shutdown logic with the desktop application but
+never imports tkinter, PIL or pystray, so it starts fast and stays small on
+build and render nodes.
+
+Usage:
+    python headless.py --in 2h30m
+    python headless.py --at 22:00
+    python headless.py --cron "0 22 * * 1-5"
+    python headless.py --status
+    python headless.py --cancel
+    python headless.py --in 2h --metrics-port 9464
+    python headless.py --at 03:00 --action reboot
+    python headless.py --after-exit ffmpeg --after-exit 4242
+    python headless.py --after-quiet 200 --quiet-minutes 5
+    python headless.py --agent 47470 --token-file lab.token
+    python headless.py --fleet lab.txt --token-file lab.token --in 1h --stagger 2
+
+If an instance (GUI or headless) is already running, --in and --at are sent
+to it over the control socket instead of starting a second scheduler.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import argparse
+import json
+import math
+import re
+import signal
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from clock import SYSTEM_CLOCK
+from clock_watch import ClockWatcher
+from control_server import ControlClient, ControlServer, RpcError, INVALID_PARAMS
+from fleet import CONCURRENCY, RETRIES, FleetController, load_inventory, parse_address, read_token
+from load_monitor import DEFAULT_MAX_WAIT, DEFAULT_THRESHOLD, LoadMonitor, load_monitoring_available
+from metrics import MetricsFileWriter, MetricsHTTPServer, SchedulerMetrics
+from process_watch import ProcessWatcher, find_processes, parse_targets
+from recurrence import RecurrenceRule
+from throughput_monitor import DEFAULT_QUIET_PERIOD, ThroughputMonitor, format_rate
+from throughput_monitor import DEFAULT_THRESHOLD as DEFAULT_QUIET_RATE
+from shutdown_actions import ACTIONS, DryRunBackend, default_backend
+from shutdown_hooks import HookRunner, hooks_from_commands, load_hooks
+from single_instance import InstanceLock
+from timer_engine import DeadlineTimer, TimerQueue, WallDeadlineTimer
+
+DURATION_PATTERN = re.compile(r"(\d+)\s*([hms])", re.IGNORECASE)
+DURATION_UNITS = {"h": 3600, "m": 60, "s": 1}
+
+
+def parse_duration(text):
+    """
+    Parse a duration such as "2h30m", "90m" or "45s".
+
+    A bare number is taken as minutes.
+
+    Args:
+        text: Duration text
+
+    Returns:
+        int: Duration in seconds
+
+    Raises:
+        ValueError: If the text is not a valid positive duration
+    """
+    text = text.strip()
+    if text.isdigit():
+        seconds = int(text) * 60
+    else:
+        parts = DURATION_PATTERN.findall(text)
+        if not parts or DURATION_PATTERN.sub("", text).strip():
+            raise ValueError(f"Invalid duration: {text!r}")
+        seconds = sum(int(amount) * DURATION_UNITS[unit.lower()] for amount, unit in parts)
+
+    if seconds <= 0:
+        raise ValueError("Duration must be greater than 0")
+    return seconds
+
+
+def seconds_until(moment, clock=SYSTEM_CLOCK):
+    """
+    Seconds of real time from now until a local wall-clock time.
+
+    Naive datetimes are subtracted as if every day had 24 hours; going
+    through POSIX timestamps accounts for a DST change in between.
+
+    Args:
+        moment: Naive local datetime
+        clock: Clock providing time()
+
+    Returns:
+        float: Seconds until the moment (negative if it has passed)
+    """
+    return moment.timestamp() - clock.time()
+
+
+def parse_clock_time(text, now=None):
+    """
+    Parse "HH:MM" or "YYYY-MM-DD HH:MM" into the next matching datetime.
+
+    A bare time of day that has already passed today means tomorrow.
+
+    Args:
+        text: Time text
+        now: Reference time (defaults to datetime.now())
+
+    Returns:
+        datetime: The scheduled time
+
+    Raises:
+        ValueError: If the text is invalid or in the past
+    """
+    now = now or datetime.now()
+    text = text.strip()
+    try:
+        scheduled = datetime.strptime(text, "%Y-%m-%d %H:%M")
+    except ValueError:
+        moment = datetime.strptime(text, "%H:%M")
+        scheduled = now.replace(hour=moment.hour, minute=moment.minute, second=0, microsecond=0)
+        if scheduled <= now:
+            scheduled += timedelta(days=1)
+
+    if scheduled <= now:
+        raise ValueError("Scheduled time must be in the future.")
+    return scheduled
+
+
+def format_remaining(seconds):
+    """Format a number of seconds as "Xh Ym Zs" (rounded up, as the countdowns show it)."""
+    hours, rest = divmod(math.ceil(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours > 0:
+        return f"{hours}h {minutes}m {seconds}s"
+    return f"{minutes}m {seconds}s"
+
+
+class HeadlessScheduler:
+    """
+    Console counterpart of ShutdownScheduler.
+
+    Arms one deadline on a TimerQueue, waits for it on the main thread, gives
+    a grace period that can be interrupted with Ctrl+C, and then shuts down.
+
+    As a fleet agent it starts without a deadline and keeps running after a
+    cancel, waiting for the controller's next schedule.
+    """
+
+    def __init__(self, grace_seconds=30, dry_run=False, out=sys.stdout, clock=SYSTEM_CLOCK, action=None,
+                 hooks=None, load_monitor=None, agent=False):
+        """
+        Initialize the scheduler.
+
+        Args:
+            grace_seconds: Warning period between the deadline and the shutdown
+            dry_run: Print the shutdown command instead of running it
+            out: Stream for status messages
+            clock: Time source for the timers and date calculations
+            action: PreparedAction to perform at the deadline (default: shutdown)
+            hooks: shutdown_hooks.Hook list run during the grace period
+            load_monitor: LoadMonitor that defers the shutdown until the
+                machine is idle (optional)
+            agent: Run as a fleet agent (see serve_agent)
+
+        Raises:
+            FileNotFoundError: If no action is given and the shutdown command is missing
+        """
+        self.grace_seconds = grace_seconds
+        self.dry_run = dry_run
+        if action is None:
+            action = (DryRunBackend() if dry_run else default_backend()).prepare("shutdown")
+        self.action = action
+        self.hooks = list(hooks or [])
+        self.load_monitor = load_monitor
+        self.idle_wait = None  # Set when the idle wait ends or is cancelled
+        self.process_watcher = None
+        self.throughput_monitor = None
+        self.clock_watcher = None  # Started by the first wall-clock deadline
+        self.out = out
+        self.clock = clock
+        self.timer_queue = TimerQueue(clock=clock.monotonic)
+        self.deadline = None
+        self.entry = None  # Queue entry for the pending shutdown
+        self.recurrence_rule = None
+        self.control_server = None
+        self.agent = agent
+        self.agent_server = None
+        self.lock = threading.RLock()  # Orders remote cancel/schedule against the main loop
+        self.fired = threading.Event()
+        self.cancelled = threading.Event()
+        self.stopping = threading.Event()  # Set by cancel(): leave run() even as an agent
+        self.rescheduled = threading.Event()  # Set with cancelled when a new schedule stops the sequence
+        self.metrics = SchedulerMetrics()
+        self.metrics_exporters = []
+        self.metrics.bind("timer_running", lambda: int(self.deadline is not None and not self.fired.is_set()))
+        self.metrics.bind("pending_deadlines", lambda: len(self.timer_queue))
+        self.metrics.bind("control_requests",
+                          lambda: sum(server.requests_served for server in (self.control_server, self.agent_server)
+                                      if server))
+
+    def log(self, message):
+        """Write a timestamped status line."""
+        self.out.write(f"[{self.clock.now():%Y-%m-%d %H:%M:%S}] {message}\n")
+        self.out.flush()
+
+    def arm(self, seconds):
+        """
+        Arm the shutdown deadline.
+
+        Args:
+            seconds: Seconds until the deadline
+        """
+        self.arm_deadline(DeadlineTimer(seconds, clock=self.clock.monotonic))
+
+    def arm_at(self, when):
+        """
+        Arm the shutdown deadline at a local date and time.
+
+        The deadline follows changes of the system clock and suspends (see
+        on_clock_jump), unlike arm()'s fixed interval.
+
+        Args:
+            when: datetime to shut down at
+        """
+        self.arm_deadline(WallDeadlineTimer(when.timestamp(), clock=self.clock.monotonic,
+                                            wall_clock=self.clock.time))
+        if self.clock_watcher is None:
+            self.clock_watcher = ClockWatcher(self.on_clock_jump, clock=self.clock)
+            self.clock_watcher.start()
+
+    def arm_deadline(self, deadline):
+        """Replace the pending deadline (DeadlineTimer) and log when it fires."""
+        with self.lock:
+            self.timer_queue.cancel(self.entry)
+            self.deadline = deadline
+            self.fired.clear()
+            self.entry = self.timer_queue.schedule_at(deadline.deadline, self.on_deadline_reached)
+        self.metrics.timers_armed.inc(label_value="headless")
+        seconds = deadline.remaining()
+        target = self.clock.now() + timedelta(seconds=seconds)
+        self.log(f"Shutdown armed for {target:%Y-%m-%d %H:%M:%S} (in {format_remaining(seconds)})")
+
+    def on_clock_jump(self, jump):
+        """
+        Move a wall-clock deadline after the clock changed (runs on the watcher thread).
+
+        A deadline that passed meanwhile (e.g. while suspended) fires right away.
+
+        Args:
+            jump: Seconds the wall clock moved relative to the monotonic clock
+        """
+        with self.lock:
+            deadline = self.deadline
+            # Leave countdowns and deadlines that already fired alone
+            if not isinstance(deadline, WallDeadlineTimer) or not self.timer_queue.cancel(self.entry):
+                return
+            deadline.resync()
+            self.metrics.wakeups.inc(label_value="clock_change")
+            self.entry = self.timer_queue.schedule_at(deadline.deadline, self.on_deadline_reached)
+        self.log(f"Clock moved by {jump:+.1f} s; shutdown still at "
+                 f"{datetime.fromtimestamp(deadline.target_time):%Y-%m-%d %H:%M:%S} "
+                 f"(in {format_remaining(deadline.remaining())})")
+
+    def arm_rule(self, rule):
+        """
+        Arm the next occurrence of a recurring rule.
+
+        Args:
+            rule: RecurrenceRule
+
+        Returns:
+            bool: False if the rule never fires again
+        """
+        self.recurrence_rule = rule
+        now = self.clock.now()
+        next_datetime = rule.next_after(now)
+        if next_datetime is None:
+            self.log(f"{rule.expression!r} never fires again")
+            return False
+        self.arm_at(next_datetime)
+        return True
+
+    def watch_processes(self, processes):
+        """
+        Start the shutdown sequence once every watched process has exited.
+
+        Args:
+            processes: dict of pid -> description (see process_watch.find_processes)
+        """
+        def on_exit(pid, left):
+            self.log(f"{processes[pid]} exited; {left} still running")
+
+        def on_all_exited():
+            self.metrics.wakeups.inc(label_value="process_exit")
+            self.log("All watched processes have exited")
+            # Fire through the queue like a deadline, so the grace period and hooks follow
+            with self.lock:
+                self.deadline = DeadlineTimer(0, clock=self.clock.monotonic)
+                self.entry = self.timer_queue.schedule_at(self.deadline.deadline, self.on_deadline_reached)
+                self.process_watcher = None
+
+        self.process_watcher = ProcessWatcher(processes, on_all_exited, on_exit)
+        self.process_watcher.start()
+        self.metrics.timers_armed.inc(label_value="process")
+        self.log(f"Waiting for {len(processes)} processes to exit ({self.process_watcher.method}): "
+                 + ", ".join(sorted(processes.values())))
+
+    def watch_throughput(self, monitor):
+        """
+        Start the shutdown sequence once disk and network traffic has gone quiet.
+
+        Args:
+            monitor: ThroughputMonitor (not started)
+
+        Raises:
+            OSError: If the I/O counters cannot be read here
+        """
+        def on_quiet():
+            self.metrics.wakeups.inc(label_value="transfer_quiet")
+            self.log(f"Traffic below {format_rate(monitor.threshold)} for "
+                     f"{format_remaining(monitor.quiet_period)}")
+            # Fire through the queue like a deadline, so the grace period and hooks follow
+            with self.lock:
+                self.deadline = DeadlineTimer(0, clock=self.clock.monotonic)
+                self.entry = self.timer_queue.schedule_at(self.deadline.deadline, self.on_deadline_reached)
+                self.throughput_monitor = None
+
+        monitor.start(self.timer_queue, on_quiet)
+        self.throughput_monitor = monitor
+        self.metrics.timers_armed.inc(label_value="transfer")
+        self.log(f"Waiting for disk and network traffic to stay below {format_rate(monitor.threshold)} "
+                 f"for {format_remaining(monitor.quiet_period)}")
+
+    def serve(self):
+        """Answer status, schedule and cancel requests on the control socket."""
+        self.control_server = ControlServer({
+            "status": self.rpc_status,
+            "schedule": self.rpc_schedule,
+            "cancel": self.rpc_cancel,
+            "metrics": self.metrics.render,
+        })
+        self.control_server.start()
+
+    def serve_agent(self, address, token=None):
+        """
+        Also serve the control methods to a fleet controller over TCP.
+
+        Args:
+            address: (host, port) to listen on
+            token: Shared secret the controller must send (optional)
+
+        Raises:
+            OSError: If the address cannot be bound
+        """
+        self.agent_server = ControlServer({
+            "status": self.rpc_status,
+            "schedule": self.rpc_schedule,
+            "cancel": self.rpc_cancel,
+        }, address=address, token=token)
+        if not self.agent_server.start():
+            self.agent_server = None
+            raise OSError(f"cannot listen on {address[0]}:{address[1]}")
+        host, port = self.agent_server.address
+        self.log(f"Fleet agent listening on {host}:{port}" + ("" if token else " (no token)"))
+
+    def export_metrics(self, metrics_file=None, metrics_port=None):
+        """
+        Export the metrics to a file and/or a localhost HTTP endpoint.
+
+        Args:
+            metrics_file: Path rewritten every few seconds (optional)
+            metrics_port: Port for http://127.0.0.1:PORT/metrics (optional)
+
+        Raises:
+            OSError: If the file cannot be written or the port bound
+        """
+        if metrics_file:
+            writer = MetricsFileWriter(self.metrics, metrics_file)
+            writer.start()
+            self.metrics_exporters.append(writer)
+        if metrics_port is not None:
+            server = MetricsHTTPServer(self.metrics, metrics_port)
+            server.start()
+            self.metrics_exporters.append(server)
+            self.log(f"Metrics at http://127.0.0.1:{server.port}/metrics")
+
+    def rpc_status(self):
+        """Report the pending shutdown (control socket method "status"), in the GUI's format."""
+        deadline = self.deadline
+        running = (deadline is not None or self.process_watcher is not None
+                   or self.throughput_monitor is not None) and not self.fired.is_set()
+        timed = running and deadline is not None
+        remaining = deadline.remaining() if timed else 0
+        rule = self.recurrence_rule
+        return {
+            "running": running,
+            "mode": "agent" if self.agent else "headless",
+            "remaining_seconds": remaining,
+            "shutdown_at": (self.clock.now() + timedelta(seconds=remaining)).isoformat(timespec="seconds")
+                           if timed else None,
+            "repeat": rule.expression if rule else None,
+            "waiting_for_pids": sorted(self.process_watcher.remaining) if self.process_watcher else None,
+        }
+
+    def rpc_schedule(self, seconds=None, at=None):
+        """Replace the pending shutdown (control socket method "schedule")."""
+        if (seconds is None) == (at is None):
+            raise RpcError(INVALID_PARAMS, "Pass exactly one of 'seconds' or 'at'")
+        if at is not None:
+            try:
+                at = datetime.fromisoformat(at)
+            except (TypeError, ValueError):
+                raise RpcError(INVALID_PARAMS, "'at' must be an ISO date and time")
+            seconds = at.timestamp() - self.clock.time()
+        if not isinstance(seconds, (int, float)) or seconds <= 0:
+            raise RpcError(INVALID_PARAMS, "The shutdown time must be in the future")
+
+        with self.lock:
+            self.interrupt_sequence()
+            self.recurrence_rule = None
+            if at is not None:
+                self.arm_at(at)
+            else:
+                self.arm(seconds)
+        return self.rpc_status()
+
+    def rpc_cancel(self):
+        """Cancel the pending shutdown (control socket method "cancel"); exits unless running as an agent."""
+        if self.agent:
+            self.disarm()
+        else:
+            self.cancel()
+        return {"cancelled": True}
+
+    def interrupt_sequence(self):
+        """
+        Stop an idle wait or warning period already under way for a new schedule.
+
+        The main loop drops the old deadline's sequence (and its hooks) and
+        waits for the new deadline instead (see resume_after_reschedule).
+        """
+        with self.lock:
+            if self.deadline is None or not self.fired.is_set() or self.stopping.is_set():
+                return
+            self.rescheduled.set()
+            self.cancelled.set()
+            if self.idle_wait:
+                self.idle_wait.set()
+
+    def resume_after_reschedule(self):
+        """
+        Reset after interrupt_sequence so the main loop waits for the new deadline.
+
+        Returns:
+            bool: True if the sequence was stopped by a new schedule
+        """
+        with self.lock:
+            if not self.rescheduled.is_set() or self.stopping.is_set():
+                return False
+            self.rescheduled.clear()
+            self.cancelled.clear()
+        self.log("Shutdown moved; waiting for the new deadline")
+        return True
+
+    def disarm(self):
+        """Cancel the pending shutdown but keep running (agent mode)."""
+        with self.lock:
+            if self.deadline is None:
+                return
+            if self.fired.is_set():
+                # Waiting for idle or in the warning period: the main loop stops and resets
+                self.cancelled.set()
+                if self.idle_wait:
+                    self.idle_wait.set()
+            else:
+                self.metrics.timers_cancelled.inc()
+                self.log("Shutdown cancelled")
+            self.timer_queue.cancel(self.entry)
+            self.entry = None
+            self.deadline = None
+            self.recurrence_rule = None
+
+    def on_deadline_reached(self, entry):
+        """
+        Wake the main thread (runs on the queue's waiter thread).
+
+        Args:
+            entry: The fired TimerEntry; ignored if the deadline was replaced
+                or disarmed after the queue popped it
+        """
+        with self.lock:
+            if entry is not self.entry:
+                return
+            self.deadline.record_fire()
+            self.metrics.fire_drift.observe(self.deadline.fire_drift)
+            self.metrics.wakeups.inc(label_value="shutdown")
+            self.fired.set()
+
+    def wait_for_idle(self):
+        """
+        Wait until the machine is idle (or the maximum wait is over).
+
+        Returns:
+            bool: False if cancelled while waiting
+        """
+        monitor = self.load_monitor
+        self.idle_wait = done = threading.Event()
+        outcome = {}
+
+        def on_done(waited, reason):
+            outcome.update(waited=waited, reason=reason)
+            done.set()
+
+        if self.cancelled.is_set():
+            return False
+        try:
+            monitor.start(self.timer_queue, on_done)
+        except OSError as e:
+            self.log(f"Not waiting for idle: {e}")
+            return True
+        self.log(f"Deadline reached; waiting until the load is below {monitor.threshold:g}%")
+        done.wait()
+        if self.cancelled.is_set():
+            monitor.cancel()
+            return False
+
+        self.metrics.load_deferrals.inc(label_value=outcome["reason"])
+        state = "idle" if outcome["reason"] == "idle" else "still busy, maximum wait reached"
+        self.log(f"{state.capitalize()} after {format_remaining(outcome['waited'])} "
+                 f"({monitor.samples} samples, {monitor.overhead() * 100:.4f}% of a CPU spent sampling)")
+        return True
+
+    def on_hook_result(self, result):
+        """Log a finished pre-shutdown hook (runs on a hook worker thread)."""
+        self.metrics.hook_runs.inc(label_value=result.status)
+        self.log("Hook " + result.describe())
+
+    def cancel(self, signum=None, frame=None):
+        """Cancel the pending shutdown (signal handler)."""
+        if self.deadline is not None and not self.fired.is_set():
+            self.metrics.timers_cancelled.inc()
+        self.stopping.set()
+        self.cancelled.set()
+        self.fired.set()
+        if self.process_watcher:
+            self.process_watcher.stop()
+        if self.throughput_monitor:
+            self.throughput_monitor.cancel()
+        if self.idle_wait:
+            self.idle_wait.set()
+
+    def wait(self, seconds):
+        """
+        Sleep while staying responsive to cancellation.
+
+        Returns:
+            bool: True if the full time elapsed, False if cancelled
+        """
+        return not self.cancelled.wait(seconds)
+
+    def run(self):
+        """
+        Wait for the deadline, run the grace period and shut down.
+
+        Returns:
+            int: Process exit code
+        """
+        self.timer_queue.start()
+        try:
+            return self._run()
+        finally:
+            if self.control_server:
+                self.control_server.stop()
+            if self.agent_server:
+                self.agent_server.stop()
+            if self.clock_watcher:
+                self.clock_watcher.stop()
+            for exporter in self.metrics_exporters:
+                exporter.stop()
+
+    def stay_after_cancel(self):
+        """
+        Log a cancellation and decide whether to keep running.
+
+        Returns:
+            bool: True if an agent should wait for the next schedule
+        """
+        if self.agent and self.stopping.is_set():
+            self.log("Agent stopped" + ("; shutdown cancelled" if self.deadline is not None else ""))
+            return False
+        self.log("Shutdown cancelled")
+        if not self.agent:
+            return False
+        with self.lock:
+            self.cancelled.clear()
+            if self.deadline is None:
+                self.fired.clear()  # Not re-armed meanwhile
+        return True
+
+    def _run(self):
+        """Main-thread loop behind run()."""
+        while True:
+            self.fired.wait()
+            if self.cancelled.is_set():
+                if self.resume_after_reschedule() or self.stay_after_cancel():
+                    continue
+                return 1
+
+            if self.load_monitor and not self.wait_for_idle():
+                if self.resume_after_reschedule() or self.stay_after_cancel():
+                    continue
+                return 1
+
+            self.log(f"Deadline reached (late by {self.deadline.fire_drift * 1000:.1f} ms); "
+                     f"running {self.action.action} in {self.grace_seconds} seconds, press Ctrl+C to cancel")
+            runner = HookRunner(self.hooks, on_result=self.on_hook_result)
+            runner.start(time_limit=self.grace_seconds)
+            if not self.wait(self.grace_seconds):
+                runner.cancel()
+                if self.resume_after_reschedule() or self.stay_after_cancel():
+                    continue
+                return 1
+            # Hooks still running are killed; the shutdown does not wait for them
+            runner.cancel()
+            if self.hooks:
+                self.log(runner.summary())
+
+            try:
+                with self.metrics.execute_shutdown.time():
+                    self.action.run()
+            except Exception as e:
+                self.metrics.shutdown_failures.inc()
+                self.log(f"Failed to run {self.action.action}: {e}")
+                return 2
+            if self.dry_run:
+                self.log("Dry run: " + self.action.describe())
+
+            # A schedule that arrived while the action ran is kept (only observable in dry-run mode)
+            if self.resume_after_reschedule():
+                continue
+            # Recurring schedules keep going (only observable in dry-run mode)
+            if self.recurrence_rule and self.arm_rule(self.recurrence_rule):
+                continue
+            if not self.agent:
+                return 0
+            with self.lock:
+                self.deadline = self.entry = None
+                self.fired.clear()
+
+
+def build_parser():
+    """Create the command-line parser."""
+    parser = argparse.ArgumentParser(
+        prog="shutdown-scheduler",
+        description="Schedule a computer shutdown without opening a window."
+    )
+    when = parser.add_mutually_exclusive_group(required=True)
+    when.add_argument("--in", dest="duration", metavar="DURATION",
+                      help="shut down after a duration such as 2h30m, 90m or 45s")
+    when.add_argument("--at", dest="at", metavar="TIME",
+                      help="shut down at HH:MM (next occurrence) or 'YYYY-MM-DD HH:MM'")
+    when.add_argument("--cron", dest="cron", metavar="EXPR",
+                      help="shut down on a recurring cron schedule, e.g. '0 22 * * 1-5'")
+    when.add_argument("--after-exit", dest="processes", action="append", metavar="PID|NAME",
+                      help="shut down once these processes have exited (repeatable; names may use * and ?)")
+    when.add_argument("--after-quiet", nargs="?", type=float, const=DEFAULT_QUIET_RATE / 1024, metavar="KBPS",
+                      help="shut down once disk and network traffic stays below KBPS KB/s "
+                           f"(default: {DEFAULT_QUIET_RATE // 1024})")
+    when.add_argument("--agent", metavar="[HOST:]PORT",
+                      help="wait for schedule and cancel requests from a fleet controller on this TCP address")
+    when.add_argument("--status", action="store_true",
+                      help="print the state of the running instance")
+    when.add_argument("--cancel", action="store_true",
+                      help="cancel the timer of the running instance")
+    parser.add_argument("--quiet-minutes", type=float, default=DEFAULT_QUIET_PERIOD / 60, metavar="MINUTES",
+                        help="how long traffic must stay quiet for --after-quiet (default: %(default)g)")
+    parser.add_argument("--grace", type=int, default=30, metavar="SECONDS",
+                        help="warning period before shutting down (default: 30)")
+    parser.add_argument("--action", choices=ACTIONS, default="shutdown",
+                        help="what to do at the deadline (default: shutdown)")
+    parser.add_argument("--command", metavar="CMD",
+                        help="command line for --action custom, e.g. 'notify-send done'")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the command instead of running it")
+    parser.add_argument("--hook", action="append", metavar="CMD",
+                        help="command to run during the grace period (repeatable; see also hooks.json)")
+    parser.add_argument("--when-idle", nargs="?", type=float, const=DEFAULT_THRESHOLD, metavar="PERCENT",
+                        help=f"after the deadline, wait until CPU use and load drop below PERCENT "
+                             f"(default: {DEFAULT_THRESHOLD:g})")
+    parser.add_argument("--max-defer", type=float, default=DEFAULT_MAX_WAIT / 60, metavar="MINUTES",
+                        help="longest wait for --when-idle (default: %(default)g)")
+    parser.add_argument("--fleet", metavar="INVENTORY",
+                        help="send --in, --at, --status or --cancel to the agents listed in this file "
+                             "(one host[:port] per line)")
+    parser.add_argument("--token-file", metavar="PATH",
+                        help="shared secret for --agent and --fleet")
+    parser.add_argument("--stagger", type=float, default=0.0, metavar="SECONDS",
+                        help="with --fleet, delay each host's deadline this much after the previous one")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, metavar="N",
+                        help="with --fleet, agents contacted at once (default: %(default)s)")
+    parser.add_argument("--retries", type=int, default=RETRIES, metavar="N",
+                        help="with --fleet, retries per unreachable agent (default: %(default)s)")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="keep Prometheus metrics in this file (rewritten every 15 seconds)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    return parser
+
+
+def main(argv=None):
+    """Headless entry point."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.fleet:
+        return run_fleet(parser, args)
+    if args.status or args.cancel:
+        return call_running_instance("status" if args.status else "cancel")
+
+    # Only one scheduler (GUI or headless) may run at a time
+    instance_lock = InstanceLock()
+    if not instance_lock.acquire():
+        return forward_to_running_instance(parser, args)
+
+    try:
+        return run_scheduler(parser, args)
+    finally:
+        instance_lock.release()
+
+
+def call_running_instance(method, **params):
+    """
+    Call a control socket method on the running instance and print the result.
+
+    Returns:
+        int: Process exit code
+    """
+    try:
+        with ControlClient() as client:
+            result = client.call(method, **params)
+    except RpcError as e:
+        sys.stderr.write(f"Error: {e.message}\n")
+        return 1
+    except (OSError, ValueError):
+        sys.stderr.write("Shutdown Scheduler is not running.\n")
+        return 1
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def forward_to_running_instance(parser, args):
+    """Send --in or --at to the instance that holds the lock."""
+    try:
+        if args.duration:
+            return call_running_instance("schedule", seconds=parse_duration(args.duration))
+        if args.at:
+            scheduled = parse_clock_time(args.at)
+            return call_running_instance("schedule", at=scheduled.isoformat(timespec="minutes"))
+    except ValueError as e:
+        parser.error(str(e))
+
+    sys.stderr.write("Shutdown Scheduler is already running.\n")
+    return 1
+
+
+def run_fleet(parser, args):
+    """Send --in, --at, --status or --cancel to every agent in the inventory."""
+    if not (args.duration or args.at or args.status or args.cancel):
+        parser.error("--fleet works with --in, --at, --status or --cancel")
+    if args.concurrency < 1 or args.retries < 0 or args.stagger < 0:
+        parser.error("--concurrency must be at least 1; --retries and --stagger must not be negative")
+    try:
+        token = read_token(args.token_file) if args.token_file else None
+        controller = FleetController(load_inventory(args.fleet), token,
+                                     concurrency=args.concurrency, retries=args.retries)
+        if args.duration:
+            results = controller.schedule(parse_duration(args.duration), args.stagger)
+        elif args.at:
+            results = controller.schedule(seconds_until(parse_clock_time(args.at)), args.stagger)
+        elif args.status:
+            results = controller.status()
+        else:
+            results = controller.cancel()
+    except ValueError as e:
+        parser.error(str(e))
+
+    for result in results:
+        line = result.describe()
+        if result.ok and "running" in result.result:
+            state = result.result
+            line += (f" - shutdown in {format_remaining(state['remaining_seconds'])}" if state["running"]
+                     else " - idle")
+        print(line)
+    failed = sum(not result.ok for result in results)
+    print(f"{len(results) - failed}/{len(results)} hosts succeeded")
+    return 1 if failed else 0
+
+
+def run_scheduler(parser, args):
+    """Arm the scheduler from parsed arguments and wait for it."""
+    # Resolve the action's executable now rather than at the deadline
+    backend = DryRunBackend() if args.dry_run else default_backend()
+    try:
+        action = backend.prepare(args.action, args.command)
+        hooks = load_hooks() + hooks_from_commands(args.hook)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+    agent_address = token = None
+    if args.agent:
+        try:
+            agent_address = ("0.0.0.0", int(args.agent)) if args.agent.isdigit() else parse_address(args.agent)
+            token = read_token(args.token_file) if args.token_file else None
+        except ValueError as e:
+            parser.error(str(e))
+        if token is None and agent_address[0] not in ("127.0.0.1", "::1", "localhost"):
+            parser.error("--agent needs --token-file unless it listens on loopback only")
+    load_monitor = None
+    if args.when_idle is not None:
+        if not load_monitoring_available():
+            parser.error("--when-idle needs psutil on this system")
+        load_monitor = LoadMonitor(args.when_idle, max_wait=args.max_defer * 60)
+
+    scheduler = HeadlessScheduler(grace_seconds=args.grace, dry_run=args.dry_run, action=action, hooks=hooks,
+                                  load_monitor=load_monitor, agent=bool(args.agent))
+    signal.signal(signal.SIGINT, scheduler.cancel)
+    signal.signal(signal.SIGTERM, scheduler.cancel)
+
+    try:
+        if args.duration:
+            scheduler.arm(parse_duration(args.duration))
+        elif args.at:
+            scheduler.arm_at(parse_clock_time(args.at))
+        elif args.processes:
+            processes = find_processes(parse_targets(" ".join(args.processes)))
+            if not processes:
+                parser.error("none of the --after-exit processes are running")
+            scheduler.watch_processes(processes)
+        elif args.after_quiet is not None:
+            if args.after_quiet <= 0 or args.quiet_minutes <= 0:
+                parser.error("--after-quiet and --quiet-minutes must be greater than 0")
+            scheduler.watch_throughput(ThroughputMonitor(args.after_quiet * 1024, args.quiet_minutes * 60))
+        elif args.agent:
+            pass  # The controller arms the deadline
+        elif not scheduler.arm_rule(RecurrenceRule(args.cron)):
+            return 1
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    try:
+        scheduler.export_metrics(args.metrics_file, args.metrics_port)
+    except OSError as e:
+        parser.error(f"cannot export metrics: {e}")
+
+    scheduler.serve()
+    if agent_address:
+        try:
+            scheduler.serve_agent(agent_address, token)
+        except OSError as e:
+            parser.error(str(e))
+    return scheduler.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
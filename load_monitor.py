@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Load-aware shutdown deferral for the Shutdown Scheduler.
+
+With --when-idle, reaching the deadline no longer shuts down straight away:
+the machine's CPU use and load average are sampled until their recent
+average drops below a threshold (so a running render or compile finishes
+first), up to a maximum wait.
+
+Samples go into fixed-size ring buffers whose time-weighted average is
+updated incrementally with each sample, never by re-scanning the buffer.
+The sampling interval adapts: it backs off (up to MAX_INTERVAL) while the
+load stays far from the threshold and drops back to MIN_INTERVAL when it
+gets close, so monitoring costs a few microseconds per second at most.
+
+CPU use comes from psutil (imported when monitoring starts); without psutil
+only the load average is used, where the OS provides one.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import os
+import threading
+import time
+
+# Default busy threshold in percent of total CPU capacity
+DEFAULT_THRESHOLD = 25.0
+
+# Samples in the sliding window (and needed before "idle" can be reported)
+WINDOW_SAMPLES = 12
+
+# Sampling interval bounds in seconds
+MIN_INTERVAL = 1.0
+MAX_INTERVAL = 8.0
+
+# Longest deferral before shutting down anyway (seconds)
+DEFAULT_MAX_WAIT = 4 * 3600
+
+
+class SlidingAverage:
+    """
+    Time-weighted average of the last size samples.
+
+    Adding a sample is O(1): the running sums are adjusted by the sample
+    that enters and the one that falls out of the ring buffer.
+    """
+
+    def __init__(self, size):
+        """
+        Initialize an empty window.
+
+        Args:
+            size: Number of samples kept
+        """
+        self.size = size
+        self.values = [0.0] * size
+        self.weights = [0.0] * size
+        self.index = 0
+        self.count = 0
+        self.weighted_sum = 0.0
+        self.weight_sum = 0.0
+
+    def add(self, value, weight=1.0):
+        """
+        Add a sample, dropping the oldest one once the window is full.
+
+        Args:
+            value: Sample value
+            weight: Seconds the sample stands for
+        """
+        slot = self.index
+        self.weighted_sum += value * weight - self.values[slot] * self.weights[slot]
+        self.weight_sum += weight - self.weights[slot]
+        self.values[slot] = value
+        self.weights[slot] = weight
+        self.index = (slot + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        if self.index == 0:
+            # Resynchronize once per lap so rounding errors cannot accumulate
+            self.weighted_sum = sum(v * w for v, w in zip(self.values, self.weights))
+            self.weight_sum = sum(self.weights)
+
+    @property
+    def full(self):
+        """True once size samples have been added."""
+        return self.count == self.size
+
+    @property
+    def mean(self):
+        """Weighted average of the samples in the window (0.0 when empty)."""
+        return self.weighted_sum / self.weight_sum if self.weight_sum > 0 else 0.0
+
+
+def system_load_reader():
+    """
+    Create a function that samples the machine's load.
+
+    Returns:
+        callable or None: Returns (cpu percent or None, load average as a
+            percent of the CPU count); None if neither can be measured here
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    cpus = os.cpu_count() or 1
+
+    if psutil is not None:
+        psutil.cpu_percent(interval=None)  # First call only sets the baseline
+
+        def read():
+            return psutil.cpu_percent(interval=None), psutil.getloadavg()[0] * 100.0 / cpus
+        return read
+    if hasattr(os, "getloadavg"):
+        def read():
+            return None, os.getloadavg()[0] * 100.0 / cpus
+        return read
+    return None
+
+
+def load_monitoring_available():
+    """Check whether load can be measured on this machine (without importing psutil)."""
+    import importlib.util
+    return importlib.util.find_spec("psutil") is not None or hasattr(os, "getloadavg")
+
+
+class LoadMonitor:
+    """
+    Waits on a TimerQueue until the machine is idle.
+
+    Sampling runs as queue entries of kind "load", so it needs no thread of
+    its own.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_wait=DEFAULT_MAX_WAIT, window=WINDOW_SAMPLES,
+                 min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, reader=None, clock=time.monotonic):
+        """
+        Initialize the monitor (does not start sampling).
+
+        Args:
+            threshold: Busy threshold in percent of total CPU capacity
+            max_wait: Seconds after which on_done is called even if still busy
+            window: Samples in the sliding window
+            min_interval: Shortest sampling interval in seconds
+            max_interval: Longest sampling interval in seconds
+            reader: Function returning (cpu percent or None, load percent);
+                defaults to system_load_reader() when monitoring starts
+            clock: Monotonic time source
+        """
+        self.threshold = threshold
+        self.max_wait = max_wait
+        self.window = window
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.reader = reader
+        self.clock = clock
+        self.cpu = None
+        self.load = None
+        self.interval = min_interval
+        self.samples = 0
+        self.sampling_time = 0.0
+        self.started = None
+        self.queue = None
+        self.entry = None
+        self.on_done = None
+        self.last_busy = None
+        self._lock = threading.Lock()  # Orders cancel() against a sample in progress
+
+    def start(self, queue, on_done):
+        """
+        Start sampling.
+
+        Args:
+            queue: TimerQueue that runs the samples
+            on_done: Called with (seconds waited, "idle" or "max_wait") on the
+                queue's thread
+
+        Raises:
+            OSError: If the load cannot be measured on this machine
+        """
+        if self.reader is None:
+            self.reader = system_load_reader()
+            if self.reader is None:
+                raise OSError("Cannot measure the system load here (install psutil)")
+        self.cpu = SlidingAverage(self.window)
+        self.load = SlidingAverage(self.window)
+        self.interval = self.min_interval
+        self.samples = 0
+        self.sampling_time = 0.0
+        self.last_busy = None
+        self.queue = queue
+        self.on_done = on_done
+        self.started = self.clock()
+        self._sample(None)
+
+    def _sample(self, entry):
+        """Take one sample, then finish or queue the next one."""
+        if self.on_done is None:
+            return  # Cancelled
+        measured = time.perf_counter()
+        cpu, load = self.reader()
+        # Each sample stands for the interval since the previous one
+        weight = self.interval if self.samples else self.min_interval
+        if cpu is not None:
+            self.cpu.add(cpu, weight)
+        self.load.add(load, weight)
+        self.samples += 1
+        busy = self.busy_level()
+        self.sampling_time += time.perf_counter() - measured
+
+        waited = self.clock() - self.started
+        if self.load.full and busy < self.threshold:
+            self._finish(waited, "idle")
+            return
+        if waited >= self.max_wait:
+            self._finish(waited, "max_wait")
+            return
+
+        self.interval = self.next_interval(busy)
+        self.last_busy = busy
+        with self._lock:
+            if self.on_done is None:
+                return  # Cancelled while sampling: do not queue another sample
+            self.entry = self.queue.schedule(min(self.interval, self.max_wait - waited), self._sample, kind="load")
+
+    def busy_level(self):
+        """Current windowed load: the higher of the CPU and load averages, in percent."""
+        cpu = self.cpu.mean if self.cpu.count else 0.0
+        return max(cpu, self.load.mean)
+
+    def next_interval(self, busy):
+        """
+        Pick the next sampling interval.
+
+        Back off while the load is far from the threshold and steady; sample
+        at the fastest rate when it is near the threshold or moving.
+
+        Args:
+            busy: Current windowed load in percent
+        """
+        near = abs(busy - self.threshold) < self.threshold * 0.5
+        moving = self.last_busy is not None and abs(busy - self.last_busy) > self.threshold * 0.1
+        if near or moving or not self.load.full:
+            return self.min_interval
+        return min(self.max_interval, self.interval * 2)
+
+    def _finish(self, waited, reason):
+        """Stop sampling and report (unless cancelled meanwhile)."""
+        with self._lock:
+            self.entry = None
+            on_done, self.on_done = self.on_done, None
+        if on_done:
+            on_done(waited, reason)
+
+    def cancel(self):
+        """Stop sampling without calling on_done (callable from any thread)."""
+        with self._lock:
+            self.on_done = None
+            entry, self.entry = self.entry, None
+        if self.queue and entry:
+            self.queue.cancel(entry)
+
+    @property
+    def waiting(self):
+        """True while sampling."""
+        return self.on_done is not None
+
+    def overhead(self):
+        """
+        Fraction of one CPU spent sampling since start().
+
+        Returns:
+            float: e.g. 0.00002 for 0.002 %
+        """
+        elapsed = self.clock() - self.started if self.started is not None else 0.0
+        return self.sampling_time / elapsed if elapsed > 0 else 0.0
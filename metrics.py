@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Metrics for the Shutdown Scheduler in the Prometheus text format.
+
+Metrics are always collected: an observation is an integer increment (plus
+a bisect over a dozen bucket bounds for histograms) under a small lock, and
+values that already exist elsewhere (queue length, tray counters, control
+requests) are read only when the metrics are rendered. Rendering happens
+when someone asks for it:
+
+- the "metrics" method on the control socket,
+- a file rewritten atomically every few seconds (--metrics-file, for the
+  node_exporter textfile collector), or
+- an HTTP endpoint on localhost (--metrics-port, for direct scraping).
+
+Author: AI Assistant
+License: MIT
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "shutdown_scheduler_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond queue wake-ups up to badly stalled UI loops
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Seconds; the shutdown command normally returns within a second or two
+COMMAND_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def format_value(value):
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label_value(value):
+    """Escape backslashes, quotes and newlines in a label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels):
+    """Format a label dict as {name="value",...} (empty string for none)."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by one label."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, label=None):
+        """
+        Initialize the counter.
+
+        Args:
+            name: Metric name without the app prefix and _total suffix
+            documentation: HELP text
+            label: Name of the label that splits the series (optional)
+        """
+        self.name = PREFIX + name + "_total"
+        self.documentation = documentation
+        self.label = label
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, label_value=None):
+        """Add amount to the series for label_value."""
+        with self._lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def samples(self):
+        """Yield (name, labels, value) for rendering."""
+        with self._lock:
+            values = dict(self.values) or {None: 0}
+        for label_value, value in sorted(values.items(), key=lambda item: str(item[0])):
+            labels = {self.label: label_value} if self.label and label_value is not None else {}
+            yield self.name, labels, value
+
+
+class Gauge:
+    """Value read from a callback when the metrics are rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, read):
+        """
+        Initialize the gauge.
+
+        Args:
+            name: Metric name without the app prefix
+            documentation: HELP text
+            read: Callable returning the current value
+        """
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.read = read
+
+    def samples(self):
+        """Yield (name, labels, value) for rendering."""
+        try:
+            value = self.read()
+        except Exception:
+            return  # Source not available (e.g. no tray yet): omit the sample
+        if value is not None:
+            yield self.name, {}, value
+
+
+class CallbackCounter(Gauge):
+    """Counter kept by another object and read when the metrics are rendered."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, read):
+        """Initialize the counter (name without the _total suffix)."""
+        super().__init__(name + "_total", documentation, read)
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            name: Metric name without the app prefix
+            documentation: HELP text
+            buckets: Sorted upper bounds (+Inf is added automatically)
+        """
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last slot is +Inf only
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Record one value."""
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def time(self):
+        """
+        Time a block and observe its duration in seconds.
+
+        Example:
+            with histogram.time():
+                run_command()
+        """
+        return _Timer(self)
+
+    def samples(self):
+        """Yield (name, labels, value) for rendering."""
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds + (math.inf,), counts):
+            cumulative += bucket_count
+            yield self.name + "_bucket", {"le": format_value(bound)}, cumulative
+        yield self.name + "_sum", {}, total
+        yield self.name + "_count", {}, count
+
+
+class _Timer:
+    """Context manager behind Histogram.time()."""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class Registry:
+    """Set of metrics rendered together."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.metrics = []
+
+    def register(self, metric):
+        """Add a metric and return it."""
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text
+        """
+        lines = []
+        for metric in self.metrics:
+            base_name = metric.name[:-len("_total")] if metric.kind == "counter" else metric.name
+            lines.append(f"# HELP {base_name} {metric.documentation}")
+            lines.append(f"# TYPE {base_name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class SchedulerMetrics:
+    """
+    The metrics shared by the GUI and the headless scheduler.
+
+    Front ends record into the histograms and counters directly and hand
+    their long-lived objects to bind() so that gauges can read them.
+    """
+
+    def __init__(self):
+        """Create every metric."""
+        self.registry = Registry()
+        self._sources = {}
+        register = self.registry.register
+
+        self.tick_drift = register(Histogram(
+            "tick_drift_seconds", "Lateness of display refresh wake-ups."))
+        self.fire_drift = register(Histogram(
+            "fire_drift_seconds", "Lateness of the shutdown deadline firing."))
+        self.ui_lag = register(Histogram(
+            "ui_callback_lag_seconds", "Delay between posting a callback to the UI loop and running it."))
+        self.ui_loop_lag = register(Histogram(
+            "ui_loop_lag_seconds", "Lateness of the UI loop lag probe (only with --trace)."))
+        self.wakeups = register(Counter(
+            "wakeups", "Timer thread wake-ups.", label="kind"))
+        self.execute_shutdown = register(Histogram(
+            "execute_shutdown_seconds", "Time taken by the shutdown command.", COMMAND_BUCKETS))
+        self.shutdown_failures = register(Counter(
+            "shutdown_failures", "Shutdown commands that failed."))
+        self.timers_armed = register(Counter(
+            "timers_armed", "Timers armed.", label="mode"))
+        self.timers_cancelled = register(Counter(
+            "timers_cancelled", "Timers cancelled before firing."))
+        self.load_deferrals = register(Counter(
+            "load_deferrals", "Shutdowns deferred until idle, by how the wait ended.", label="reason"))
+        self.popup_latency = register(Histogram(
+            "warning_popup_latency_seconds", "Time from the deadline firing to the shutdown warning being shown."))
+        self.hook_runs = register(Counter(
+            "hook_runs", "Pre-shutdown hooks finished, by outcome.", label="status"))
+
+        register(Gauge("timer_running", "1 while a shutdown timer is armed.",
+                       lambda: self._read("timer_running")))
+        register(Gauge("pending_deadlines", "Entries waiting in the timer queue.",
+                       lambda: self._read("pending_deadlines")))
+        register(Gauge("ui_callbacks_pending", "Callbacks posted to the UI loop that have not run yet.",
+                       lambda: self._read("ui_callbacks_pending")))
+        register(CallbackCounter("tray_icon_swaps", "Tray icon images pushed to the tray.",
+                                 lambda: self._read("tray_icon_swaps")))
+        register(CallbackCounter("tray_title_writes", "Tray tooltip updates pushed to the tray.",
+                                 lambda: self._read("tray_title_writes")))
+        register(CallbackCounter("tray_updates_skipped", "Tray updates skipped as unchanged or rate-limited.",
+                                 lambda: self._read("tray_updates_skipped")))
+        register(CallbackCounter("control_requests", "Requests served on the control socket.",
+                                 lambda: self._read("control_requests")))
+
+    def bind(self, name, read):
+        """
+        Provide the source of a gauge.
+
+        Args:
+            name: Gauge source name, e.g. "pending_deadlines"
+            read: Callable returning the current value (or None to omit it)
+        """
+        self._sources[name] = read
+
+    def _read(self, name):
+        """Read a bound source (None if unbound)."""
+        read = self._sources.get(name)
+        return read() if read else None
+
+    def render(self):
+        """Render the metrics as Prometheus text."""
+        return self.registry.render()
+
+
+def write_textfile(metrics, path):
+    """
+    Write the rendered metrics to path atomically (temp file + rename).
+
+    Args:
+        metrics: SchedulerMetrics or Registry
+        path: Output file, e.g. for the node_exporter textfile collector
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(metrics.render())
+    os.replace(temp_path, path)
+
+
+class MetricsFileWriter:
+    """Background thread that rewrites the metrics file periodically."""
+
+    def __init__(self, metrics, path, interval=15.0):
+        """
+        Initialize the writer (does not start it).
+
+        Args:
+            metrics: SchedulerMetrics to render
+            path: Output file
+            interval: Seconds between writes
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Write once now, then every interval seconds."""
+        write_textfile(self.metrics, self.path)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Thread body."""
+        while not self._stop.wait(self.interval):
+            try:
+                write_textfile(self.metrics, self.path)
+            except OSError:
+                pass  # Try again next interval
+
+    def stop(self):
+        """Write a final snapshot and stop the thread."""
+        self._stop.set()
+        try:
+            write_textfile(self.metrics, self.path)
+        except OSError:
+            pass
+
+
+class MetricsHTTPServer:
+    """Serve the metrics at http://host:port/metrics on a background thread."""
+
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        """
+        Bind the server.
+
+        Args:
+            metrics: SchedulerMetrics to render
+            port: TCP port (0 picks a free one, see .port)
+            host: Address to listen on (localhost only by default)
+
+        Raises:
+            OSError: If the port cannot be bound
+        """
+        rendered = metrics.render
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = rendered().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # No per-scrape logging
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        """Start serving."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.server.shutdown()
+        self.server.server_close()
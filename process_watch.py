@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Process-exit trigger for the Shutdown Scheduler.
+
+"Shut down when this job finishes": watch a set of processes, given as PIDs
+or name patterns, and fire once every one of them has exited.
+
+On Linux 5.3+ each process gets a pidfd and a single thread blocks in
+poll() on all of them, so watching hundreds of processes costs nothing
+between exits and a PID reused by a new process can never be mistaken for
+the old one. Elsewhere (and on older kernels) the watcher polls the
+remaining PIDs every couple of seconds, comparing each process's start time
+to detect PID reuse.
+
+Name patterns are matched (fnmatch, case-insensitive) against process names
+and executable names once, when the trigger is armed; processes started
+later are not added.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import fnmatch
+import os
+import select
+import sys
+import threading
+
+# Seconds between checks when pidfds are not available
+POLL_INTERVAL = 2.0
+
+
+def parse_targets(text):
+    """
+    Split a target list such as "1234, ffmpeg, make*".
+
+    Returns:
+        list: PIDs (int) and name patterns (str)
+
+    Raises:
+        ValueError: If the list is empty
+    """
+    targets = []
+    for item in text.replace(",", " ").split():
+        targets.append(int(item) if item.isdigit() else item)
+    if not targets:
+        raise ValueError("Enter at least one process ID or name")
+    return targets
+
+
+def _proc_stat(pid):
+    """Read (state, start time) from /proc/PID/stat, or None if the process is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces and parentheses: split after the last ")"
+    fields = data[data.rindex(b")") + 2:].split()
+    return fields[0].decode(), fields[19].decode()
+
+
+def process_identity(pid):
+    """
+    Identify a running process so that a reused PID can be told apart.
+
+    Returns:
+        str or None: Start time token, or None if the process is not running
+            (zombies count as not running)
+    """
+    if os.path.isdir("/proc"):
+        stat = _proc_stat(pid)
+        if stat is None or stat[0] in ("Z", "X"):
+            return None
+        return stat[1]
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            if process.status() == psutil.STATUS_ZOMBIE:
+                return None
+            return str(process.create_time())
+        except psutil.Error:
+            return None
+    if sys.platform.startswith("win"):
+        raise OSError("Watching processes on Windows needs psutil")
+    try:
+        os.kill(pid, 0)  # Signal 0 only checks that the PID exists
+    except ProcessLookupError:
+        return None
+    except PermissionError:
+        pass  # Exists, owned by another user
+    return "running"
+
+
+def list_processes():
+    """
+    List running processes.
+
+    Returns:
+        dict: pid -> (name, executable name)
+
+    Raises:
+        OSError: If processes cannot be listed here (no /proc and no psutil)
+    """
+    processes = {}
+    if os.path.isdir("/proc"):
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/comm", encoding="utf-8", errors="replace") as f:
+                    name = f.read().strip()
+                with open(f"/proc/{entry}/cmdline", "rb") as f:
+                    argv0 = f.read().split(b"\0", 1)[0].decode(errors="replace")
+            except OSError:
+                continue  # Exited while listing
+            processes[int(entry)] = (name, os.path.basename(argv0))
+        return processes
+
+    try:
+        import psutil
+    except ImportError:
+        raise OSError("Finding processes by name needs psutil on this system")
+    for process in psutil.process_iter(["pid", "name", "exe"]):
+        info = process.info
+        processes[info["pid"]] = (info["name"] or "", os.path.basename(info["exe"] or ""))
+    return processes
+
+
+def find_processes(targets, exclude=None):
+    """
+    Resolve PIDs and name patterns to running processes.
+
+    Args:
+        targets: PIDs and fnmatch patterns, e.g. [1234, "ffmpeg", "make*"]
+        exclude: PIDs never to match (default: this process)
+
+    Returns:
+        dict: pid -> description for every running match
+
+    Raises:
+        OSError: If processes cannot be listed by name here
+    """
+    exclude = {os.getpid()} if exclude is None else set(exclude)
+    found = {}
+    patterns = []
+    for target in targets:
+        if isinstance(target, int):
+            if target not in exclude and process_identity(target) is not None:
+                found[target] = f"PID {target}"
+        else:
+            patterns.append(target.lower())
+
+    if patterns:
+        for pid, names in list_processes().items():
+            if pid in exclude:
+                continue
+            for pattern in patterns:
+                if any(name and fnmatch.fnmatchcase(name.lower(), pattern) for name in names):
+                    found[pid] = f"{names[0] or names[1]} ({pid})"
+                    break
+    return found
+
+
+class ProcessWatcher:
+    """
+    Waits on a background thread until a set of processes has exited.
+
+    Callbacks run on the watcher thread.
+    """
+
+    def __init__(self, pids, on_all_exited, on_exit=None, poll_interval=POLL_INTERVAL):
+        """
+        Initialize the watcher (does not start it).
+
+        Args:
+            pids: Process IDs to watch
+            on_all_exited: Called once when the last one has exited
+            on_exit: Called with (pid, number still running) after each exit (optional)
+            poll_interval: Seconds between checks in polling mode
+        """
+        self.pids = set(pids)
+        self.remaining = set(self.pids)
+        self.on_all_exited = on_all_exited
+        self.on_exit = on_exit
+        self.poll_interval = poll_interval
+        self.method = "pidfd" if hasattr(os, "pidfd_open") else "polling"
+        self._stop = threading.Event()
+        self._wake_read, self._wake_write = (None, None)
+        self._wake_lock = threading.Lock()  # The thread closes the wake pipe when it ends
+        self._thread = None
+
+    def start(self):
+        """Start watching."""
+        if self.method == "pidfd":
+            self._wake_read, self._wake_write = os.pipe()
+            target = self._run_pidfd
+        else:
+            target = self._run_polling
+        self._thread = threading.Thread(target=target, name="process-watch", daemon=True)
+        self._thread.start()
+
+    def _exited(self, pid):
+        """Record one exit and notify."""
+        self.remaining.discard(pid)
+        if self.on_exit:
+            self.on_exit(pid, len(self.remaining))
+
+    def _finish(self):
+        """Notify that every process is gone (unless stopped)."""
+        if not self._stop.is_set():
+            self.on_all_exited()
+
+    def _run_pidfd(self):
+        """Thread body: block in poll() on one pidfd per process."""
+        poller = select.poll()
+        poller.register(self._wake_read, select.POLLIN)
+        fds = {}
+        try:
+            for pid in sorted(self.remaining):
+                try:
+                    fd = os.pidfd_open(pid)
+                except ProcessLookupError:
+                    self._exited(pid)
+                    continue
+                except OSError:
+                    # pidfd_open unsupported by this kernel: fall back to polling
+                    for fd in fds:
+                        os.close(fd)
+                    fds.clear()
+                    self.method = "polling"
+                    self._run_polling()
+                    return
+                fds[fd] = pid
+                poller.register(fd, select.POLLIN)
+
+            while fds and not self._stop.is_set():
+                for fd, _ in poller.poll():
+                    if fd == self._wake_read:
+                        continue
+                    pid = fds.pop(fd)
+                    poller.unregister(fd)
+                    os.close(fd)
+                    self._exited(pid)
+            self._finish()
+        finally:
+            for fd in fds:
+                os.close(fd)
+            self._close_wake_pipe()
+
+    def _close_wake_pipe(self):
+        """Close the pipe stop() writes to, so it is never written after closing."""
+        with self._wake_lock:
+            if self._wake_write is not None:
+                os.close(self._wake_read)
+                os.close(self._wake_write)
+                self._wake_read, self._wake_write = (None, None)
+
+    def _run_polling(self):
+        """Thread body: check the remaining processes every poll_interval."""
+        identities = {pid: process_identity(pid) for pid in self.remaining}
+        while True:
+            for pid in sorted(self.remaining):
+                identity = identities[pid]
+                if identity is None or process_identity(pid) != identity:
+                    self._exited(pid)
+            if not self.remaining or self._stop.wait(self.poll_interval):
+                break
+        self._finish()
+
+    def stop(self):
+        """Stop watching; on_all_exited will not be called."""
+        self._stop.set()
+        with self._wake_lock:
+            # None once the thread has ended: its descriptor numbers may belong to other files by now
+            if self._wake_write is not None:
+                os.write(self._wake_write, b"x")
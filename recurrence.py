@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Recurring schedules for the Shutdown Scheduler.
+
+A RecurrenceRule is a standard five-field cron expression
+("minute hour day-of-month month day-of-week"). Every field is parsed once
+into an integer bitset, and the next firing is found by jumping to the next
+set bit of each field instead of stepping minute by minute, so even very
+sparse rules resolve in a handful of operations.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import calendar
+from datetime import datetime, timedelta
+
+# (minimum, maximum) for each cron field
+FIELD_RANGES = [
+    (0, 59),  # Minute
+    (0, 23),  # Hour
+    (1, 31),  # Day of month
+    (1, 12),  # Month
+    (0, 7),   # Day of week (0 and 7 are both Sunday)
+]
+
+MONTH_NAMES = {name.lower(): index for index, name in enumerate(calendar.month_abbr) if name}
+DAY_NAMES = {"sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6}
+
+# Shorthand expressions accepted in place of a cron expression
+PRESETS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+}
+
+# Give up after this many years without a match (e.g. "0 0 30 2 *")
+MAX_SEARCH_YEARS = 28
+
+
+def next_set_bit(mask, start):
+    """
+    Find the lowest set bit of mask at or above position start.
+
+    Args:
+        mask: Integer bitset
+        start: First bit position to consider
+
+    Returns:
+        int or None: Bit position, or None if no bit is set at or above start
+    """
+    shifted = mask >> start
+    if not shifted:
+        return None
+    return start + (shifted & -shifted).bit_length() - 1
+
+
+def parse_field(text, minimum, maximum, names=None):
+    """
+    Parse one cron field into a bitset.
+
+    Supports "*", single values, "a-b" ranges, "/step" and comma lists.
+
+    Args:
+        text: The field text
+        minimum: Smallest valid value
+        maximum: Largest valid value
+        names: Optional mapping of lowercase names to values
+
+    Returns:
+        int: Bitset with bit n set for every matching value n
+
+    Raises:
+        ValueError: If the field is malformed or out of range
+    """
+    def value(token):
+        token = token.strip().lower()
+        if names and token in names:
+            return names[token]
+        if not token.isdigit():
+            raise ValueError(f"Invalid cron value: {token!r}")
+        return int(token)
+
+    mask = 0
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = value(step_text)
+            if step <= 0:
+                raise ValueError(f"Invalid cron step: {step_text!r}")
+
+        if part == "*":
+            start, end = minimum, maximum
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = value(start_text), value(end_text)
+        else:
+            start = value(part)
+            # "5/15" means "from 5 to the end in steps of 15"
+            end = maximum if step > 1 else start
+
+        if start < minimum or end > maximum or start > end:
+            raise ValueError(f"Cron field out of range: {text!r}")
+        for n in range(start, end + 1, step):
+            mask |= 1 << n
+    return mask
+
+
+class RecurrenceRule:
+    """
+    A recurring schedule defined by a cron expression.
+
+    Day-of-month and day-of-week follow the usual cron convention: if both
+    are restricted, a day matches when either of them matches.
+    """
+
+    def __init__(self, expression):
+        """
+        Parse a cron expression.
+
+        Args:
+            expression: Five-field cron expression or a preset such as "@daily"
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        self.expression = PRESETS.get(expression.strip(), expression.strip())
+        fields = self.expression.split()
+        if len(fields) != 5:
+            raise ValueError("A cron expression needs exactly five fields")
+
+        names = [None, None, None, MONTH_NAMES, DAY_NAMES]
+        masks = [
+            parse_field(text, low, high, field_names)
+            for text, (low, high), field_names in zip(fields, FIELD_RANGES, names)
+        ]
+        self.minutes, self.hours, self.days_of_month, self.months, weekdays = masks
+
+        # Fold Sunday=7 onto Sunday=0
+        if weekdays & (1 << 7):
+            weekdays = (weekdays | 1) & 0x7F
+        self.days_of_week = weekdays
+
+        self.days_restricted = fields[2] != "*"
+        self.weekdays_restricted = fields[4] != "*"
+        self._month_cache = {}  # (year, month) -> bitset of matching days
+
+    @classmethod
+    def daily(cls, hour, minute):
+        """Create a rule that fires every day at hour:minute."""
+        return cls(f"{minute} {hour} * * *")
+
+    @classmethod
+    def weekdays(cls, hour, minute):
+        """Create a rule that fires Monday to Friday at hour:minute."""
+        return cls(f"{minute} {hour} * * 1-5")
+
+    def __repr__(self):
+        """Return a readable representation of the rule."""
+        return f"RecurrenceRule({self.expression!r})"
+
+    def _days_in_month(self, year, month):
+        """
+        Get the bitset of matching days for a month (cached).
+
+        Args:
+            year: Calendar year
+            month: Calendar month (1-12)
+
+        Returns:
+            int: Bitset with bit d set for every matching day d
+        """
+        key = (year, month)
+        mask = self._month_cache.get(key)
+        if mask is not None:
+            return mask
+
+        first_weekday, day_count = calendar.monthrange(year, month)
+        valid = ((1 << day_count) - 1) << 1  # Bits 1..day_count
+
+        # Build the weekday pattern for this month: cron Sunday=0, Python Monday=0
+        weekday_days = 0
+        for day in range(1, day_count + 1):
+            if self.days_of_week >> ((first_weekday + day) % 7) & 1:
+                weekday_days |= 1 << day
+
+        if self.days_restricted and self.weekdays_restricted:
+            mask = (self.days_of_month | weekday_days) & valid
+        elif self.days_restricted:
+            mask = self.days_of_month & valid
+        else:
+            mask = weekday_days & valid
+
+        if len(self._month_cache) > 512:
+            self._month_cache.clear()
+        self._month_cache[key] = mask
+        return mask
+
+    def matches(self, moment):
+        """
+        Check whether the rule fires in the minute containing moment.
+
+        Args:
+            moment: datetime to check
+
+        Returns:
+            bool: True if the rule fires at that minute
+        """
+        return bool(
+            self.minutes >> moment.minute & 1
+            and self.hours >> moment.hour & 1
+            and self.months >> moment.month & 1
+            and self._days_in_month(moment.year, moment.month) >> moment.day & 1
+        )
+
+    def next_after(self, after):
+        """
+        Compute the first firing strictly after a given time.
+
+        Args:
+            after: datetime to search from
+
+        Returns:
+            datetime or None: The next firing, or None if the rule never fires
+        """
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        year, month, day = start.year, start.month, start.day
+        hour, minute = start.hour, start.minute
+        last_year = min(year + MAX_SEARCH_YEARS, datetime.max.year)
+
+        while year <= last_year:
+            # Month
+            next_month = next_set_bit(self.months, month)
+            if next_month is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute = next_month, 1, 0, 0
+
+            # Day
+            next_day = next_set_bit(self._days_in_month(year, month), day)
+            if next_day is None:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                if month > 12:
+                    year, month = year + 1, 1
+                continue
+            if next_day != day:
+                day, hour, minute = next_day, 0, 0
+
+            # Hour
+            next_hour = next_set_bit(self.hours, hour)
+            if next_hour is None:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if next_hour != hour:
+                hour, minute = next_hour, 0
+
+            # Minute
+            next_minute = next_set_bit(self.minutes, minute)
+            if next_minute is None:
+                hour, minute = hour + 1, 0
+                if hour > 23:
+                    day, hour = day + 1, 0
+                continue
+
+            return datetime(year, month, day, hour, next_minute)
+        return None
+
+    def iter_from(self, after, count):
+        """
+        Yield the next count firings after a given time.
+
+        Args:
+            after: datetime to search from
+            count: Number of firings to produce
+
+        Yields:
+            datetime: Successive firings
+        """
+        current = after
+        for _ in range(count):
+            current = self.next_after(current)
+            if current is None:
+                return
+            yield current
+
+
+def first_firing(chosen, repeat, now):
+    """
+    Work out when a schedule picked in the GUI form fires first.
+
+    Args:
+        chosen: Date and time entered in the form
+        repeat: "Once", "Daily" or "Weekdays"
+        now: Current local date and time
+
+    Returns:
+        tuple or None: (datetime, RecurrenceRule or None), or None if a
+        one-off time is not in the future
+    """
+    if repeat == "Once":
+        return (chosen, None) if chosen > now else None
+
+    if repeat == "Daily":
+        rule = RecurrenceRule.daily(chosen.hour, chosen.minute)
+    else:
+        rule = RecurrenceRule.weekdays(chosen.hour, chosen.minute)
+    # The first matching time on or after the chosen date
+    start_from = max(now, datetime.combine(chosen.date(), datetime.min.time()) - timedelta(minutes=1))
+    return rule.next_after(start_from), rule
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Shutdown actions shared by the GUI and the headless scheduler.
+
+An action backend turns an action name ("shutdown", "reboot", "suspend" or
+"custom") into a command line. prepare() resolves the executable to an
+absolute path and checks that it exists when the timer is armed, so a
+missing command is reported right away instead of when the deadline fires,
+and firing does no PATH search:
+
+    action = default_backend().prepare("reboot")   # raises if unavailable
+    ...
+    action.run()                                    # at the deadline
+
+Backends:
+    WindowsBackend   shutdown.exe and powrprof.dll (suspend)
+    LinuxBackend     systemctl when systemd is running, else shutdown
+    PosixBackend     shutdown (macOS and other Unix systems)
+    DryRunBackend    records actions instead of running them (for tests
+                     and --dry-run)
+
+This module only depends on the standard library so that the headless entry
+point never pulls in tkinter, PIL or pystray.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+ACTIONS = ("shutdown", "reboot", "suspend", "custom")
+
+# How each action is described in messages ("Computer will ... in 30 seconds")
+ACTION_VERBS = {
+    "shutdown": "shutdown",
+    "reboot": "restart",
+    "suspend": "go to sleep",
+    "custom": "run the custom action",
+}
+
+
+class PreparedAction:
+    """An action whose command line has been resolved and validated."""
+
+    def __init__(self, action, argv, backend):
+        """
+        Initialize the prepared action.
+
+        Args:
+            action: Action name
+            argv: Command line with an absolute executable path
+            backend: Backend that runs it
+        """
+        self.action = action
+        self.argv = argv
+        self.backend = backend
+
+    def run(self):
+        """
+        Perform the action.
+
+        Raises:
+            subprocess.CalledProcessError: If the command fails
+            OSError: If the command cannot be started
+        """
+        self.backend.run(self)
+
+    def describe(self):
+        """Return the command line as one string."""
+        return " ".join(shlex.quote(argument) for argument in self.argv)
+
+
+class CommandBackend:
+    """
+    Base backend: one command line per action, run with subprocess.
+
+    Subclasses fill in COMMANDS; an action missing from it is not supported.
+    """
+
+    name = "command"
+    COMMANDS = {}
+
+    def command_for(self, action, command=None):
+        """
+        Get the unresolved command line for an action.
+
+        Args:
+            action: One of ACTIONS
+            command: Command line for the "custom" action (string or list)
+
+        Returns:
+            list: Command line
+
+        Raises:
+            ValueError: If the action is unknown or unsupported here
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action {action!r}; expected one of {', '.join(ACTIONS)}")
+        if action == "custom":
+            argv = shlex.split(command) if isinstance(command, str) else list(command or [])
+            if not argv:
+                raise ValueError("The custom action needs a command")
+            return argv
+        if action not in self.COMMANDS:
+            raise ValueError(f"{ACTION_VERBS[action].capitalize()} is not supported on this system")
+        return list(self.COMMANDS[action])
+
+    def prepare(self, action, command=None):
+        """
+        Resolve and validate an action; call when the timer is armed.
+
+        Args:
+            action: One of ACTIONS
+            command: Command line for the "custom" action
+
+        Returns:
+            PreparedAction: Ready to run
+
+        Raises:
+            ValueError: If the action is unknown or unsupported here
+            FileNotFoundError: If the executable cannot be found
+        """
+        argv = self.command_for(action, command)
+        return PreparedAction(action, [resolve_executable(argv[0])] + argv[1:], self)
+
+    def run(self, prepared):
+        """Run a prepared action's command."""
+        subprocess.run(prepared.argv, check=True)
+
+
+class WindowsBackend(CommandBackend):
+    """shutdown.exe for power off and restart, powrprof.dll for sleep."""
+
+    name = "windows"
+    COMMANDS = {
+        "shutdown": ["shutdown", "/s", "/t", "0"],
+        "reboot": ["shutdown", "/r", "/t", "0"],
+        "suspend": ["rundll32.exe", "powrprof.dll,SetSuspendState", "0,1,0"],
+    }
+
+
+class PosixBackend(CommandBackend):
+    """The shutdown command (macOS and Unix systems without systemd)."""
+
+    name = "posix"
+    COMMANDS = {
+        "shutdown": ["shutdown", "-h", "now"],
+        "reboot": ["shutdown", "-r", "now"],
+    }
+
+
+class LinuxBackend(PosixBackend):
+    """systemctl when systemd is the init system, otherwise shutdown."""
+
+    name = "linux"
+    SYSTEMCTL_COMMANDS = {
+        "shutdown": ["systemctl", "poweroff"],
+        "reboot": ["systemctl", "reboot"],
+        "suspend": ["systemctl", "suspend"],
+    }
+
+    def __init__(self, use_systemd=None):
+        """
+        Initialize the backend.
+
+        Args:
+            use_systemd: Force systemctl on or off (default: detect systemd)
+        """
+        if use_systemd is None:
+            # The documented check for "booted with systemd" (sd_booted)
+            use_systemd = os.path.isdir("/run/systemd/system")
+        if use_systemd:
+            self.COMMANDS = self.SYSTEMCTL_COMMANDS
+
+
+class DryRunBackend(CommandBackend):
+    """
+    Records actions instead of running them.
+
+    Commands are looked up on the backend being simulated, but a missing
+    executable is tolerated so dry runs work anywhere.
+    """
+
+    name = "dry-run"
+
+    def __init__(self, simulated=None, clock=time.perf_counter):
+        """
+        Initialize the backend.
+
+        Args:
+            simulated: Backend whose commands are recorded (default: this platform's)
+            clock: Time source for the recorded timestamps
+        """
+        self.simulated = simulated or default_backend()
+        self.clock = clock
+        self.records = []  # (timestamp, action, argv)
+        self._lock = threading.Lock()
+
+    def command_for(self, action, command=None):
+        """Get the simulated backend's command line."""
+        return self.simulated.command_for(action, command)
+
+    def prepare(self, action, command=None):
+        """Validate the action; resolve the executable if it exists."""
+        argv = self.command_for(action, command)
+        try:
+            argv[0] = resolve_executable(argv[0])
+        except FileNotFoundError:
+            pass
+        return PreparedAction(action, argv, self)
+
+    def run(self, prepared):
+        """Record the action."""
+        with self._lock:
+            self.records.append((self.clock(), prepared.action, list(prepared.argv)))
+
+
+def resolve_executable(program):
+    """
+    Find a program's absolute path.
+
+    Args:
+        program: Program name or path
+
+    Returns:
+        str: Absolute path of an executable file
+
+    Raises:
+        FileNotFoundError: If it is not found or not executable
+    """
+    path = shutil.which(program)
+    if path is None:
+        raise FileNotFoundError(f"Command not found: {program}")
+    return os.path.abspath(path)
+
+
+def default_backend():
+    """
+    Get the backend for this platform.
+
+    Returns:
+        CommandBackend: WindowsBackend, LinuxBackend or PosixBackend
+    """
+    if sys.platform.startswith("win"):
+        return WindowsBackend()
+    if sys.platform.startswith("linux"):
+        return LinuxBackend()
+    return PosixBackend()
+
+
+def shutdown_command():
+    """
+    Get the command that powers off this machine immediately.
+
+    Returns:
+        list: Command line for subprocess
+    """
+    return default_backend().command_for("shutdown")
+
+
+def execute_shutdown():
+    """
+    Power off the machine.
+
+    Raises:
+        subprocess.CalledProcessError: If the shutdown command fails
+        OSError: If the shutdown command cannot be started
+    """
+    default_backend().prepare("shutdown").run()
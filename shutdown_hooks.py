@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Pre-shutdown hooks for the Shutdown Scheduler.
+
+Hooks are commands (sync scripts, database checkpoints, closing apps) run
+during the warning period before the shutdown. They run concurrently in a
+bounded pool, each with its own timeout, so the time they take is that of
+the slowest hook rather than the sum. The shutdown never waits for them: a
+hook still running when the warning period ends is killed, together with
+any processes it started (each hook runs in its own process group).
+
+Hooks are read from hooks.json in the app's data directory:
+
+    [
+        {"name": "sync", "command": "rsync -a ~/work nas:/backup", "timeout": 25},
+        {"name": "checkpoint", "command": ["psql", "-c", "CHECKPOINT"]}
+    ]
+
+and can be added on the command line with --hook.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import json
+import os
+import shlex
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import app_paths
+
+HOOKS_FILE = "hooks.json"
+
+# Seconds a hook may run unless it sets its own "timeout"
+DEFAULT_TIMEOUT = 20.0
+
+# Upper bound on hooks running at the same time
+MAX_WORKERS = 8
+
+
+class Hook:
+    """A command to run before shutting down."""
+
+    def __init__(self, name, command, timeout=DEFAULT_TIMEOUT):
+        """
+        Initialize the hook.
+
+        Args:
+            name: Name shown in the warning popup
+            command: Command line (string or argument list)
+            timeout: Seconds before the hook is killed (number or numeric string)
+
+        Raises:
+            ValueError: If the command is empty or the timeout is not a positive number
+        """
+        self.name = name
+        if not isinstance(command, (str, list, tuple)):
+            raise ValueError(f"Hook {name!r} needs a command string or argument list")
+        self.argv = shlex.split(command) if isinstance(command, str) else [str(argument) for argument in command]
+        if not self.argv:
+            raise ValueError(f"Hook {name!r} has no command")
+        try:
+            self.timeout = float(timeout)
+        except (TypeError, ValueError):
+            raise ValueError(f"Hook {name!r} has an invalid timeout: {timeout!r}")
+        if not self.timeout > 0:  # Also rejects NaN
+            raise ValueError(f"Hook {name!r} needs a positive timeout")
+
+
+def start_in_process_group(argv):
+    """
+    Start a hook command in a new process group (its own session on POSIX).
+
+    Returns:
+        subprocess.Popen: The started process
+    """
+    if os.name == "nt":
+        group = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group = {"start_new_session": True}
+    return subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, **group)
+
+
+def kill_process_group(process):
+    """Kill a hook and every process it started (see start_in_process_group)."""
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass  # Group already gone
+    try:
+        process.kill()  # In case the group could not be signalled
+    except OSError:
+        pass
+
+
+class HookResult:
+    """Outcome of one hook run."""
+
+    def __init__(self, name, status, duration=0.0, returncode=None, message=""):
+        """
+        Initialize the result.
+
+        Args:
+            name: Hook name
+            status: "ok", "failed", "timeout", "error" or "cancelled"
+            duration: Seconds the hook ran
+            returncode: Exit status, if the process exited
+            message: Short explanation for anything but "ok"
+        """
+        self.name = name
+        self.status = status
+        self.duration = duration
+        self.returncode = returncode
+        self.message = message
+
+    def describe(self):
+        """One-line summary for the popup and logs."""
+        text = f"{self.name}: {self.status} ({self.duration:.1f} s)"
+        return f"{text} - {self.message}" if self.message else text
+
+
+class HookRunner:
+    """
+    Runs hooks concurrently with per-hook timeouts.
+
+    on_result is called from the worker threads as each hook finishes (use
+    post_to_ui or similar to get back to the UI thread).
+    """
+
+    def __init__(self, hooks, on_result=None, max_workers=MAX_WORKERS, clock=time.monotonic):
+        """
+        Initialize the runner (does not start the hooks).
+
+        Args:
+            hooks: List of Hook
+            on_result: Called with each HookResult (optional)
+            max_workers: Maximum hooks running at once
+            clock: Monotonic time source
+        """
+        self.hooks = list(hooks)
+        self.on_result = on_result
+        self.max_workers = max(1, min(max_workers, len(self.hooks)))
+        self.clock = clock
+        self.results = []
+        self.limit = None
+        self.done = threading.Event()
+        self._processes = {}
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def start(self, time_limit=None):
+        """
+        Start running the hooks.
+
+        Args:
+            time_limit: Seconds from now after which no hook may still run
+                (normally the warning period)
+        """
+        self.limit = self.clock() + time_limit if time_limit is not None else None
+        if not self.hooks:
+            self.done.set()
+            return
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="shutdown-hook")
+        for hook in self.hooks:
+            self._executor.submit(self._run_hook, hook)
+        self._executor.shutdown(wait=False)
+
+    def _run_hook(self, hook):
+        """Worker body: run one hook and report the result."""
+        started = self.clock()
+        timeout = hook.timeout
+        if self.limit is not None:
+            timeout = min(timeout, self.limit - started)
+
+        # Started under the lock so that cancel() sees every running process
+        process = error = None
+        with self._lock:
+            if not self._cancelled and timeout > 0:
+                try:
+                    process = start_in_process_group(hook.argv)
+                    self._processes[hook] = process
+                except OSError as e:
+                    error = str(e)
+        if error is not None:
+            self._report(HookResult(hook.name, "error", message=error))
+            return
+        if process is None:
+            self._report(HookResult(hook.name, "cancelled", message="not started"))
+            return
+
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_process_group(process)
+            process.communicate()
+            self._report(HookResult(hook.name, "timeout", self.clock() - started, process.returncode,
+                                    f"killed after {timeout:.1f} s"))
+            return
+        finally:
+            with self._lock:
+                self._processes.pop(hook, None)
+
+        duration = self.clock() - started
+        if self._cancelled and process.returncode < 0:
+            self._report(HookResult(hook.name, "cancelled", duration, process.returncode, "stopped"))
+        elif process.returncode == 0:
+            self._report(HookResult(hook.name, "ok", duration, 0))
+        else:
+            last_line = stderr.decode(errors="replace").strip().splitlines()[-1:] if stderr else []
+            message = last_line[0][:80] if last_line else f"exit status {process.returncode}"
+            self._report(HookResult(hook.name, "failed", duration, process.returncode, message))
+
+    def _report(self, result):
+        """Store a result and notify."""
+        with self._lock:
+            self.results.append(result)
+            finished = len(self.results) == len(self.hooks)
+        if self.on_result:
+            self.on_result(result)
+        if finished:
+            self.done.set()
+
+    def cancel(self):
+        """Kill running hooks and skip those not started yet; does not wait."""
+        with self._lock:
+            self._cancelled = True
+            processes = list(self._processes.values())
+        for process in processes:
+            kill_process_group(process)
+
+    def summary(self):
+        """
+        Count the results by status.
+
+        Returns:
+            str: e.g. "3/4 hooks finished, 1 failed"
+        """
+        with self._lock:
+            results = list(self.results)
+        text = f"{len(results)}/{len(self.hooks)} hooks finished"
+        problems = {}
+        for result in results:
+            if result.status != "ok":
+                problems[result.status] = problems.get(result.status, 0) + 1
+        for status, count in sorted(problems.items()):
+            text += f", {count} {status}"
+        return text
+
+
+def load_hooks(path=None):
+    """
+    Read the hooks file.
+
+    Args:
+        path: JSON file (default: hooks.json in the data directory)
+
+    Returns:
+        list: Hook objects (empty if the file does not exist)
+
+    Raises:
+        ValueError: If the file is not a valid hook list
+    """
+    if path is None:
+        path = os.path.join(app_paths.data_dir(), HOOKS_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read {path}: {e}")
+
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} must contain a list of hooks")
+    hooks = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or "command" not in entry:
+            raise ValueError(f"Hook {index + 1} in {path} needs a command")
+        hooks.append(Hook(entry.get("name") or f"hook {index + 1}", entry["command"],
+                          entry.get("timeout", DEFAULT_TIMEOUT)))
+    return hooks
+
+
+def hooks_from_commands(commands):
+    """
+    Build hooks from --hook command lines.
+
+    Returns:
+        list: Hook objects named after their executables
+    """
+    hooks = []
+    for command in commands or []:
+        hook = Hook(command, command)
+        hook.name = os.path.basename(hook.argv[0])
+        hooks.append(hook)
+    return hooks
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Single-instance detection for the Shutdown Scheduler.
+
+Uses an advisory lock held on a file in the temp directory (fcntl.flock on
+Unix, msvcrt.locking on Windows). The check is a single non-blocking system
+call regardless of how many processes are running, and the kernel drops the
+lock when the owning process dies, so a crashed instance never leaves a stale
+lock behind.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE_NAME = "shutdown_scheduler.lock"
+
+
+def default_lock_path():
+    """Get the lock file path shared by all instances of the app."""
+    return os.path.join(tempfile.gettempdir(), LOCK_FILE_NAME)
+
+
+class InstanceLock:
+    """
+    Advisory lock proving that this process is the only running instance.
+
+    The lock file also holds the owner's PID for diagnostics only; it is
+    never used to decide whether another instance is alive.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize the lock (does not acquire it).
+
+        Args:
+            path: Lock file path (defaults to the shared temp-dir path)
+        """
+        self.path = path or default_lock_path()
+        self._file = None
+
+    @property
+    def held(self):
+        """Return True while this process holds the lock."""
+        return self._file is not None
+
+    def acquire(self):
+        """
+        Try to take the lock without blocking.
+
+        Returns:
+            bool: True if the lock was acquired, False if another instance holds it
+        """
+        if self._file:
+            return True
+
+        while True:
+            lock_file = open(self.path, "a+")
+            try:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                lock_file.close()
+                return False
+
+            # The previous owner may have removed the file between our open
+            # and our lock; only a lock on the file at self.path counts
+            if not fcntl or self._is_current_file(lock_file):
+                break
+            lock_file.close()
+
+        # Record the owner for diagnostics
+        try:
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(str(os.getpid()))
+            lock_file.flush()
+        except OSError:
+            pass
+
+        self._file = lock_file
+        return True
+
+    def _is_current_file(self, lock_file):
+        """Check that lock_file is still the file found at self.path."""
+        try:
+            opened = os.fstat(lock_file.fileno())
+            current = os.stat(self.path)
+        except OSError:
+            return False
+        return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+    def release(self):
+        """Release the lock and remove the lock file."""
+        if not self._file:
+            return
+        try:
+            # Remove the file while still holding the lock so no other
+            # instance can lock the old inode in between
+            os.remove(self.path)
+        except OSError:
+            pass
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        self._file.close()
+        self._file = None
+
+    def owner_pid(self):
+        """
+        Read the PID recorded by the current lock owner.
+
+        Returns:
+            int or None: The PID, or None if unknown
+        """
+        try:
+            with open(self.path) as f:
+                pid_str = f.read().strip()
+            return int(pid_str) if pid_str.isdigit() else None
+        except OSError:
+            return None
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Persistent startup cache for the Shutdown Scheduler.
+
+Stores results that are otherwise recomputed on every launch (the detected
+date format and the rendered tray icons) together with the last-used timer
+inputs. The cache is keyed on the app version and the locale environment;
+if either changes, the cached values are discarded and recomputed.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import base64
+import json
+import locale
+import os
+import threading
+from datetime import datetime
+
+import app_paths
+
+CACHE_FILE_NAME = "startup_cache.json"
+
+# Environment variables that decide the C library's time locale
+LOCALE_VARIABLES = ("LC_ALL", "LC_TIME", "LANG")
+
+
+def detect_date_format():
+    """
+    Detect the system's date format for display purposes.
+
+    Returns:
+        str: The detected date format (MM/DD/YYYY, DD/MM/YYYY, or YYYY-MM-DD)
+    """
+    try:
+        # Get system locale
+        system_locale = locale.getlocale()
+        if system_locale[0]:
+            locale.setlocale(locale.LC_TIME, system_locale[0])
+
+        # Test with a known date to determine the format
+        test_date = datetime(2024, 12, 25)  # December 25, 2024
+        formatted = test_date.strftime("%x")
+
+        # Parse the formatted date to determine the actual format
+        parts = formatted.replace("-", "/").split("/")
+        if len(parts) == 3:
+            # Check if December (12) is in the first position (MM/DD/YYYY)
+            if "12" in parts[0]:
+                return "MM/DD/YYYY"  # US format
+            # Check if December (12) is in the second position (DD/MM/YYYY)
+            elif "12" in parts[1]:
+                return "DD/MM/YYYY"  # European format
+            # Check if year (2024) is in the first position (YYYY-MM-DD)
+            elif "2024" in parts[0]:
+                return "YYYY-MM-DD"  # ISO format
+            else:
+                # Fallback: check the length of first part
+                if len(parts[0]) == 4:  # Year is first
+                    return "YYYY-MM-DD"
+                elif len(parts[0]) == 2:  # Could be either MM or DD
+                    # If second part is also 2 digits, assume MM/DD/YYYY
+                    return "MM/DD/YYYY"
+                else:
+                    return "DD/MM/YYYY"  # Default to European
+        else:
+            return "DD/MM/YYYY"  # Default to European format
+    except:
+        return "DD/MM/YYYY"  # Default to European format
+
+
+def locale_key():
+    """
+    Describe the current locale cheaply (without calling setlocale).
+
+    Returns:
+        str: A string that changes whenever the user's locale changes
+    """
+    try:
+        system_locale = locale.getlocale()
+    except ValueError:
+        system_locale = (None, None)
+    environment = [os.environ.get(name, "") for name in LOCALE_VARIABLES]
+    return "|".join([str(system_locale[0]), str(system_locale[1])] + environment)
+
+
+class StartupCache:
+    """
+    Small JSON cache read once at startup and written when values change.
+
+    Values are only returned when the cache was written by the same app
+    version under the same locale.
+    """
+
+    def __init__(self, version, path=None):
+        """
+        Load the cache.
+
+        Args:
+            version: Application version string, part of the cache key
+            path: Cache file path (defaults to the app data dir)
+        """
+        self.version = version
+        self.path = path
+        self.key = {"version": version, "locale": locale_key()}
+        self.data = {}
+        self.hit = False
+        self.dirty = False
+        self._lock = threading.Lock()  # set()/save() may run on a warm-up thread
+
+        try:
+            self.path = path or os.path.join(app_paths.data_dir(), CACHE_FILE_NAME)
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        # Inputs survive a version or locale change; derived values don't
+        if isinstance(stored, dict):
+            self.data["inputs"] = stored.get("inputs") or {}
+            if stored.get("key") == self.key:
+                self.data.update(stored)
+                self.hit = True
+
+    def get(self, name, default=None):
+        """Get a cached value."""
+        return self.data.get(name, default)
+
+    def set(self, name, value):
+        """Set a cached value (written by save())."""
+        with self._lock:
+            if self.data.get(name) != value:
+                self.data[name] = value
+                self.dirty = True
+
+    def get_bytes(self, name):
+        """Get a cached binary value, or None."""
+        value = self.data.get(name)
+        try:
+            return base64.b64decode(value) if value else None
+        except (TypeError, ValueError):
+            return None
+
+    def set_bytes(self, name, value):
+        """Set a cached binary value."""
+        self.set(name, base64.b64encode(value).decode("ascii"))
+
+    def get_bytes_map(self, name):
+        """Get a cached mapping of keys to binary values, or None."""
+        value = self.data.get(name)
+        try:
+            return {key: base64.b64decode(item) for key, item in value.items()} if value else None
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def set_bytes_map(self, name, value):
+        """Set a cached mapping of keys to binary values."""
+        self.set(name, {key: base64.b64encode(item).decode("ascii") for key, item in value.items()})
+
+    def date_format(self):
+        """
+        Get the system date format, detecting it only on a cache miss.
+
+        Returns:
+            str: e.g. "DD/MM/YYYY"
+        """
+        date_format = self.get("date_format")
+        if not date_format:
+            date_format = detect_date_format()
+            self.set("date_format", date_format)
+        return date_format
+
+    def save(self):
+        """Write the cache atomically if anything changed."""
+        with self._lock:
+            if not self.dirty or not self.path:
+                return
+            self.data["key"] = self.key
+            temp_path = self.path + ".tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.data, f)
+                os.replace(temp_path, self.path)
+                self.dirty = False
+            except OSError:
+                pass  # The cache is only an optimization
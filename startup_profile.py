@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Startup profiling for the Shutdown Scheduler.
+
+Run the app with --profile-startup [PATH] to record the
+wall-clock and CPU time of every startup phase plus the import time of the
+heavy dependencies, up to the moment the first window is drawn (imports that
+are deferred until after the first window are timed once it is shown). The
+app then writes two files and exits:
+
+    PATH.json    machine-readable report (phases, imports, totals)
+    PATH.folded  folded stacks ("startup;__init__;setup_ui 1234", in
+                 microseconds) for flamegraph.pl, speedscope or inferno
+
+PATH defaults to "startup_profile" in the current directory. When profiling
+is off every call is a cheap no-op.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import importlib
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_FLAG = "--profile-startup"
+DEFAULT_REPORT_PATH = "startup_profile"
+
+# GUI modules imported before the first window, timed individually
+EAGER_MODULES = ("tkinter",)
+
+# Tray and monitoring modules loaded after the first window; profiled
+# separately so their cost stays visible
+DEFERRED_MODULES = ("PIL.Image", "PIL.ImageDraw", "pystray", "psutil")
+
+
+def profile_path_from_argv(argv):
+    """
+    Find the --profile-startup option in a command line.
+
+    Args:
+        argv: Command line arguments (e.g. sys.argv)
+
+    Returns:
+        str or None: Report path without extension, or None if not profiling
+    """
+    for index, argument in enumerate(argv[1:], 1):
+        if argument == PROFILE_FLAG:
+            # "--profile-startup PATH" or a bare "--profile-startup"
+            following = argv[index + 1] if index + 1 < len(argv) else ""
+            return following if following and not following.startswith("-") else DEFAULT_REPORT_PATH
+        if argument.startswith(PROFILE_FLAG + "="):
+            return argument.split("=", 1)[1] or DEFAULT_REPORT_PATH
+    return None
+
+
+class StartupProfiler:
+    """
+    Nested phase timer for application startup.
+
+    Phases nest (a phase opened inside another becomes its child), and each
+    records wall time (perf_counter) and the main thread's CPU time
+    (thread_time), so time spent by background warm-up threads is not
+    charged to the phase that started them.
+    """
+
+    def __init__(self, path=None, clock=time.perf_counter, cpu_clock=time.thread_time):
+        """
+        Start profiling.
+
+        Args:
+            path: Report path without extension; None disables profiling
+            clock: Wall-clock time source
+            cpu_clock: CPU time source for the profiled thread
+        """
+        self.path = path
+        self.enabled = path is not None
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.started = clock()
+        self.cpu_started = cpu_clock()
+        self.process_cpu_started = time.process_time()
+        self.phases = []  # Completed phases in the order they ended
+        self.imports = []
+        self.marks = {}
+        self._stack = []
+
+    @classmethod
+    def from_argv(cls, argv):
+        """Create a profiler that is enabled only if argv asks for it."""
+        return cls(profile_path_from_argv(argv))
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the enclosed block as a startup phase.
+
+        Args:
+            name: Phase name (one frame of the folded stack)
+        """
+        if not self.enabled:
+            yield
+            return
+
+        self._stack.append(name)
+        path = tuple(self._stack)
+        wall_started = self.clock()
+        cpu_started = self.cpu_clock()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                "name": name,
+                "stack": ";".join(path),
+                "depth": len(path) - 1,
+                "start_ms": (wall_started - self.started) * 1000.0,
+                "wall_ms": (self.clock() - wall_started) * 1000.0,
+                "cpu_ms": (self.cpu_clock() - cpu_started) * 1000.0,
+            })
+            self._stack.pop()
+
+    def time_imports(self, names=EAGER_MODULES, phase="imports"):
+        """
+        Import modules one by one and record how long each took.
+
+        Must run before the modules are imported elsewhere, otherwise the
+        cost shows up as zero (reported as already_loaded). Missing modules
+        are recorded as unavailable, not raised.
+
+        Args:
+            names: Dotted module names
+            phase: Name of the phase grouping the imports
+        """
+        if not self.enabled:
+            return
+
+        with self.phase(phase):
+            for name in names:
+                already_loaded = name in sys.modules
+                wall_started = self.clock()
+                cpu_started = self.cpu_clock()
+                try:
+                    importlib.import_module(name)
+                    available = True
+                except ImportError:
+                    available = False
+                wall_ms = (self.clock() - wall_started) * 1000.0
+                cpu_ms = (self.cpu_clock() - cpu_started) * 1000.0
+                self.imports.append({
+                    "module": name,
+                    "phase": phase,
+                    "available": available,
+                    "already_loaded": already_loaded,
+                    "wall_ms": wall_ms,
+                    "cpu_ms": cpu_ms,
+                })
+                # Show each import as its own frame under the phase
+                self.phases.append({
+                    "name": f"import {name}",
+                    "stack": ";".join(self._stack + [f"import {name}"]),
+                    "depth": len(self._stack),
+                    "start_ms": (wall_started - self.started) * 1000.0,
+                    "wall_ms": wall_ms,
+                    "cpu_ms": cpu_ms,
+                })
+
+    def mark(self, name):
+        """Record a point in time, e.g. "first_window"."""
+        if self.enabled:
+            self.marks[name] = (self.clock() - self.started) * 1000.0
+
+    def report(self):
+        """
+        Build the report.
+
+        Returns:
+            dict: JSON-serializable report
+        """
+        return {
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "total_wall_ms": (self.clock() - self.started) * 1000.0,
+            "total_cpu_ms": (self.cpu_clock() - self.cpu_started) * 1000.0,
+            "process_cpu_ms": (time.process_time() - self.process_cpu_started) * 1000.0,
+            "marks": dict(self.marks),
+            "phases": sorted(self.phases, key=lambda phase: phase["start_ms"]),
+            "imports": list(self.imports),
+        }
+
+    def folded_stacks(self):
+        """
+        Convert the phases to folded stacks weighted by self time.
+
+        Returns:
+            list: Lines of "root;phase;child <microseconds>"
+        """
+        # Self time = wall time minus the wall time of direct children
+        self_us = {}
+        for phase in self.phases:
+            self_us[phase["stack"]] = self_us.get(phase["stack"], 0.0) + phase["wall_ms"] * 1000.0
+        for phase in self.phases:
+            parent = phase["stack"].rpartition(";")[0]
+            if parent in self_us:
+                self_us[parent] -= phase["wall_ms"] * 1000.0
+
+        # Whatever no phase covered is charged to the root frame
+        total_us = (self.clock() - self.started) * 1000000.0
+        top_level_us = sum(phase["wall_ms"] * 1000.0 for phase in self.phases if phase["depth"] == 0)
+        lines = [f"startup {max(0, round(total_us - top_level_us))}"]
+        for stack, micros in self_us.items():
+            lines.append(f"startup;{stack} {max(0, round(micros))}")
+        return lines
+
+    def write(self):
+        """
+        Write the JSON report and the folded stack file.
+
+        Returns:
+            list: Paths written (empty when profiling is off)
+        """
+        if not self.enabled:
+            return []
+
+        json_path = self.path + ".json"
+        folded_path = self.path + ".folded"
+        report = self.report()
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        with open(folded_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.folded_stacks()) + "\n")
+        return [json_path, folded_path]
@@ -0,0 +1,54 @@
+"""Test configuration: make the application modules importable from the tests."""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def wait_until(predicate, timeout=5.0):
+    """Poll predicate until it is true, failing after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.001)
+
+
+def cancel_during_sample(start_monitor, reading):
+    """
+    Cancel a sampling monitor from another thread while its reader runs.
+
+    The sample in progress must neither queue another sample nor report
+    its result once cancel() has returned.
+
+    Args:
+        start_monitor: Function(reader) -> (driver, queue, monitor, results)
+            that starts the monitor on a SimulatedDriver's queue; results
+            collects what the monitor reports
+        reading: What the reader returns; it should make the sample either
+            finish or queue the next one
+    """
+    sampling = threading.Event()
+    release = threading.Event()
+    state = {"block": False}
+
+    def reader():
+        if state["block"]:
+            sampling.set()
+            release.wait(5)
+        return reading
+
+    driver, queue, monitor, results = start_monitor(reader)
+    state["block"] = True
+    worker = threading.Thread(target=driver.step)
+    worker.start()
+    assert sampling.wait(5)
+    monitor.cancel()
+    release.set()
+    worker.join(5)
+    assert len(queue) == 0
+    driver.run_until_idle()
+    assert results == []
+    assert not monitor.waiting
@@ -0,0 +1,112 @@
+"""Tests for the local JSON-RPC control socket."""
+
+import json
+import os
+import socket
+import stat
+
+import pytest
+
+import control_server
+from control_server import ControlClient, ControlServer, RpcError, UNAUTHORIZED
+
+
+@pytest.fixture
+def tcp_fallback(monkeypatch):
+    """Serve the local channel on loopback TCP, as on systems without AF_UNIX."""
+    monkeypatch.setattr(control_server, "UNIX_SOCKETS", False)
+
+
+def serve(path):
+    server = ControlServer({"status": lambda: {"running": False}}, path)
+    assert server.start()
+    return server
+
+
+def send_raw(port, data):
+    """Send raw bytes, end the request side and return everything the server answers."""
+    with socket.create_connection(("127.0.0.1", port), 5) as sock:
+        sock.sendall(data)
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+
+def test_tcp_fallback_requires_the_token_from_the_port_file(tcp_fallback, tmp_path):
+    path = str(tmp_path / "scheduler.port")
+    server = serve(path)
+    try:
+        port, token = open(path).read().split()
+        if os.name == "posix":
+            assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert token == server.token
+        with ControlClient(path) as client:
+            assert client.call("status") == {"running": False}
+
+        request = {"jsonrpc": "2.0", "id": 1, "method": "status"}
+        reply = json.loads(send_raw(int(port), json.dumps(request).encode() + b"\n"))
+        assert reply["error"]["code"] == UNAUTHORIZED
+    finally:
+        server.stop()
+
+
+def test_tcp_fallback_rejects_the_wrong_token(tcp_fallback, tmp_path):
+    path = str(tmp_path / "scheduler.port")
+    server = serve(path)
+    try:
+        port, _ = open(path).read().split()
+        (tmp_path / "forged.port").write_text(f"{port}\nnot-the-token\n")
+        with ControlClient(str(tmp_path / "forged.port")) as client:
+            with pytest.raises(RpcError) as error:
+                client.call("status")
+        assert error.value.code == UNAUTHORIZED
+    finally:
+        server.stop()
+
+
+def test_http_request_is_dropped_at_its_first_line(tcp_fallback, tmp_path):
+    path = str(tmp_path / "scheduler.port")
+    server = ControlServer({"cancel": lambda: "cancelled"}, path)
+    assert server.start()
+    try:
+        port, token = open(path).read().split()
+        command = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "cancel", "auth": token})
+        post = (f"POST / HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: text/plain\r\n\r\n{command}\n").encode()
+        replies = send_raw(int(port), post).splitlines()
+        assert len(replies) == 1
+        assert json.loads(replies[0])["error"]["code"] == control_server.PARSE_ERROR
+        assert server.requests_served == 0
+    finally:
+        server.stop()
+
+
+@pytest.mark.skipif(not control_server.UNIX_SOCKETS, reason="needs AF_UNIX")
+def test_socket_lives_in_a_private_directory(monkeypatch, tmp_path):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path))
+    monkeypatch.setenv("HOME", str(tmp_path))
+    path = control_server.default_socket_path()
+    directory = os.path.dirname(path)
+    assert directory.startswith(str(tmp_path))
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+
+    runtime = tmp_path / "run"
+    runtime.mkdir(mode=0o700)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(runtime))
+    assert control_server.default_socket_path() == str(runtime / control_server.SOCKET_NAME)
+
+
+@pytest.mark.skipif(not control_server.UNIX_SOCKETS, reason="needs AF_UNIX")
+def test_unix_socket_serves_without_a_token(tmp_path):
+    path = str(tmp_path / "scheduler.sock")
+    server = serve(path)
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        with ControlClient(path) as client:
+            assert client.call("status") == {"running": False}
+    finally:
+        server.stop()
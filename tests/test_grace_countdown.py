@@ -0,0 +1,64 @@
+"""Tests for the warning-period countdown."""
+
+from clock import SimulatedClock, SimulatedDriver
+from timer_engine import MIN_GRACE_SECONDS, GraceCountdown
+
+
+def start_countdown(seconds=30):
+    clock = SimulatedClock()
+    driver = SimulatedDriver(clock)
+    expired = []
+    countdown = GraceCountdown(seconds, on_tick=lambda remaining: None,
+                               on_expire=lambda: expired.append(clock.monotonic()),
+                               call_later=driver.after, cancel_call=driver.after_cancel, clock=clock.monotonic)
+    return clock, driver, countdown, expired
+
+
+def test_counts_from_when_the_deadline_fired():
+    clock, driver, countdown, expired = start_countdown()
+    fired_at = clock.monotonic()
+    clock.advance(2)  # The UI was slow to show the warning
+    countdown.start(started_at=fired_at)
+    driver.run_until_idle()
+    assert expired == [fired_at + 30]
+
+
+def test_late_start_leaves_the_minimum():
+    clock, driver, countdown, expired = start_countdown()
+    fired_at = clock.monotonic()
+    clock.advance(29.5)
+    started = clock.monotonic()
+    countdown.start(started_at=fired_at)
+    driver.run_until_idle()
+    assert expired == [started + MIN_GRACE_SECONDS]
+
+
+def test_delayed_map_event_extends_to_the_minimum():
+    clock, driver, countdown, expired = start_countdown()
+    fired_at = clock.monotonic()
+    countdown.start(started_at=fired_at)
+    driver.run_for(25)  # The popup is only mapped now
+    mapped = clock.monotonic()
+    assert countdown.extend_to_minimum()
+    driver.run_until_idle()
+    assert expired == [mapped + MIN_GRACE_SECONDS]
+
+
+def test_prompt_map_event_keeps_the_deadline():
+    clock, driver, countdown, expired = start_countdown()
+    fired_at = clock.monotonic()
+    countdown.start(started_at=fired_at)
+    driver.run_for(1)
+    assert not countdown.extend_to_minimum()
+    driver.run_until_idle()
+    assert expired == [fired_at + 30]
+
+
+def test_minimum_is_capped_at_the_period():
+    clock, driver, countdown, expired = start_countdown(seconds=3)
+    fired_at = clock.monotonic()
+    clock.advance(60)
+    started = clock.monotonic()
+    countdown.start(started_at=fired_at)
+    driver.run_until_idle()
+    assert expired == [started + 3]
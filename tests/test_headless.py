@@ -0,0 +1,122 @@
+"""Tests for the headless scheduler's control methods."""
+
+import io
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from clock import SimulatedClock
+from conftest import wait_until
+from headless import HeadlessScheduler, format_remaining, seconds_until
+from shutdown_actions import DryRunBackend
+
+
+def test_schedule_during_grace_period_stops_the_pending_action():
+    backend = DryRunBackend()
+    out = io.StringIO()
+    scheduler = HeadlessScheduler(grace_seconds=0.5, dry_run=True, out=out, action=backend.prepare("shutdown"))
+    scheduler.arm(0.01)
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(code=scheduler.run()))
+    thread.start()
+    try:
+        wait_until(lambda: "Deadline reached" in out.getvalue())
+        status = scheduler.rpc_schedule(seconds=3600)
+        assert status["running"]
+
+        # Well past the old grace period: the old deadline's action must not have run
+        time.sleep(1.0)
+        assert backend.records == []
+        assert thread.is_alive()
+        assert "Shutdown moved" in out.getvalue()
+        assert scheduler.rpc_status()["remaining_seconds"] > 3500
+    finally:
+        scheduler.cancel()
+        thread.join(5)
+    assert result["code"] == 1
+    assert backend.records == []
+
+
+def test_agent_schedule_during_grace_period_keeps_running():
+    backend = DryRunBackend()
+    out = io.StringIO()
+    scheduler = HeadlessScheduler(grace_seconds=0.5, dry_run=True, out=out, action=backend.prepare("shutdown"),
+                                  agent=True)
+    scheduler.arm(0.01)
+    thread = threading.Thread(target=scheduler.run)
+    thread.start()
+    try:
+        wait_until(lambda: "Deadline reached" in out.getvalue())
+        scheduler.rpc_schedule(seconds=0.2)
+        # The new deadline runs its own grace period and then the action, once
+        wait_until(lambda: len(backend.records) == 1)
+        time.sleep(0.3)
+        assert len(backend.records) == 1
+    finally:
+        scheduler.cancel()
+        thread.join(5)
+
+
+@pytest.fixture
+def berlin_time(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is POSIX only")
+    monkeypatch.setenv("TZ", "Europe/Berlin")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_seconds_until_counts_real_time_across_a_dst_change(berlin_time):
+    # 02:00 -> 03:00 is skipped that night, so 01:30 to 03:30 is one hour
+    clock = SimulatedClock(datetime(2025, 3, 30, 1, 30))
+    assert seconds_until(datetime(2025, 3, 30, 3, 30), clock) == 3600
+    clock = SimulatedClock(datetime(2025, 10, 26, 1, 30))
+    assert seconds_until(datetime(2025, 10, 26, 3, 30), clock) == 3 * 3600
+
+
+def test_stale_queue_entry_does_not_fire_a_replaced_deadline():
+    scheduler = HeadlessScheduler(grace_seconds=0, dry_run=True, out=io.StringIO(), clock=SimulatedClock())
+    scheduler.arm(10)
+    popped = scheduler.entry  # As if the waiter thread had already taken it off the queue
+    scheduler.rpc_schedule(seconds=3600)
+    scheduler.on_deadline_reached(popped)
+    assert not scheduler.fired.is_set()
+    assert scheduler.rpc_status()["running"]
+
+
+def test_stale_queue_entry_after_disarm_is_ignored():
+    scheduler = HeadlessScheduler(grace_seconds=0, dry_run=True, out=io.StringIO(), clock=SimulatedClock(),
+                                  agent=True)
+    scheduler.arm(10)
+    popped = scheduler.entry
+    scheduler.disarm()
+    scheduler.on_deadline_reached(popped)
+    assert not scheduler.fired.is_set()
+
+
+@pytest.mark.parametrize("seconds, text", [
+    (9000 - 1e-6, "2h 30m 0s"),
+    (1 - 1e-3, "0m 1s"),
+    (59.2, "1m 0s"),
+    (0, "0m 0s"),
+])
+def test_format_remaining_rounds_up(seconds, text):
+    assert format_remaining(seconds) == text
+
+
+def test_status_without_a_deadline_has_no_shutdown_time():
+    scheduler = HeadlessScheduler(grace_seconds=0, dry_run=True, out=io.StringIO(), clock=SimulatedClock(),
+                                  agent=True)
+    status = scheduler.rpc_status()
+    assert not status["running"]
+    assert status["remaining_seconds"] == 0
+    assert status["shutdown_at"] is None
+
+    scheduler.arm(90)
+    status = scheduler.rpc_status()
+    assert status["running"]
+    assert status["shutdown_at"] == "2025-01-01T00:01:30"
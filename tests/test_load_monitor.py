@@ -0,0 +1,44 @@
+"""Tests for the --when-idle load monitor."""
+
+from clock import SimulatedClock, SimulatedDriver
+from conftest import cancel_during_sample
+from load_monitor import LoadMonitor
+from timer_engine import TimerQueue
+
+
+def start_monitor(reader):
+    clock = SimulatedClock()
+    driver = SimulatedDriver(clock)
+    queue = driver.add_queue(TimerQueue(clock=clock.monotonic))
+    monitor = LoadMonitor(threshold=25, max_wait=3600, reader=reader, clock=clock.monotonic)
+    done = []
+    monitor.start(queue, lambda waited, reason: done.append(reason))
+    return driver, queue, monitor, done
+
+
+def test_cancel_during_a_sample_stops_sampling():
+    state = {"cancel_on_next": False}
+
+    def reader():
+        if state["cancel_on_next"]:
+            monitor.cancel()  # As if cancelled from another thread mid-sample
+        return 90.0, 90.0
+
+    driver, queue, monitor, done = start_monitor(reader)
+    assert len(queue) == 1
+    state["cancel_on_next"] = True
+    driver.step()
+    assert len(queue) == 0
+    driver.run_until_idle()
+    assert done == []
+    assert not monitor.waiting
+
+
+def test_cancel_from_another_thread_while_sampling():
+    cancel_during_sample(start_monitor, (90.0, 90.0))  # Busy: the sample would queue the next one
+
+
+def test_reports_idle_when_not_cancelled():
+    driver, queue, monitor, done = start_monitor(lambda: (5.0, 5.0))
+    driver.run_until_idle()
+    assert done == ["idle"]
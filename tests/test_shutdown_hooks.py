@@ -0,0 +1,81 @@
+"""Tests for pre-shutdown hooks."""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from shutdown_hooks import Hook, HookRunner, load_hooks
+
+
+def test_string_timeout_is_converted():
+    assert Hook("sync", "true", "25").timeout == 25.0
+
+
+@pytest.mark.parametrize("timeout", ["soon", None, [], 0, -1, float("nan")])
+def test_invalid_timeout_raises_value_error(timeout):
+    with pytest.raises(ValueError):
+        Hook("sync", "true", timeout)
+
+
+def test_bad_hook_file_raises_value_error(tmp_path):
+    path = tmp_path / "hooks.json"
+    path.write_text(json.dumps([{"name": "sync", "command": "true", "timeout": "soon"}]))
+    with pytest.raises(ValueError):
+        load_hooks(str(path))
+    path.write_text(json.dumps([{"command": 42}]))
+    with pytest.raises(ValueError):
+        load_hooks(str(path))
+
+
+def process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # Reaped by init or still a zombie counts as gone once it no longer runs
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+def start_hook_with_child(tmp_path, timeout):
+    pid_file = tmp_path / "child.pid"
+    script = f"sleep 60 & echo $! > {pid_file}; wait"
+    runner = HookRunner([Hook("spawner", ["sh", "-c", script], timeout)])
+    runner.start(time_limit=30)
+    deadline = time.monotonic() + 5
+    while not (pid_file.exists() and pid_file.read_text().strip()):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return runner, int(pid_file.read_text())
+
+
+def wait_gone(pid):
+    deadline = time.monotonic() + 5
+    while process_exists(pid):
+        if time.monotonic() > deadline:
+            os.kill(pid, 9)
+            pytest.fail(f"child {pid} of the hook survived")
+        time.sleep(0.01)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses sh and POSIX process groups")
+def test_timeout_kills_the_hooks_children(tmp_path):
+    runner, child = start_hook_with_child(tmp_path, timeout=0.5)
+    assert runner.done.wait(10)
+    assert runner.results[0].status == "timeout"
+    wait_gone(child)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses sh and POSIX process groups")
+def test_cancel_kills_the_hooks_children(tmp_path):
+    runner, child = start_hook_with_child(tmp_path, timeout=30)
+    runner.cancel()
+    assert runner.done.wait(10)
+    assert runner.results[0].status == "cancelled"
+    wait_gone(child)
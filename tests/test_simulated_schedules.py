@@ -0,0 +1,213 @@
+"""
+Schedules replayed through the real HeadlessScheduler on a simulated clock.
+
+The scheduler gets a SimulatedClock and its timer queue is driven by a
+SimulatedDriver, so multi-day schedules fire in microseconds. The main
+loop (grace period, action, re-arming of repeating rules) runs on its own
+thread as in the app; each firing is recorded by a dry-run backend with the
+simulated time. Suspends and clock changes are applied between timer
+events and the scheduler's ClockWatcher is checked by hand afterwards.
+"""
+
+import io
+import threading
+from datetime import datetime, timedelta
+
+from clock import SimulatedClock, SimulatedDriver
+from clock_watch import ClockWatcher
+from conftest import wait_until
+from headless import HeadlessScheduler
+from recurrence import RecurrenceRule, first_firing
+from shutdown_actions import DryRunBackend
+
+
+class SimulatedRun:
+    """A HeadlessScheduler on a SimulatedClock with its main loop on a thread."""
+
+    def __init__(self, start):
+        self.clock = SimulatedClock(start)
+        self.driver = SimulatedDriver(self.clock)
+        self.backend = DryRunBackend(clock=self.clock.now)
+        self.scheduler = HeadlessScheduler(grace_seconds=0, dry_run=True, out=io.StringIO(), clock=self.clock,
+                                           action=self.backend.prepare("shutdown"))
+        self.driver.add_queue(self.scheduler.timer_queue)
+        # Checked by hand (as the kernel's timerfd would wake it) instead of started
+        self.scheduler.clock_watcher = ClockWatcher(self.scheduler.on_clock_jump, clock=self.clock)
+        self.exit_code = None
+        self.thread = threading.Thread(target=self._main_loop, daemon=True)
+
+    def _main_loop(self):
+        self.exit_code = self.scheduler._run()
+
+    def start(self):
+        self.thread.start()
+
+    def fire_next(self):
+        """
+        Advance to the next timer event, then wait for the main loop to settle.
+
+        Returns:
+            bool: True if the event ran the action
+        """
+        fired_before = len(self.backend.records)
+        entry_before = self.scheduler.entry
+        assert self.driver.step(), "nothing scheduled"
+        if not self.scheduler.fired.is_set():
+            return False
+        # The loop has run the action and either re-armed or returned
+        wait_until(lambda: len(self.backend.records) > fired_before and (
+            not self.thread.is_alive()
+            or (self.scheduler.entry is not entry_before and not self.scheduler.fired.is_set())))
+        return True
+
+    def run_firings(self, count):
+        """Run until the action has run count times (or the loop exits)."""
+        while len(self.backend.records) < count and self.thread.is_alive():
+            self.fire_next()
+        return self.fired_at()
+
+    def disturb_at(self, awake_seconds, change):
+        """
+        Change the clock after awake_seconds of simulated uptime.
+
+        Args:
+            awake_seconds: Monotonic seconds from now
+            change: Called with the SimulatedClock (e.g. to suspend or jump);
+                the clock watcher is checked right after, as timerfd would wake it
+        """
+        def disturb(entry):
+            change(self.clock)
+            self.scheduler.clock_watcher.check(force=True)
+        self.driver.after_queue.schedule_at(self.clock.monotonic() + awake_seconds, disturb, kind="event")
+
+    def fired_at(self):
+        return [moment for moment, _, _ in self.backend.records]
+
+    def stop(self):
+        self.scheduler.cancel()
+        self.thread.join(5)
+
+
+def test_countdown_fires_after_exact_duration_across_new_year():
+    run = SimulatedRun(datetime(2029, 12, 31, 23, 0))
+    run.scheduler.arm(2 * 3600)
+    run.start()
+    assert run.run_firings(1) == [datetime(2030, 1, 1, 1, 0)]
+    run.thread.join(5)
+    assert run.exit_code == 0
+
+
+def test_one_off_time_fires_on_leap_day():
+    run = SimulatedRun(datetime(2028, 2, 28, 23, 30, 15))
+    run.scheduler.arm_at(datetime(2028, 2, 29, 22, 0))
+    run.start()
+    assert run.run_firings(1) == [datetime(2028, 2, 29, 22, 0)]
+    run.thread.join(5)
+    assert run.exit_code == 0
+
+
+def test_weekday_rule_rearms_in_the_main_loop():
+    # Friday evening: the next firings skip the weekend
+    run = SimulatedRun(datetime(2025, 1, 3, 21, 0))
+    assert run.scheduler.arm_rule(RecurrenceRule.weekdays(22, 0))
+    run.start()
+    try:
+        fired = run.run_firings(4)
+    finally:
+        run.stop()
+    assert fired == [
+        datetime(2025, 1, 3, 22, 0),
+        datetime(2025, 1, 6, 22, 0),
+        datetime(2025, 1, 7, 22, 0),
+        datetime(2025, 1, 8, 22, 0),
+    ]
+
+
+def test_daily_rule_from_the_gui_form_crosses_month_and_year_end():
+    now = datetime(2026, 12, 30, 23, 10)
+    fire_at, rule = first_firing(datetime(2026, 12, 30, 23, 5), "Daily", now)
+    run = SimulatedRun(now)
+    run.scheduler.recurrence_rule = rule
+    run.scheduler.arm_at(fire_at)
+    run.start()
+    try:
+        fired = run.run_firings(3)
+    finally:
+        run.stop()
+    assert fired == [
+        datetime(2026, 12, 31, 23, 5),
+        datetime(2027, 1, 1, 23, 5),
+        datetime(2027, 1, 2, 23, 5),
+    ]
+
+
+def test_schedule_request_replaces_a_repeating_rule():
+    run = SimulatedRun(datetime(2025, 3, 3, 12, 0))
+    run.scheduler.arm_rule(RecurrenceRule.daily(22, 0))
+    run.start()
+    try:
+        status = run.scheduler.rpc_schedule(seconds=90 * 60)
+        assert status["repeat"] is None
+        fired = run.run_firings(1)
+        run.thread.join(5)
+    finally:
+        run.stop()
+    assert fired == [datetime(2025, 3, 3, 13, 30)]
+    assert run.exit_code == 0
+
+
+def test_firing_times_match_the_clock_for_many_countdowns():
+    start = datetime(2027, 6, 1, 8, 0)
+    for minutes in (1, 59, 60, 61, 24 * 60, 7 * 24 * 60 + 1):
+        run = SimulatedRun(start)
+        run.scheduler.arm(minutes * 60)
+        run.start()
+        assert run.run_firings(1) == [start + timedelta(minutes=minutes)]
+        run.thread.join(5)
+
+
+def run_disturbed(disturbances, start=datetime(2025, 5, 5, 8, 0), at=datetime(2025, 5, 5, 12, 0)):
+    """Arm a shutdown at a time, change the clock on the way and return the firing times."""
+    run = SimulatedRun(start)
+    run.scheduler.arm_at(at)
+    for awake_seconds, change in disturbances:
+        run.disturb_at(awake_seconds, change)
+    run.start()
+    fired = run.run_firings(1)
+    run.thread.join(5)
+    assert run.exit_code == 0
+    return fired
+
+
+def test_clock_set_forwards_before_the_time_still_fires_at_the_time():
+    fired = run_disturbed([(3600, lambda clock: clock.jump_wall(2 * 3600))])
+    assert fired == [datetime(2025, 5, 5, 12, 0)]
+
+
+def test_clock_set_back_still_fires_at_the_time():
+    fired = run_disturbed([(3600, lambda clock: clock.jump_wall(-2 * 3600))])
+    assert fired == [datetime(2025, 5, 5, 12, 0)]
+
+
+def test_clock_set_forwards_past_the_time_fires_right_away():
+    fired = run_disturbed([(3600, lambda clock: clock.jump_wall(5 * 3600))])
+    assert fired == [datetime(2025, 5, 5, 14, 0)]
+
+
+def test_suspend_across_the_time_fires_on_resume():
+    fired = run_disturbed([(3600, lambda clock: clock.suspend(6 * 3600))])
+    assert fired == [datetime(2025, 5, 5, 15, 0)]
+
+
+def test_suspend_ending_before_the_time_fires_at_the_time():
+    fired = run_disturbed([(3600, lambda clock: clock.suspend(2 * 3600))])
+    assert fired == [datetime(2025, 5, 5, 12, 0)]
+
+
+def test_several_changes_in_both_directions():
+    fired = run_disturbed([
+        (1800, lambda clock: clock.suspend(3600)),           # 08:30 -> 09:30
+        (3600, lambda clock: clock.jump_wall(-3 * 3600)),    # 10:00 -> 07:00
+        (5400, lambda clock: clock.jump_wall(4 * 3600)),     # 07:30 -> 11:30
+    ])
+    assert fired == [datetime(2025, 5, 5, 12, 0)]
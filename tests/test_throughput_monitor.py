@@ -0,0 +1,88 @@
+"""Tests for the --after-quiet throughput monitor."""
+
+import pytest
+
+import throughput_monitor
+from clock import SimulatedClock, SimulatedDriver
+from conftest import cancel_during_sample
+from throughput_monitor import ThroughputMonitor
+from timer_engine import TimerQueue
+
+THRESHOLD = 1024  # bytes/s
+
+
+def start_monitor(reader, time_constant=1e-9):
+    """
+    Start a monitor sampling every 5 s that fires after 60 s of quiet.
+
+    The tiny default time constant turns smoothing off, so each sample's
+    rate is exactly the traffic since the previous one.
+
+    Args:
+        reader: Function(seconds since start) -> byte total
+    """
+    clock = SimulatedClock()
+    driver = SimulatedDriver(clock)
+    queue = driver.add_queue(TimerQueue(clock=clock.monotonic))
+    started = clock.monotonic()
+    monitor = ThroughputMonitor(threshold=THRESHOLD, quiet_period=60.0, interval=5.0, time_constant=time_constant,
+                                reader=lambda: reader(clock.monotonic() - started), clock=clock.monotonic)
+    quiet = []
+    monitor.start(queue, lambda: quiet.append(clock.monotonic() - started))
+    return driver, queue, monitor, quiet
+
+
+def test_cancel_from_another_thread_before_the_quiet_period_ends():
+    # No traffic: without the cancel, the sample would complete the quiet period
+    def start(reader):
+        driver, queue, monitor, quiet = start_monitor(lambda elapsed: reader())
+        monitor.quiet_period = 5.0
+        return driver, queue, monitor, quiet
+
+    cancel_during_sample(start, 0)
+
+
+def test_quiet_period_starts_when_the_rate_falls_below_the_threshold():
+    # 10 KB/s for 30 s, then nothing: quiet from the sample that saw 30 s
+    driver, queue, monitor, quiet = start_monitor(lambda elapsed: 10 * 1024 * min(elapsed, 30))
+    driver.run_until_idle()
+    assert quiet == [30 + 60]
+
+
+def test_traffic_just_under_the_threshold_counts_as_quiet():
+    driver, queue, monitor, quiet = start_monitor(lambda elapsed: (THRESHOLD - 1) * elapsed)
+    driver.run_until_idle()
+    assert quiet == [60]
+
+
+def test_burst_restarts_the_quiet_period():
+    # 100 KB arrive between 40 s and 45 s
+    driver, queue, monitor, quiet = start_monitor(lambda elapsed: 100 * 1024 if elapsed >= 45 else 0)
+    driver.run_until_idle()
+    assert quiet == [45 + 60]
+
+
+def test_counter_wrap_counts_as_no_traffic():
+    # The total drops (wraps) after 20 s; traffic keeps going at 50 KB/s until 200 s
+    def reader(elapsed):
+        base = 2 ** 40 if elapsed < 20 else 0
+        return base + 50 * 1024 * min(elapsed, 200)
+
+    rates = []
+    driver, queue, monitor, quiet = start_monitor(reader, time_constant=20.0)
+    monitor.on_sample = lambda rate, quiet_for: rates.append(rate)
+    driver.run_until_idle()
+    assert min(rates) >= 0
+    assert quiet and quiet[0] > 200
+
+
+def test_reader_skips_missing_disk_counters(monkeypatch):
+    psutil = pytest.importorskip("psutil")
+
+    class Network:
+        bytes_sent = 300
+        bytes_recv = 700
+
+    monkeypatch.setattr(psutil, "disk_io_counters", lambda perdisk=False: None)
+    monkeypatch.setattr(psutil, "net_io_counters", lambda pernic=False: Network())
+    assert throughput_monitor.io_counter_reader()() == 1000
@@ -0,0 +1,63 @@
+"""Tests for the clock and process watchers' background threads."""
+
+import subprocess
+import sys
+
+import pytest
+
+import clock_watch
+from clock import SimulatedClock
+from clock_watch import ClockWatcher
+from conftest import wait_until
+from process_watch import ProcessWatcher
+
+
+def assert_stop_writes_nothing_to(tmp_path, stop):
+    """Open files that would reuse the closed wake pipe's descriptors, then stop()."""
+    files = [open(tmp_path / f"reused-{n}", "w+b") for n in range(2)]
+    try:
+        stop()
+        for f in files:
+            f.seek(0)
+            assert f.read() == b""
+    finally:
+        for f in files:
+            f.close()
+
+
+@pytest.mark.skipif(clock_watch.open_clock_change_fd() is None, reason="needs timerfd")
+def test_clock_watcher_falls_back_to_polling_when_the_timerfd_fails(monkeypatch, tmp_path):
+    def broken(self, fd, libc):
+        raise OSError("timerfd_settime failed")
+
+    monkeypatch.setattr(ClockWatcher, "_poll_timerfd", broken)
+    clock = SimulatedClock()
+    jumps = []
+    watcher = ClockWatcher(jumps.append, clock=clock, check_interval=0.01)
+    watcher.start()
+    wait_until(lambda: watcher.method == "polling" and watcher._wake_write is None)
+    clock.jump_wall(120)
+    wait_until(lambda: jumps == [120])
+    assert_stop_writes_nothing_to(tmp_path, watcher.stop)
+    watcher._thread.join(5)
+    assert not watcher._thread.is_alive()
+
+
+def test_clock_watcher_stops_its_thread():
+    watcher = ClockWatcher(lambda jump: None, check_interval=0.01)
+    watcher.start()
+    watcher.stop()
+    watcher._thread.join(5)
+    assert not watcher._thread.is_alive()
+    watcher.stop()  # Again, after the thread has closed its pipe
+
+
+def test_process_watcher_stop_after_the_last_exit(tmp_path):
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited = []
+    watcher = ProcessWatcher([child.pid], lambda: exited.append(True), poll_interval=0.01)
+    watcher.start()
+    child.wait()
+    watcher._thread.join(5)
+    assert exited == [True]
+    assert_stop_writes_nothing_to(tmp_path, watcher.stop)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Throughput trigger for the Shutdown Scheduler.
+
+"Shut down when the download/backup is done": instead of guessing a
+countdown, sample the machine's total disk and network byte counters and
+fire once the combined transfer rate has stayed below a threshold for a
+quiet period.
+
+The rate is smoothed with an exponential moving average, so the state is a
+handful of numbers however long the transfer runs. Each sample reads the
+system-wide totals (psutil's disk_io_counters() and net_io_counters()
+without per-device breakdown) and keeps one previous total, so the
+monitor's own work does not grow with the number of disks and network
+interfaces. Sampling runs as entries on the app's TimerQueue.
+
+Loopback traffic is included in the network totals.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import math
+import threading
+import time
+
+# Combined disk + network rate below which the machine counts as quiet (bytes/s)
+DEFAULT_THRESHOLD = 100 * 1024
+
+# How long the rate must stay below the threshold (seconds)
+DEFAULT_QUIET_PERIOD = 120.0
+
+# Seconds between samples
+SAMPLE_INTERVAL = 5.0
+
+# Time constant of the moving average (seconds); short bursts are smoothed out
+TIME_CONSTANT = 20.0
+
+
+class ExponentialAverage:
+    """Exponential moving average for irregularly spaced samples."""
+
+    def __init__(self, time_constant):
+        """
+        Initialize the average.
+
+        Args:
+            time_constant: Seconds after which an old value's weight falls to 1/e
+        """
+        self.time_constant = time_constant
+        self.value = None
+
+    def add(self, sample, elapsed):
+        """
+        Fold in a sample.
+
+        Args:
+            sample: New value
+            elapsed: Seconds since the previous sample
+        """
+        if self.value is None:
+            self.value = sample
+            return
+        alpha = 1.0 - math.exp(-elapsed / self.time_constant)
+        self.value += alpha * (sample - self.value)
+
+
+def io_counter_reader():
+    """
+    Create a function that reads the total bytes moved by disks and NICs.
+
+    Returns:
+        callable or None: Returns the byte total; None without psutil
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    def read():
+        total = 0
+        disks = psutil.disk_io_counters(perdisk=False)
+        if disks is not None:  # None on machines without disks (e.g. some containers)
+            total += disks.read_bytes + disks.write_bytes
+        network = psutil.net_io_counters(pernic=False)
+        if network is not None:
+            total += network.bytes_sent + network.bytes_recv
+        return total
+    return read
+
+
+def throughput_monitoring_available():
+    """Check whether the I/O counters can be read (without importing psutil)."""
+    import importlib.util
+    return importlib.util.find_spec("psutil") is not None
+
+
+def format_rate(rate):
+    """Format bytes/s as e.g. "1.2 MB/s"."""
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if rate < 1024:
+            return f"{rate:.0f} {unit}" if unit == "B/s" else f"{rate:.1f} {unit}"
+        rate /= 1024.0
+    return f"{rate:.1f} GB/s"
+
+
+class ThroughputMonitor:
+    """Waits on a TimerQueue until disk and network traffic has gone quiet."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, quiet_period=DEFAULT_QUIET_PERIOD,
+                 interval=SAMPLE_INTERVAL, time_constant=TIME_CONSTANT, reader=None, clock=time.monotonic):
+        """
+        Initialize the monitor (does not start sampling).
+
+        Args:
+            threshold: Quiet rate in bytes/s (disk and network combined)
+            quiet_period: Seconds the rate must stay below threshold
+            interval: Seconds between samples
+            time_constant: Smoothing time constant in seconds
+            reader: Function returning the byte total (default: io_counter_reader())
+            clock: Monotonic time source
+        """
+        self.threshold = threshold
+        self.quiet_period = quiet_period
+        self.interval = interval
+        self.reader = reader
+        self.clock = clock
+        self.rate = ExponentialAverage(time_constant)
+        self.quiet_since = None
+        self.samples = 0
+        self.queue = None
+        self.entry = None
+        self.on_quiet = None
+        self.on_sample = None
+        self._previous = None  # (time, byte total)
+        self._lock = threading.Lock()  # Held to fire or resample, and by cancel()
+
+    def start(self, queue, on_quiet, on_sample=None):
+        """
+        Start sampling.
+
+        Args:
+            queue: TimerQueue that runs the samples
+            on_quiet: Called once when traffic has been quiet for quiet_period
+                (on the queue's thread)
+            on_sample: Called with (smoothed rate, seconds quiet so far) after
+                each sample (optional)
+
+        Raises:
+            OSError: If the I/O counters cannot be read here
+        """
+        if self.reader is None:
+            self.reader = io_counter_reader()
+            if self.reader is None:
+                raise OSError("Measuring disk and network traffic needs psutil")
+        self.queue = queue
+        self.on_quiet = on_quiet
+        self.on_sample = on_sample
+        self.rate = ExponentialAverage(self.rate.time_constant)
+        self.quiet_since = None
+        self.samples = 0
+        self._previous = (self.clock(), self.reader())
+        self.entry = queue.schedule(self.interval, self._sample, kind="throughput")
+
+    def _sample(self, entry):
+        """Update the average, then fire or queue the next sample."""
+        if self.on_quiet is None:
+            return  # Cancelled
+        now, total = self.clock(), self.reader()
+        then, previous_total = self._previous
+        self._previous = (now, total)
+        elapsed = max(now - then, 1e-6)
+        # Counters can wrap or be reset (e.g. an interface going away): count that as no traffic
+        self.rate.add(max(0, total - previous_total) / elapsed, elapsed)
+        self.samples += 1
+
+        if self.rate.value < self.threshold:
+            if self.quiet_since is None:
+                self.quiet_since = then
+        else:
+            self.quiet_since = None
+        quiet_for = now - self.quiet_since if self.quiet_since is not None else 0.0
+        if self.on_sample:
+            self.on_sample(self.rate.value, quiet_for)
+
+        with self._lock:
+            if self.on_quiet is None:
+                return  # Cancelled while sampling: neither fire nor queue another sample
+            if quiet_for >= self.quiet_period:
+                self.entry = None
+                on_quiet, self.on_quiet = self.on_quiet, None
+            else:
+                on_quiet = None
+                self.entry = self.queue.schedule(self.interval, self._sample, kind="throughput")
+        if on_quiet:
+            on_quiet()
+
+    def cancel(self):
+        """Stop sampling without calling on_quiet (callable from any thread)."""
+        with self._lock:
+            self.on_quiet = None
+            entry, self.entry = self.entry, None
+        if self.queue and entry:
+            self.queue.cancel(entry)
+
+    @property
+    def waiting(self):
+        """True while sampling."""
+        return self.on_quiet is not None
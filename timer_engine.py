@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+Timer engine for the Shutdown Scheduler.
+
+Deadlines are stored as absolute time.monotonic() targets. Remaining time is
+always derived from the target instead of being counted down one second at a
+time, so scheduling jitter, GIL contention and slow Tk callbacks cannot add up
+into a late shutdown.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+
+# Least warning time left once the warning is on screen (seconds)
+MIN_GRACE_SECONDS = 10.0
+
+
+class DriftStats:
+    """
+    Running statistics for how late timer wake-ups were.
+
+    All values are in seconds. Only a handful of counters are kept, so the
+    statistics can stay enabled for the whole lifetime of a timer.
+    """
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, lateness):
+        """
+        Record one wake-up.
+
+        Args:
+            lateness: Seconds between the intended and the actual wake-up time
+        """
+        self.count += 1
+        self.total += lateness
+        self.last = lateness
+        if lateness > self.max:
+            self.max = lateness
+
+    @property
+    def mean(self):
+        """Average lateness over all recorded wake-ups."""
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self):
+        """
+        Return the statistics as a plain dictionary (values in milliseconds).
+
+        Returns:
+            dict: count, mean_ms, max_ms and last_ms
+        """
+        return {
+            "count": self.count,
+            "mean_ms": self.mean * 1000.0,
+            "max_ms": self.max * 1000.0,
+            "last_ms": self.last * 1000.0,
+        }
+
+
+class DeadlineTimer:
+    """
+    A single countdown anchored to an absolute monotonic deadline.
+
+    The timer never decrements a counter. Every query computes the remaining
+    time from the deadline, so a late wake-up only delays the next display
+    update and never the deadline itself.
+    """
+
+    def __init__(self, duration_seconds, clock=time.monotonic):
+        """
+        Create a deadline duration_seconds from now.
+
+        Args:
+            duration_seconds: Seconds until the deadline
+            clock: Monotonic time source (defaults to time.monotonic)
+        """
+        self.clock = clock
+        self.duration = float(duration_seconds)
+        self.deadline = clock() + self.duration
+        self.tick_drift = DriftStats()
+        self.fire_drift = None  # Lateness of the final wake-up, once fired
+
+    def remaining(self):
+        """
+        Get the exact remaining time.
+
+        Returns:
+            float: Seconds until the deadline (never negative)
+        """
+        return max(0.0, self.deadline - self.clock())
+
+    def remaining_seconds(self):
+        """
+        Get the remaining time rounded up to whole seconds for display.
+
+        Returns:
+            int: Whole seconds until the deadline
+        """
+        return int(math.ceil(self.remaining()))
+
+    def expired(self):
+        """Return True once the deadline has been reached."""
+        return self.clock() >= self.deadline
+
+    def next_boundary(self, step=1.0, offset=0.0):
+        """
+        Find the next moment the remaining time crosses a multiple of step.
+
+        With step=1 this is the next time the whole-second display changes.
+        The offset shifts the boundaries to step * k - offset, which is where
+        a display built from the rounded-up seconds changes its minute value
+        (step=60, offset=1).
+
+        Args:
+            step: Display granularity in seconds
+            offset: Seconds to shift every boundary down by
+
+        Returns:
+            float: Monotonic time of the next boundary (at most the deadline)
+        """
+        remaining = self.deadline - self.clock()
+        if remaining <= 0:
+            return self.deadline
+        target_remaining = step * (math.ceil((remaining + offset) / step) - 1) - offset
+        return self.deadline - max(0.0, target_remaining)
+
+    def wait_until(self, target, stop_event):
+        """
+        Block until the monotonic time target or until stop_event is set.
+
+        The wake-up lateness is recorded in tick_drift.
+
+        Args:
+            target: Monotonic time to wake up at
+            stop_event: threading.Event that aborts the wait when set
+
+        Returns:
+            bool: True if the target was reached, False if the wait was aborted
+        """
+        while True:
+            delay = target - self.clock()
+            if delay <= 0:
+                break
+            # Event.wait returns early and True if the timer was cancelled
+            if stop_event.wait(delay):
+                return False
+
+        self.tick_drift.add(self.clock() - target)
+        return True
+
+    def record_fire(self):
+        """Record how late the deadline was actually acted on."""
+        self.fire_drift = self.clock() - self.deadline
+
+    def drift_report(self):
+        """
+        Summarize the measured drift of this timer.
+
+        Returns:
+            dict: Tick statistics plus the final firing lateness in milliseconds
+        """
+        report = {"ticks": self.tick_drift.as_dict()}
+        report["fire_ms"] = None if self.fire_drift is None else self.fire_drift * 1000.0
+        return report
+
+
+class WallDeadlineTimer(DeadlineTimer):
+    """
+    A deadline at a wall-clock time ("shut down at 22:00").
+
+    The monotonic deadline is derived from the wall-clock target. resync()
+    derives it again after the wall clock jumped or the machine resumed from
+    suspend (see clock_watch), so the timer fires at the chosen time instead
+    of a fixed interval after it was armed.
+    """
+
+    def __init__(self, target_time, clock=time.monotonic, wall_clock=time.time):
+        """
+        Create a deadline at a wall-clock time.
+
+        Args:
+            target_time: Epoch seconds to fire at
+            clock: Monotonic time source (defaults to time.monotonic)
+            wall_clock: Wall-clock time source (defaults to time.time)
+        """
+        self.target_time = target_time
+        self.wall_clock = wall_clock
+        super().__init__(target_time - wall_clock(), clock)
+
+    def resync(self):
+        """
+        Re-derive the monotonic deadline from the wall-clock target.
+
+        Returns:
+            float: Seconds the deadline moved (negative if it came closer)
+        """
+        previous = self.deadline
+        self.deadline = self.clock() + self.target_time - self.wall_clock()
+        return self.deadline - previous
+
+
+class TickPlanner:
+    """
+    Decide when the timer thread next needs to wake up.
+
+    The main window shows "X hours Y minutes" while at least an hour is left
+    and "X minutes Y seconds" after that, so the worker only has to wake when
+    that text changes: once a minute for most of a long countdown and once a
+    second near the end. A 10-hour countdown needs roughly 600 + 3600 wake-ups
+    instead of 36,000.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Initialize the planner and its wake-up counters.
+
+        Args:
+            clock: Monotonic time source (defaults to time.monotonic)
+        """
+        self.clock = clock
+        self.started_at = clock()
+        self.wakeups = 0
+        self.display_updates = 0
+
+    def next_wake(self, deadline):
+        """
+        Get the monotonic time of the next visible display change.
+
+        Args:
+            deadline: The running DeadlineTimer
+
+        Returns:
+            float: Monotonic time to sleep until
+        """
+        if deadline.remaining() > 3600:
+            # Minute display: changes when the rounded-up seconds hit 60k - 1
+            return deadline.next_boundary(60.0, offset=1.0)
+        return deadline.next_boundary(1.0)
+
+    def record_wakeup(self, display_changed=True):
+        """
+        Count a wake-up of the timer thread.
+
+        Args:
+            display_changed: Whether the wake-up posted a display update
+        """
+        self.wakeups += 1
+        if display_changed:
+            self.display_updates += 1
+
+    def stats(self):
+        """
+        Summarize the wake-up counters.
+
+        Returns:
+            dict: wakeups, display_updates, elapsed seconds and wakeups_per_hour
+        """
+        elapsed = self.clock() - self.started_at
+        per_hour = self.wakeups * 3600.0 / elapsed if elapsed > 0 else 0.0
+        return {
+            "wakeups": self.wakeups,
+            "display_updates": self.display_updates,
+            "elapsed": elapsed,
+            "wakeups_per_hour": per_hour,
+        }
+
+
+class TimerEntry:
+    """
+    One scheduled action in a TimerQueue.
+
+    Entries are ordered by deadline and then by insertion order, so two
+    entries with the same deadline fire first-in, first-out.
+    """
+
+    __slots__ = ("entry_id", "deadline", "callback", "kind", "label", "cancelled")
+
+    def __init__(self, entry_id, deadline, callback, kind, label):
+        """
+        Initialize the entry.
+
+        Args:
+            entry_id: Unique, increasing identifier
+            deadline: Monotonic time the entry fires at
+            callback: Callable invoked with the entry when it fires
+            kind: Action type, e.g. "shutdown", "reboot" or "tick"
+            label: Free-form description for display
+        """
+        self.entry_id = entry_id
+        self.deadline = deadline
+        self.callback = callback
+        self.kind = kind
+        self.label = label
+        self.cancelled = False
+
+    def __lt__(self, other):
+        """Order entries by deadline, then by insertion order."""
+        return (self.deadline, self.entry_id) < (other.deadline, other.entry_id)
+
+
+class TimerQueue:
+    """
+    Priority queue of scheduled actions served by a single waiter thread.
+
+    Inserting is O(log n) and cancelling is O(1): a cancelled entry is only
+    marked and is dropped when it reaches the top of the heap, and the heap is
+    rebuilt once more than half of it is cancelled, which keeps both the
+    memory and the amortized cost of cancel at O(log n). The waiter thread
+    sleeps until the earliest deadline and is woken early only when an earlier
+    entry is inserted, so thousands of entries cost no per-entry thread and no
+    periodic scanning.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Initialize an empty queue.
+
+        Args:
+            clock: Monotonic time source (defaults to time.monotonic)
+        """
+        self.clock = clock
+        self.drift = DriftStats()  # Lateness of every fired entry
+        self._heap = []
+        self._entries = {}  # entry_id -> live (not cancelled) entry
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def __len__(self):
+        """Return the number of pending (not cancelled) entries."""
+        return len(self._entries)
+
+    def schedule(self, delay, callback, kind="shutdown", label=""):
+        """
+        Schedule callback to run delay seconds from now.
+
+        Args:
+            delay: Seconds until the entry fires
+            callback: Callable invoked with the entry on the waiter thread
+            kind: Action type, e.g. "shutdown", "reboot" or "tick"
+            label: Free-form description for display
+
+        Returns:
+            TimerEntry: Handle that can be passed to cancel()
+        """
+        return self.schedule_at(self.clock() + delay, callback, kind, label)
+
+    def schedule_at(self, deadline, callback, kind="shutdown", label=""):
+        """
+        Schedule callback to run at the monotonic time deadline.
+
+        Args:
+            deadline: Monotonic time the entry fires at
+            callback: Callable invoked with the entry on the waiter thread
+            kind: Action type, e.g. "shutdown", "reboot" or "tick"
+            label: Free-form description for display
+
+        Returns:
+            TimerEntry: Handle that can be passed to cancel()
+        """
+        with self._condition:
+            entry = TimerEntry(next(self._ids), deadline, callback, kind, label)
+            heapq.heappush(self._heap, entry)
+            self._entries[entry.entry_id] = entry
+
+            # Only wake the waiter if its current sleep is now too long
+            if self._heap[0] is entry:
+                self._condition.notify()
+        return entry
+
+    def cancel(self, entry):
+        """
+        Cancel a pending entry.
+
+        Args:
+            entry: TimerEntry or entry id returned by schedule() (None is ignored)
+
+        Returns:
+            bool: True if the entry was pending and is now cancelled
+        """
+        if entry is None:
+            return False
+        entry_id = entry if isinstance(entry, int) else entry.entry_id
+        with self._condition:
+            entry = self._entries.pop(entry_id, None)
+            if entry is None:
+                return False
+            entry.cancelled = True
+
+            # Rebuild the heap once cancelled entries dominate it
+            if len(self._heap) > 64 and len(self._entries) < len(self._heap) // 2:
+                self._heap = [e for e in self._heap if not e.cancelled]
+                heapq.heapify(self._heap)
+            return True
+
+    def pending(self, kind=None):
+        """
+        List pending entries in firing order.
+
+        Args:
+            kind: Only return entries of this kind (default: all)
+
+        Returns:
+            list: TimerEntry objects sorted by deadline
+        """
+        with self._condition:
+            entries = [e for e in self._entries.values() if kind is None or e.kind == kind]
+        return sorted(entries)
+
+    def next_entry(self):
+        """
+        Get the entry that fires next.
+
+        Returns:
+            TimerEntry or None: The earliest pending entry
+        """
+        with self._condition:
+            self._discard_cancelled()
+            return self._heap[0] if self._heap else None
+
+    def _discard_cancelled(self):
+        """Drop cancelled entries from the top of the heap (lock held)."""
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now):
+        """
+        Pop the earliest entry if it is due (lock held).
+
+        Returns:
+            TimerEntry or None: The due entry, removed from the queue
+        """
+        self._discard_cancelled()
+        if self._heap and self._heap[0].deadline <= now:
+            entry = heapq.heappop(self._heap)
+            del self._entries[entry.entry_id]
+            return entry
+        return None
+
+    def _fire(self, entry):
+        """Run an entry's callback outside the lock and record its lateness."""
+        self.drift.add(self.clock() - entry.deadline)
+        try:
+            entry.callback(entry)
+        except Exception:
+            pass  # A failing action must not stop the waiter thread
+
+    def run_due(self):
+        """
+        Fire every entry that is due now, on the calling thread.
+
+        Returns:
+            int: Number of entries fired
+        """
+        fired = 0
+        while True:
+            with self._condition:
+                entry = self._pop_due(self.clock())
+            if entry is None:
+                return fired
+            self._fire(entry)
+            fired += 1
+
+    def start(self):
+        """Start the waiter thread (no-op if it is already running)."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the waiter thread. Pending entries are kept."""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def _run(self):
+        """Waiter thread: sleep until the earliest deadline and fire it."""
+        while True:
+            with self._condition:
+                entry = None
+                while self._running and entry is None:
+                    entry = self._pop_due(self.clock())
+                    if entry is None:
+                        # Sleep until the earliest deadline or a new earlier entry
+                        timeout = self._heap[0].deadline - self.clock() if self._heap else None
+                        self._condition.wait(timeout)
+                if not self._running:
+                    return
+            self._fire(entry)
+
+
+class GraceCountdown:
+    """
+    The warning period between the deadline and the shutdown.
+
+    Counted from a DeadlineTimer rather than by decrementing a counter once a
+    second, so a slow event loop cannot stretch it. Callbacks are scheduled
+    through call_later (Tk's widget.after in the app), which keeps them on
+    the UI thread.
+    """
+
+    def __init__(self, seconds, on_tick, on_expire, call_later, cancel_call=None, clock=time.monotonic,
+                 min_remaining=MIN_GRACE_SECONDS):
+        """
+        Initialize the countdown (does not start it).
+
+        Args:
+            seconds: Length of the warning period
+            on_tick: Called with the whole seconds left whenever that number changes
+            on_expire: Called once when the period is over
+            call_later: Function (delay_ms, callback) -> handle, e.g. widget.after
+            cancel_call: Function (handle) that cancels a call_later, e.g. widget.after_cancel
+            clock: Monotonic time source (defaults to time.monotonic)
+            min_remaining: Least time left when the countdown starts or is
+                shown, however late (capped at seconds)
+        """
+        self.seconds = seconds
+        self.min_remaining = min(min_remaining, seconds)
+        self.on_tick = on_tick
+        self.on_expire = on_expire
+        self.call_later = call_later
+        self.cancel_call = cancel_call
+        self.clock = clock
+        self.deadline = None
+        self.running = False
+        self.last_shown = None
+        self._pending = None
+
+    def start(self, started_at=None):
+        """
+        Start counting down.
+
+        Args:
+            started_at: Monotonic time the period began (default: now); an
+                earlier start shortens what is left of it, but not below
+                min_remaining
+        """
+        self.deadline = DeadlineTimer(self.seconds, clock=self.clock)
+        self.running = True
+        if started_at is not None:
+            self.deadline.deadline = started_at + self.seconds
+            self.extend_to_minimum()
+        self.last_shown = None
+        self._tick()
+
+    def extend_to_minimum(self):
+        """
+        Leave at least min_remaining seconds, e.g. once the warning is finally visible.
+
+        Returns:
+            bool: True if the deadline was moved (False if it was far enough
+                away or the countdown is not running)
+        """
+        earliest = self.clock() + self.min_remaining
+        if not self.running or self.deadline.deadline >= earliest:
+            return False
+        self.deadline.deadline = earliest
+        return True
+
+    def _tick(self):
+        """Show the remaining seconds, or expire, and schedule the next check."""
+        self._pending = None
+        if not self.running:
+            return
+        if self.deadline.expired():
+            self.running = False
+            self.deadline.record_fire()
+            self.on_expire()
+            return
+
+        remaining = self.deadline.remaining_seconds()
+        if remaining != self.last_shown:
+            self.last_shown = remaining
+            self.on_tick(remaining)
+
+        # Sleep until the displayed number changes (rounded to whole ms)
+        delay = self.deadline.next_boundary(1.0) - self.clock()
+        self._pending = self.call_later(max(1, round(delay * 1000)), self._tick)
+
+    def cancel(self):
+        """Stop the countdown; on_expire will not be called."""
+        self.running = False
+        if self._pending is not None and self.cancel_call:
+            self.cancel_call(self._pending)
+        self._pending = None
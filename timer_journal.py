@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Crash-safe journal of scheduled timers.
+
+State on disk is a snapshot of the active entries plus an append-only log of
+schedule/cancel/fire events recorded since that snapshot. Every record is a
+single JSON line carrying a CRC, so a line torn by a crash is detected and
+skipped. Appends are fsynced in batches by a background thread, and the log
+is compacted into a fresh snapshot (written to a temp file and atomically
+renamed) once it grows well beyond the number of active entries. Restoring
+therefore reads O(active entries) records, never the full history.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+
+import app_paths
+
+SNAPSHOT_NAME = "timers.snapshot"
+LOG_NAME = "timers.log"
+
+
+def encode_record(record):
+    """
+    Serialize a record as one checksummed JSON line.
+
+    Args:
+        record: JSON-serializable dict
+
+    Returns:
+        bytes: The line, including the trailing newline
+    """
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"))
+    return f"{zlib.crc32(payload.encode()):08x} {payload}\n".encode()
+
+
+def decode_record(line):
+    """
+    Parse a line written by encode_record.
+
+    Returns:
+        dict or None: The record, or None if the line is torn or corrupt
+    """
+    try:
+        text = line.decode().rstrip("\n")
+        checksum, payload = text.split(" ", 1)
+        if int(checksum, 16) != zlib.crc32(payload.encode()):
+            return None
+        return json.loads(payload)
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def read_records(path):
+    """
+    Read every intact record from a journal file.
+
+    Returns:
+        tuple: (records in file order, True if any line was torn or corrupt)
+    """
+    try:
+        with open(path, "rb") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return [], False
+
+    records = [record for record in map(decode_record, lines) if record is not None]
+    damaged = len(records) != len(lines) or (lines and not lines[-1].endswith(b"\n"))
+    return records, damaged
+
+
+def fsync_directory(path):
+    """Make a rename inside a directory durable (no-op where unsupported)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class TimerJournal:
+    """
+    Persistent record of active timers that survives crashes and restarts.
+
+    Entries are dicts with id, fire_at (wall-clock epoch seconds), kind,
+    label and an optional cron rule.
+    """
+
+    def __init__(self, directory=None, fsync_interval=0.05, compact_threshold=256):
+        """
+        Open (or create) the journal and restore the active entries.
+
+        Args:
+            directory: Where to keep the journal (defaults to the app data dir)
+            fsync_interval: Seconds to gather appends before one fsync
+            compact_threshold: Log records allowed beyond the active count
+                before the log is folded into a new snapshot
+        """
+        self.directory = directory or app_paths.data_dir()
+        self.snapshot_path = os.path.join(self.directory, SNAPSHOT_NAME)
+        self.log_path = os.path.join(self.directory, LOG_NAME)
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+
+        self.entries = {}  # id -> entry dict
+        self.log_records = 0
+        self.fsync_count = 0
+        self._lock = threading.Lock()
+        self._dirty = threading.Condition(self._lock)
+        self._pending_sync = False
+        self._closed = False
+
+        damaged = self._restore()
+        self._log = open(self.log_path, "ab")
+        if damaged:
+            # Don't append after a torn line: start from a clean snapshot
+            self.compact()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def _restore(self):
+        """
+        Rebuild the active entries from the snapshot and the log tail.
+
+        Returns:
+            bool: True if the log ends in a torn or corrupt record
+        """
+        snapshot, _ = read_records(self.snapshot_path)
+        for record in snapshot:
+            self.entries[record["id"]] = record
+
+        # Replaying is idempotent, so a log left over from an interrupted
+        # compaction is harmless
+        log, damaged = read_records(self.log_path)
+        for record in log:
+            self._apply(record)
+        self.log_records = len(log)
+        return damaged
+
+    def _apply(self, record):
+        """Apply one log record to the in-memory state."""
+        op = record.get("op")
+        if op == "schedule":
+            entry = dict(record)
+            del entry["op"]
+            self.entries[entry["id"]] = entry
+        elif op in ("cancel", "fire"):
+            self.entries.pop(record.get("id"), None)
+
+    def active(self):
+        """
+        List the active entries.
+
+        Returns:
+            list: Entry dicts sorted by fire_at
+        """
+        with self._lock:
+            return sorted(self.entries.values(), key=lambda entry: entry["fire_at"])
+
+    def record_schedule(self, fire_at, kind="shutdown", label="", rule=None):
+        """
+        Record a newly scheduled timer.
+
+        Args:
+            fire_at: Wall-clock time (epoch seconds) the timer fires at
+            kind: Action type, e.g. "shutdown"
+            label: Free-form description, e.g. the timer mode
+            rule: Cron expression for repeating schedules (optional)
+
+        Returns:
+            str: Journal id of the entry
+        """
+        entry_id = uuid.uuid4().hex
+        self._append({
+            "op": "schedule",
+            "id": entry_id,
+            "fire_at": fire_at,
+            "kind": kind,
+            "label": label,
+            "rule": rule,
+        })
+        return entry_id
+
+    def record_cancel(self, entry_id):
+        """Record that an entry was cancelled."""
+        if entry_id is not None:
+            self._append({"op": "cancel", "id": entry_id})
+
+    def record_fired(self, entry_id):
+        """Record that an entry fired and is no longer pending."""
+        if entry_id is not None:
+            self._append({"op": "fire", "id": entry_id})
+
+    def _append(self, record):
+        """Apply a record, append it to the log and queue an fsync."""
+        line = encode_record(record)
+        with self._lock:
+            if self._closed:
+                return
+            self._apply(record)
+            # One write call per record, so a crash tears at most the last line
+            self._log.write(line)
+            self._log.flush()
+            self.log_records += 1
+            self._pending_sync = True
+            self._dirty.notify()
+
+            if self.log_records > len(self.entries) + self.compact_threshold:
+                self._compact_locked()
+
+    def _flush_loop(self):
+        """Background thread: fsync appended records in batches."""
+        with self._lock:
+            while not self._closed:
+                if not self._pending_sync:
+                    self._dirty.wait()
+                    continue
+                # Gather more appends before paying for one fsync
+                self._lock.release()
+                try:
+                    time.sleep(self.fsync_interval)
+                finally:
+                    self._lock.acquire()
+                self._sync_locked()
+
+    def _sync_locked(self):
+        """fsync the log if there are unsynced appends (lock held)."""
+        if self._pending_sync and not self._closed:
+            os.fsync(self._log.fileno())
+            self.fsync_count += 1
+            self._pending_sync = False
+
+    def flush(self):
+        """Make every recorded event durable now."""
+        with self._lock:
+            self._sync_locked()
+
+    def compact(self):
+        """Fold the log into a new snapshot of the active entries."""
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        """Write the snapshot atomically, then start an empty log (lock held)."""
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            for entry in self.entries.values():
+                f.write(encode_record(entry))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        fsync_directory(self.directory)
+
+        # The snapshot now covers everything in the log
+        self._log.close()
+        self._log = open(self.log_path, "wb")
+        os.fsync(self._log.fileno())
+        self.log_records = 0
+        self._pending_sync = False
+
+    def close(self):
+        """Flush outstanding appends and stop the background thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._sync_locked()
+            self._closed = True
+            self._dirty.notify()
+            self._log.close()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+System tray icon rendering for the Shutdown Scheduler.
+
+The tray icon shows the remaining time as a progress ring around the clock.
+Frames are rendered once per progress bucket and cached, and TrayUpdater only
+talks to the tray backend when the visible bucket or the tooltip text
+actually changes (tooltip writes are additionally rate-limited), so the tray
+thread stays almost idle during a long countdown.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import io
+import math
+import time
+
+from PIL import Image, ImageDraw
+
+ICON_SIZE = 64
+BACKGROUND = (43, 43, 43, 255)
+FOREGROUND = (255, 255, 255, 255)
+RING_TRACK = (90, 90, 90, 255)
+RING_COLOR = (231, 76, 60, 255)
+
+# Number of distinct progress ring frames
+PROGRESS_BUCKETS = 24
+
+
+def draw_clock(size=ICON_SIZE):
+    """
+    Draw the plain clock icon.
+
+    Args:
+        size: Icon width and height in pixels
+
+    Returns:
+        PIL.Image.Image: The icon
+    """
+    image = Image.new('RGBA', (size, size), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    # Outer circle
+    draw.ellipse([8, 8, size - 8, size - 8], outline=FOREGROUND, width=3)
+
+    # Clock hands
+    center_x, center_y = size // 2, size // 2
+    # Hour hand
+    draw.line([center_x, center_y, center_x, 12], fill=FOREGROUND, width=3)
+    # Minute hand
+    draw.line([center_x, center_y, center_x + 8, center_y], fill=FOREGROUND, width=2)
+
+    return image
+
+
+def encode_png(image):
+    """Serialize an icon to PNG bytes (for the startup cache)."""
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def decode_png(data):
+    """Load an icon from PNG bytes."""
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def draw_progress_frame(bucket, buckets=PROGRESS_BUCKETS, size=ICON_SIZE):
+    """
+    Draw the clock with a ring showing how much time is left.
+
+    Args:
+        bucket: Number of filled ring segments (0..buckets)
+        buckets: Total number of ring segments
+        size: Icon width and height in pixels
+
+    Returns:
+        PIL.Image.Image: The icon
+    """
+    image = Image.new('RGBA', (size, size), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    # Ring track, then the remaining fraction clockwise from 12 o'clock
+    ring = [3, 3, size - 3, size - 3]
+    draw.ellipse(ring, outline=RING_TRACK, width=5)
+    if bucket > 0:
+        draw.arc(ring, start=-90, end=-90 + 360 * bucket / buckets, fill=RING_COLOR, width=5)
+
+    # Smaller clock inside the ring
+    center_x, center_y = size // 2, size // 2
+    draw.ellipse([14, 14, size - 14, size - 14], outline=FOREGROUND, width=3)
+    draw.line([center_x, center_y, center_x, 19], fill=FOREGROUND, width=3)
+    draw.line([center_x, center_y, center_x + 7, center_y], fill=FOREGROUND, width=2)
+
+    return image
+
+
+class TrayIconCache:
+    """Progress ring frames, rendered once per bucket and reused."""
+
+    def __init__(self, buckets=PROGRESS_BUCKETS, size=ICON_SIZE):
+        """
+        Initialize an empty cache.
+
+        Args:
+            buckets: Number of distinct progress frames
+            size: Icon width and height in pixels
+        """
+        self.buckets = buckets
+        self.size = size
+        self.frames = {}
+
+    def bucket_for(self, fraction):
+        """
+        Map the remaining fraction (0..1) to a frame bucket.
+
+        Rounds up, so the ring only empties completely at the deadline.
+        """
+        fraction = min(1.0, max(0.0, fraction))
+        return math.ceil(fraction * self.buckets)
+
+    def frame(self, bucket):
+        """Get the frame for a bucket, rendering it on first use."""
+        image = self.frames.get(bucket)
+        if image is None:
+            image = draw_progress_frame(bucket, self.buckets, self.size)
+            self.frames[bucket] = image
+        return image
+
+    def prerender(self):
+        """Render every frame up front (e.g. from a background thread)."""
+        for bucket in range(self.buckets + 1):
+            self.frame(bucket)
+
+    def export_frames(self):
+        """
+        Get every rendered frame as PNG bytes.
+
+        Returns:
+            dict: str(bucket) -> PNG bytes
+        """
+        return {str(bucket): encode_png(image) for bucket, image in self.frames.items()}
+
+    def load_frames(self, frames):
+        """
+        Fill the cache from export_frames() output.
+
+        Args:
+            frames: str(bucket) -> PNG bytes
+
+        Returns:
+            bool: True if every frame was loaded
+        """
+        try:
+            loaded = {int(bucket): decode_png(data) for bucket, data in frames.items()}
+        except (ValueError, OSError):
+            return False
+        if set(loaded) != set(range(self.buckets + 1)):
+            return False
+        self.frames.update(loaded)
+        return True
+
+
+class TrayUpdater:
+    """
+    Push progress and tooltip changes to a pystray icon only when needed.
+
+    Counters record how many backend calls were made and skipped.
+    """
+
+    def __init__(self, tray_icon, cache=None, min_title_interval=5.0, clock=time.monotonic):
+        """
+        Initialize the updater.
+
+        Args:
+            tray_icon: pystray.Icon to update
+            cache: TrayIconCache to take frames from
+            min_title_interval: Minimum seconds between tooltip writes
+            clock: Monotonic time source
+        """
+        self.tray_icon = tray_icon
+        self.cache = cache or TrayIconCache()
+        self.min_title_interval = min_title_interval
+        self.clock = clock
+        self.last_bucket = None
+        self.last_title = None
+        self.last_title_time = None
+        self.icon_swaps = 0
+        self.title_writes = 0
+        self.skipped = 0
+
+    def update(self, fraction, title, force=False):
+        """
+        Show the remaining fraction and tooltip on the tray icon.
+
+        Args:
+            fraction: Remaining fraction of the countdown (0..1)
+            title: Tooltip text
+            force: Write the tooltip even inside the rate limit
+        """
+        bucket = self.cache.bucket_for(fraction)
+        if bucket != self.last_bucket:
+            self.tray_icon.icon = self.cache.frame(bucket)
+            self.last_bucket = bucket
+            self.icon_swaps += 1
+
+        now = self.clock()
+        if title == self.last_title:
+            self.skipped += 1
+        elif (force or self.last_title_time is None
+                or now - self.last_title_time >= self.min_title_interval):
+            self.tray_icon.title = title
+            self.last_title = title
+            self.last_title_time = now
+            self.title_writes += 1
+        else:
+            self.skipped += 1
+
+    def reset(self):
+        """Forget what was shown, so the next update writes everything."""
+        self.last_bucket = None
+        self.last_title = None
+        self.last_title_time = None
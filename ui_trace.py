@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+UI responsiveness tracing for the Shutdown Scheduler.
+
+Two tools for finding out what blocks the Tk main loop:
+
+- Tracer records a span (start, duration, thread) around every traced
+  handler: callbacks posted from the timer and control threads, the warning
+  popup's countdown ticks and the <Configure> handler. Spans go into a
+  bounded ring buffer and can be written as a Chrome trace (open it in
+  chrome://tracing, https://ui.perfetto.dev or speedscope).
+- LagProbe schedules itself on the main loop at a fixed interval and records
+  how late each callback actually ran. Any lateness above the stall
+  threshold is added to the trace as a "main loop stall" span, so stalls
+  line up with the handler spans that caused them.
+
+Run the app with --trace PATH to enable both; the trace is written to PATH
+on exit or on request through the "trace" control socket method. When
+tracing is off every call is a cheap no-op.
+
+Author: AI Assistant
+License: MIT
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from timer_engine import DriftStats
+
+# Spans kept in memory; the oldest are dropped first
+DEFAULT_CAPACITY = 50000
+
+# Probe period and the lateness reported as a stall (seconds)
+PROBE_INTERVAL = 0.1
+STALL_THRESHOLD = 0.05
+
+
+class Tracer:
+    """Bounded recorder of timed spans, exportable as a Chrome trace."""
+
+    def __init__(self, enabled=True, capacity=DEFAULT_CAPACITY, clock=time.perf_counter):
+        """
+        Initialize the tracer.
+
+        Args:
+            enabled: Record spans (False turns every method into a no-op)
+            capacity: Maximum number of spans kept
+            clock: Time source in seconds
+        """
+        self.enabled = enabled
+        self.clock = clock
+        self.started = clock()
+        self.spans = deque(maxlen=capacity)  # (name, category, start, duration, thread id, args)
+        self.dropped = 0
+        self.thread_names = {}
+
+    @contextmanager
+    def span(self, name, category="ui", **args):
+        """
+        Time the enclosed block.
+
+        Args:
+            name: Span name, usually the handler's name
+            category: Chrome trace category
+            **args: Extra values shown with the span
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.record(name, started, self.clock(), category, **args)
+
+    def record(self, name, start, end, category="ui", **args):
+        """
+        Add a span that has already finished.
+
+        Args:
+            name: Span name
+            start: Start time on the tracer's clock
+            end: End time on the tracer's clock
+            category: Chrome trace category
+            **args: Extra values shown with the span
+        """
+        if not self.enabled:
+            return
+
+        thread = threading.current_thread()
+        if thread.ident not in self.thread_names:
+            self.thread_names[thread.ident] = thread.name
+        if len(self.spans) == self.spans.maxlen:
+            self.dropped += 1
+        self.spans.append((name, category, start, end - start, thread.ident, args))
+
+    def wrap(self, function, name=None, category="ui"):
+        """
+        Return function wrapped in a span (function itself when tracing is off).
+
+        Args:
+            function: Handler to trace
+            name: Span name (defaults to the function's name)
+            category: Chrome trace category
+        """
+        if not self.enabled:
+            return function
+
+        name = name or getattr(function, "__name__", "callback")
+
+        def traced(*args):
+            with self.span(name, category):
+                return function(*args)
+        return traced
+
+    def summary(self, limit=10):
+        """
+        Summarize the recorded spans by name, slowest first.
+
+        Args:
+            limit: Number of span names to return
+
+        Returns:
+            list: Dicts with name, count, total_ms and max_ms
+        """
+        totals = {}
+        for name, _, _, duration, _, _ in list(self.spans):
+            count, total, longest = totals.get(name, (0, 0.0, 0.0))
+            totals[name] = (count + 1, total + duration, max(longest, duration))
+        ranked = sorted(totals.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {"name": name, "count": count, "total_ms": total * 1000.0, "max_ms": longest * 1000.0}
+            for name, (count, total, longest) in ranked[:limit]
+        ]
+
+    def chrome_trace(self):
+        """
+        Convert the spans to the Chrome trace event format.
+
+        Returns:
+            dict: {"traceEvents": [...]} with timestamps in microseconds
+        """
+        pid = os.getpid()
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": ident, "args": {"name": name}}
+            for ident, name in list(self.thread_names.items())
+        ]
+        for name, category, start, duration, ident, args in list(self.spans):
+            events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((start - self.started) * 1e6, 1),
+                "dur": round(duration * 1e6, 1),
+                "pid": pid,
+                "tid": ident,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_spans": self.dropped}}
+
+    def write(self, path):
+        """
+        Write the Chrome trace to path atomically.
+
+        Returns:
+            int: Number of spans written
+        """
+        trace = self.chrome_trace()
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        os.replace(temp_path, path)
+        return len(trace["traceEvents"]) - len(self.thread_names)
+
+
+class LagProbe:
+    """
+    Measures main-loop latency by scheduling itself at a fixed interval.
+
+    Each run compares the time it was due with the time it actually ran; the
+    difference is how long the loop was busy with something else.
+    """
+
+    def __init__(self, call_later, cancel_call, interval=PROBE_INTERVAL, stall_threshold=STALL_THRESHOLD,
+                 tracer=None, on_sample=None, clock=time.perf_counter):
+        """
+        Initialize the probe (does not start it).
+
+        Args:
+            call_later: Tk-style after(delay_ms, callback)
+            cancel_call: Tk-style after_cancel(handle)
+            interval: Seconds between probes
+            stall_threshold: Lateness recorded in the trace as a stall
+            tracer: Tracer receiving stall spans (optional)
+            on_sample: Called with each lateness in seconds (optional)
+            clock: Time source in seconds (same as the tracer's)
+        """
+        self.call_later = call_later
+        self.cancel_call = cancel_call
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.tracer = tracer
+        self.on_sample = on_sample
+        self.clock = clock
+        self.lag = DriftStats()
+        self.stalls = 0
+        self.due = None
+        self.handle = None
+
+    def start(self):
+        """Start probing."""
+        self._schedule()
+
+    def _schedule(self):
+        """Queue the next probe."""
+        self.due = self.clock() + self.interval
+        self.handle = self.call_later(round(self.interval * 1000), self._probe)
+
+    def _probe(self):
+        """Record how late this run is and queue the next one."""
+        now = self.clock()
+        lateness = max(0.0, now - self.due)
+        self.lag.add(lateness)
+        if lateness >= self.stall_threshold:
+            self.stalls += 1
+            if self.tracer:
+                self.tracer.record("main loop stall", self.due, now, category="lag",
+                                   lag_ms=round(lateness * 1000.0, 1))
+        if self.on_sample:
+            self.on_sample(lateness)
+        self._schedule()
+
+    def stop(self):
+        """Stop probing."""
+        if self.handle is not None:
+            self.cancel_call(self.handle)
+            self.handle = None
+
+    def report(self):
+        """
+        Summarize the measured lag.
+
+        Returns:
+            dict: Probe interval, stall count and lag statistics in milliseconds
+        """
+        report = self.lag.as_dict()
+        report["interval_ms"] = self.interval * 1000.0
+        report["stalls"] = self.stalls
+        return report